@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+音频读取与重采样（各音频脚本共用）
+
+filter_sound.py 原来用 librosa.load(sr=SR) 读取：重采样算法固定，光是 librosa
+的延迟导入就要在每个工作进程里花上数秒；wav2mp3.py 则不管采样率是否已经一致都
+调用 pydub 的 set_frame_rate。本模块通过 soundfile 按原生采样率读取，只有采样率
+不同时才重采样，重采样算法可按速度/质量选择。
+
+- 读取：soundfile 直接解码到目标 dtype（float32 / int16）的数组，单声道文件
+  不再复制；16 位 PCM 读成 float32 时先读 int16 再由 numpy 缩放（比 libsndfile
+  的逐样本转换快，结果逐位一致）；多声道用矩阵乘法混成单声道
+- 重采样后端（RESAMPLERS）：soxr_hq / soxr_vhq（需要 soxr，快且质量高）、
+  poly（scipy.signal.resample_poly）、fft（scipy.signal.resample）、
+  linear（numpy 线性插值，最快、质量最低）；auto 在装了 soxr 时用 soxr_hq，
+  否则用 poly
+- int16 数据由 soxr 直接处理；其他后端先转 float32，处理完再四舍五入、限幅回 int16
+
+依赖：Python 3.6+，numpy，soundfile；soxr、scipy 可选（对应的重采样后端）
+用法：python audio_io.py <音频> [--sr N] [--resampler 名称] [-o 输出.wav]
+      python audio_io.py <目录> --benchmark [--sr N]
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+
+RESAMPLER_AUTO = "auto"
+# 重采样后端 -> 说明
+RESAMPLERS = {
+    "linear": "numpy 线性插值（最快，高频有混叠，只适合预览）",
+    "soxr_hq": "soxr 高质量（需要 soxr）",
+    "soxr_vhq": "soxr 超高质量（需要 soxr）",
+    "poly": "scipy 多相滤波 resample_poly",
+    "fft": "scipy FFT resample（整段变换，长文件较慢）",
+}
+DTYPES = ("float32", "int16")
+
+
+def _have_soxr() -> bool:
+    try:
+        import soxr  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def resolve_resampler(name: str = RESAMPLER_AUTO) -> str:
+    """
+    把 auto 解析为具体后端，并检查后端可用。
+
+    :raises ValueError: 未知的后端名
+    :raises RuntimeError: 后端依赖未安装
+    """
+    if name == RESAMPLER_AUTO:
+        return "soxr_hq" if _have_soxr() else "poly"
+    if name not in RESAMPLERS:
+        raise ValueError(f"未知的重采样后端: {name}，可选: {RESAMPLER_AUTO}, {', '.join(RESAMPLERS)}")
+    if name.startswith("soxr") and not _have_soxr():
+        raise RuntimeError(f"重采样后端 {name} 需要 soxr：pip install soxr")
+    return name
+
+
+def resample(y, orig_sr: int, target_sr: int, resampler: str = RESAMPLER_AUTO):
+    """
+    沿第 0 维（时间）重采样，y 为 (帧数,) 或 (帧数, 声道数)，保持 dtype（float32 或 int16）。
+
+    采样率相同时原样返回 y，不复制。
+    """
+    import numpy as np
+
+    if orig_sr == target_sr:
+        return y
+    resampler = resolve_resampler(resampler)
+    if resampler.startswith("soxr"):
+        import soxr
+
+        return soxr.resample(y, orig_sr, target_sr, quality=resampler[len("soxr_"):].upper())
+
+    x = y.astype(np.float32) if y.dtype.kind in "iu" else y
+    if resampler == "poly":
+        from scipy.signal import resample_poly
+
+        g = math.gcd(orig_sr, target_sr)
+        out = resample_poly(x, target_sr // g, orig_sr // g, axis=0)
+    elif resampler == "fft":
+        from scipy.signal import resample as fft_resample
+
+        out = fft_resample(x, int(round(len(x) * target_sr / orig_sr)), axis=0)
+    else:
+        n = int(round(len(x) * target_sr / orig_sr))
+        src = np.arange(len(x))
+        pos = np.arange(n) * (orig_sr / target_sr)
+        if x.ndim == 1:
+            out = np.interp(pos, src, x)
+        else:
+            out = np.stack([np.interp(pos, src, x[:, c]) for c in range(x.shape[1])], axis=1)
+
+    if y.dtype == np.int16:
+        return np.clip(np.round(out), -32768, 32767).astype(np.int16)
+    return out.astype(y.dtype, copy=False)
+
+
+def load(source, sr=None, mono: bool = True, dtype: str = "float32", resampler: str = RESAMPLER_AUTO):
+    """
+    读取音频：按原生采样率解码，sr 与原生采样率不同时才重采样。
+
+    :param source: 文件路径或二进制文件对象（如 io.BytesIO）
+    :param sr: 目标采样率，None 表示保持原生采样率
+    :param mono: True 时多声道取平均混成单声道
+    :param dtype: float32（[-1, 1)）或 int16
+    :param resampler: 重采样后端，见 RESAMPLERS
+    :return: (数组, 采样率)；单声道为 (帧数,)，多声道为 (帧数, 声道数)
+    """
+    import numpy as np
+    import soundfile as sf
+
+    if dtype not in DTYPES:
+        raise ValueError(f"不支持的 dtype: {dtype}，可选: {', '.join(DTYPES)}")
+    scale = None
+    with sf.SoundFile(source) as f:
+        native_sr = f.samplerate
+        if dtype == "float32" and f.subtype == "PCM_16":
+            # libsndfile 逐样本转浮点比 numpy 慢约 3 倍：读 int16 再缩放，结果逐位一致
+            y = f.read(dtype="int16", always_2d=False)
+            scale = 1 / 32768
+        else:
+            y = f.read(dtype=dtype, always_2d=False)
+
+    if mono and y.ndim > 1:
+        # 矩阵乘法混音比 mean(axis=1) 快一个数量级（后者沿短轴逐行归约）；缩放一并完成
+        weights = np.full(y.shape[1], (scale or 1.0) / y.shape[1], dtype=np.float32)
+        mixed = y.astype(np.float32, copy=False) @ weights
+        y = np.round(mixed).astype(np.int16) if dtype == "int16" else mixed
+    elif scale is not None:
+        y = np.multiply(y, np.float32(scale), dtype=np.float32)
+    if sr is None or sr == native_sr:
+        return y, native_sr
+    return resample(y, native_sr, sr, resampler), sr
+
+
+def duration(source) -> float:
+    """只读文件头得到时长（秒）。"""
+    import soundfile as sf
+
+    info = sf.info(source)
+    return info.frames / info.samplerate
+
+
+def benchmark(directory: str, sr: int = 44100, repeat: int = 3) -> None:
+    """
+    对目录下全部 WAV 计时：librosa.load(sr=sr, mono=True)（如已安装）与本模块各重采样后端，
+    每种取 repeat 次中的最小值，报告每个文件的平均读取耗时。
+    """
+    import soundfile as sf
+
+    paths = sorted(
+        os.path.join(directory, name) for name in os.listdir(directory) if name.lower().endswith(".wav")
+    )
+    if not paths:
+        raise ValueError(f"目录下没有 WAV 文件: {directory}")
+    need = sum(sf.info(p).samplerate != sr for p in paths)
+    print(f"{len(paths)} 个 WAV，目标 {sr} Hz，其中 {need} 个需要重采样；重复 {repeat} 次")
+
+    methods = []
+    try:
+        import librosa
+
+        methods.append(("librosa.load", lambda p: librosa.load(p, sr=sr, mono=True)))
+    except ImportError:
+        print("（未安装 librosa，跳过对照）")
+    for name in RESAMPLERS:
+        try:
+            resolve_resampler(name)
+        except RuntimeError:
+            continue
+        methods.append((f"audio_io {name}", lambda p, name=name: load(p, sr=sr, resampler=name)))
+
+    print()
+    print(f"{'方法':<18}{'每个文件':>10}{'合计':>12}")
+    baseline = None
+    for label, func in methods:
+        func(paths[0])  # 预热：首次调用的延迟导入不计入
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for path in paths:
+                func(path)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        baseline = baseline or best
+        print(f"{label:<20}{best * 1000 / len(paths):8.2f}ms{best * 1000:10.1f}ms  {baseline / best:5.2f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="按原生采样率读取音频，只在需要时重采样；可比较各重采样后端的读取耗时。",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+示例：
+  python audio_io.py note.wav
+  python audio_io.py note_48k.wav --sr 44100 --resampler poly -o note_44k.wav
+  python audio_io.py ./samples --benchmark
+        """,
+    )
+    parser.add_argument("input", help="音频文件；--benchmark 时为 WAV 目录")
+    parser.add_argument("--sr", type=int, default=None, help="目标采样率，默认保持原生采样率（--benchmark 默认 44100）")
+    parser.add_argument(
+        "--resampler",
+        choices=(RESAMPLER_AUTO,) + tuple(RESAMPLERS),
+        default=RESAMPLER_AUTO,
+        help="重采样后端（默认 auto：有 soxr 用 soxr_hq，否则 poly）",
+    )
+    parser.add_argument("-o", "--output", default=None, help="把读取（并重采样）后的音频写到该路径")
+    parser.add_argument("--benchmark", action="store_true", help="对目录下全部 WAV 比较 librosa.load 与各后端的读取耗时")
+    parser.add_argument("--repeat", type=int, default=3, metavar="N", help="基准测试的重复次数（默认 3）")
+    args = parser.parse_args()
+
+    if args.sr is not None and args.sr < 1:
+        parser.error("--sr 必须为正整数")
+    if args.repeat < 1:
+        parser.error("--repeat 必须为正整数")
+
+    try:
+        if args.benchmark:
+            if not os.path.isdir(args.input):
+                parser.error("--benchmark 需要一个目录")
+            benchmark(args.input, args.sr or 44100, args.repeat)
+            return
+        import soundfile as sf
+
+        info = sf.info(args.input)
+        print(f"{args.input}: {info.samplerate} Hz，{info.channels} 声道，{info.frames / info.samplerate:.2f} s，{info.subtype}")
+        if args.output is not None:
+            y, sr = load(args.input, sr=args.sr, mono=False, resampler=args.resampler)
+            sf.write(args.output, y, sr, subtype=info.subtype if args.output.lower().endswith(".wav") else None)
+            print(f"已写入: {args.output}（{sr} Hz）")
+    except (OSError, RuntimeError, ValueError) as e:
+        print(f"错误：{e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
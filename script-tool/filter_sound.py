@@ -7,75 +7,378 @@
 功能：
     对按音高命名的 WAV 文件（如 C4.wav、A#5.wav）进行校验、带通滤波和音量均衡。
     文件名（不含扩展名）视为期望音高，仅当检测到的音高与文件名一致时才处理；
+    多力度/多轮采样可在音名后加下划线后缀（如 C4_v1.wav、C4_v2.wav）。
     通过带通滤波减弱无关频段噪声，并统一输出音量到目标 RMS。
 
+批处理：
+    读取与音高检测（主要耗时）在进程池中并行；带通滤波器系数按
+    (采样率, 音名) 缓存，中心频率取音名的标准频率；同一音名、同样长度的片段
+    堆叠成二维数组，一次完成滤波与 RMS 归一化。结束时报告吞吐量。
+
+流式输出：
+    通过校验的片段最多缓冲 16 个，攒满即滤波、归一化并写出，峰值内存与文件数无关。
+    --gain library 使用全库统一增益（保留不同力度的相对响度）：滤波结果先追加到
+    输出目录下的临时文件，增益确定后再以 memmap 逐个读回写出。
+
+音高缓存：
+    检测结果（音高与置信度）按 (文件内容 SHA-256, 采样率, fmin, fmax, 检测方法)
+    存入 SQLite，默认为输入目录下的 .filter_sound_pitch.sqlite。调整 RMS_TARGET_DB、
+    BANDWIDTH_OCT 等参数后重跑，内容未变的文件直接复用，不再做 YIN 检测。
+
 用法：
-    python filter_sound.py <输入目录> <输出目录>
+    python filter_sound.py <输入目录> <输出目录> [-j N] [--gain file|library] [--cache PATH | --no-cache] [--resampler 名称]
 
 示例：
     python filter_sound.py ./samples ./filtered
-    python filter_sound.py ~/Music/raw_notes ~/Music/clean_notes
+    python filter_sound.py ~/Music/raw_notes ~/Music/clean_notes -j 8
+    python filter_sound.py ./velocity_layers ./filtered --gain library
 
 依赖：
     - Python 3.6+
-    - numpy, librosa, soundfile, scipy
+    - numpy, soundfile, scipy（均在处理时才导入，--help 不需要）；soxr 可选
+    - 读取见 audio_io.py：按原生采样率解码，只有采样率不是 SR 时才重采样
+    - 音高检测见 pitch.py（起音后稳态段的向量化 YIN）
 """
 
+import argparse
+import hashlib
+import io
+import math
 import os
-import sys
+import sqlite3
+import time
+from functools import lru_cache, partial
 
-import librosa
-import numpy as np
-import soundfile as sf
-from scipy.signal import butter, lfilter
+from audio_io import RESAMPLER_AUTO, RESAMPLERS
 
 # ================= 参数 =================
 SR = 44100  # 统一采样率
-FMIN = librosa.note_to_hz("C1")  # 音高检测下限
-FMAX = librosa.note_to_hz("C8")  # 音高检测上限
+FMIN = 440.0 * 2 ** ((24 - 69) / 12)  # 音高检测下限 C1（MIDI 24，约 32.7 Hz）
+FMAX = 440.0 * 2 ** ((108 - 69) / 12)  # 音高检测上限 C8（MIDI 108，约 4186 Hz）
 RMS_TARGET_DB = -18.0  # 目标 RMS 音量（dB）
 BANDWIDTH_OCT = 1.0  # 带通带宽（以检测到的音高为中心，±1 个八度）
+RESAMPLER = RESAMPLER_AUTO  # 采样率不是 SR 的文件所用的重采样后端，见 audio_io.RESAMPLERS
+BATCH_MAX_ROWS = 16  # 同长度片段堆叠滤波时每批的最大行数，也是流式处理时待滤波片段的缓冲上限
 # =======================================
 
+# 音量均衡方式：file=逐文件归一化；library=全库统一增益（保留相对响度）
+GAIN_FILE = "file"
+GAIN_LIBRARY = "library"
+GAIN_MODES = {GAIN_FILE: "逐文件", GAIN_LIBRARY: "全库统一增益"}
+
+# 音高缓存：默认放在输入目录下；检测方法或其参数变化时修改 PITCH_METHOD，旧记录自然失效。
+# 需要重采样的文件，其检测方法还带上实际使用的重采样后端（见 pitch_method）
+PITCH_CACHE_NAME = ".filter_sound_pitch.sqlite"
+PITCH_METHOD = "pitch.steady_yin/2"
+PITCH_CACHE_COMMIT_ROWS = 64  # 新结果每攒够这么多条写入一次数据库
+
 
 def rms_db(signal):
-    """计算信号 RMS 对应的分贝值（dB）。"""
-    rms = np.sqrt(np.mean(signal ** 2))
+    """计算信号 RMS 对应的分贝值（dB）；二维输入按行计算。"""
+    import numpy as np
+
+    rms = np.sqrt(np.mean(signal ** 2, axis=-1))
     return 20 * np.log10(rms + 1e-9)
 
 
 def normalize_rms(signal, target_db):
-    """将信号 RMS 归一化到目标分贝。"""
+    """将信号 RMS 归一化到目标分贝；二维输入逐行归一化。"""
+    import numpy as np
+
     current_db = rms_db(signal)
     gain = 10 ** ((target_db - current_db) / 20)
-    return signal * gain
+    return signal * np.expand_dims(gain, -1)
 
 
 def detect_pitch(signal, sr):
-    """使用 YIN 算法检测主音高（Hz），无法检测时返回 None。"""
-    f0 = librosa.yin(signal, fmin=FMIN, fmax=FMAX, sr=sr)
-    f0 = f0[np.isfinite(f0)]
-    if len(f0) == 0:
-        return None
-    return np.median(f0)
+    """
+    检测主音高：只分析起音之后稳态段的几帧（见 pitch.py）。
 
+    :return: (音高 Hz, 置信度 0~1)；无法检测时返回 (None, 0.0)
+    """
+    from pitch import estimate_pitch
+
+    return estimate_pitch(signal, sr, FMIN, FMAX)
+
+
+def pitch_method(native_sr, resampler=RESAMPLER):
+    """
+    缓存键中的检测方法：原生采样率就是 SR 时为 PITCH_METHOD；否则检测的是重采样后的信号，
+    附上解析后的后端名（auto 按当时是否装了 soxr 解析），换后端后旧结果不再命中。
+    """
+    if native_sr == SR:
+        return PITCH_METHOD
+    from audio_io import resolve_resampler
+
+    return f"{PITCH_METHOD}+{resolve_resampler(resampler)}"
+
+
+class PitchCache:
+    """
+    音高检测结果的 SQLite 持久化缓存。
+
+    以 (文件内容 SHA-256, 采样率, fmin, fmax, 检测方法) 为主键（检测方法见 pitch_method），保存检测到的音高
+    （无法识别时为 NULL）与置信度。只改滤波或响度参数重跑时，内容未变的文件不再
+    做音高检测；文件改名、复制后同样命中。使用 WAL 日志，工作进程读取的同时
+    主进程可以写入。
+    """
+
+    def __init__(self, db_path):
+        self.conn = sqlite3.connect(os.path.expanduser(db_path), timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS pitch ("
+            " sha256 TEXT NOT NULL, sr INTEGER NOT NULL, fmin REAL NOT NULL, fmax REAL NOT NULL,"
+            " method TEXT NOT NULL, pitch_hz REAL, confidence REAL NOT NULL,"
+            " PRIMARY KEY (sha256, sr, fmin, fmax, method))"
+        )
+        self.conn.commit()
+
+    def get(self, digest, sr, method):
+        """查询缓存：命中时返回 (音高 Hz 或 None, 置信度)，否则返回 None。"""
+        row = self.conn.execute(
+            "SELECT pitch_hz, confidence FROM pitch"
+            " WHERE sha256 = ? AND sr = ? AND fmin = ? AND fmax = ? AND method = ?",
+            (digest, sr, FMIN, FMAX, method),
+        ).fetchone()
+        return None if row is None else (row[0], row[1])
+
+    def put(self, rows) -> None:
+        """写入 [(sha256, 采样率, 检测方法, 音高 Hz 或 None, 置信度)]。"""
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO pitch (sha256, sr, fmin, fmax, method, pitch_hz, confidence)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (digest, sr, FMIN, FMAX, method, pitch_hz, confidence)
+                for digest, sr, method, pitch_hz, confidence in rows
+            ],
+        )
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+@lru_cache(maxsize=None)
+def _worker_cache(db_path):
+    """每个工作进程只打开一次缓存数据库。"""
+    return PitchCache(db_path)
+
+
+@lru_cache(maxsize=None)
+def bandpass_coefficients(sr, center_hz, octaves):
+    """
+    带通滤波器的二阶节（SOS）系数；按 (采样率, 中心频率, 带宽) 缓存，同一音名只设计一次。
+
+    低音区的通带下沿只有奈奎斯特频率的千分之几，8 阶 (b, a) 形式在这里数值不稳定
+    （输出发散），级联二阶节则没有这个问题。
+    """
+    from scipy.signal import butter
 
-def bandpass_filter(signal, sr, center_hz, octaves):
-    """以 center_hz 为中心、带宽 ±octaves 个八度的带通滤波。"""
     low = center_hz / (2 ** octaves)
     high = center_hz * (2 ** octaves)
     nyq = sr / 2
     low /= nyq
     high /= nyq
-    b, a = butter(4, [low, high], btype="band")
-    return lfilter(b, a, signal)
+    return butter(4, [low, high], btype="band", output="sos")
+
+
+def bandpass_filter(signal, sr, center_hz, octaves):
+    """以 center_hz 为中心、带宽 ±octaves 个八度的带通滤波；二维输入逐行滤波。"""
+    from scipy.signal import sosfilt
+
+    return sosfilt(bandpass_coefficients(sr, center_hz, octaves), signal, axis=-1)
+
+
+def expected_note_of(fname):
+    """文件名 -> 期望音名：去掉扩展名与第一个下划线之后的后缀（C4_v2.wav -> C4）。"""
+    return os.path.splitext(fname)[0].split("_", 1)[0]
+
+
+def analyze_file(in_path, cache_path=None, resampler=RESAMPLER):
+    """
+    读取一个 WAV 并检测音高（在工作进程中运行）。
+
+    文件只读一次：先算内容哈希，再从内存解码。给出 cache_path 时先查音高缓存，
+    命中则跳过检测；未通过校验的文件命中缓存时连解码也省去（时长只读文件头）。
+
+    :return: 字典，status 为 ok / no_pitch / mismatch；ok 时带上 signal 与
+             用于滤波的音名标准频率 center_hz；未命中缓存时带上 cache_row 供主进程写入
+    """
+    from audio_io import duration, load
+    from pitch import hz_to_note, note_to_hz
+
+    fname = os.path.basename(in_path)
+    expected_note = expected_note_of(fname)
+    with open(in_path, "rb") as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    result = {"fname": fname, "expected": expected_note, "cached": False}
+
+    cached = method = None
+    if cache_path:
+        import soundfile as sf
+
+        method = pitch_method(sf.info(io.BytesIO(data)).samplerate, resampler)
+        cached = _worker_cache(cache_path).get(digest, SR, method)
+    y = None
+    if cached is not None:
+        pitch_hz, confidence = cached
+        result["cached"] = True
+        result["seconds"] = duration(io.BytesIO(data))
+    else:
+        y, sr = load(io.BytesIO(data), sr=SR, resampler=resampler)
+        result["seconds"] = len(y) / sr
+        pitch_hz, confidence = detect_pitch(y, sr)
+        result["cache_row"] = (digest, SR, method, pitch_hz, confidence)
+    result["confidence"] = confidence
+
+    if pitch_hz is None:
+        result["status"] = "no_pitch"
+        return result
+
+    # 用 # 表示升号，与文件名（如 A#5.wav）一致
+    detected_note = hz_to_note(pitch_hz)
+    result["detected"] = detected_note
+    if detected_note != expected_note:
+        result["status"] = "mismatch"
+        return result
+
+    if y is None:
+        y, sr = load(io.BytesIO(data), sr=SR, resampler=resampler)
+    result.update(
+        status="ok",
+        signal=y,
+        sr=sr,
+        center_hz=note_to_hz(detected_note),
+    )
+    return result
+
+
+def _map(func, items, workers):
+    """
+    workers 为 1 时在本进程顺序执行，否则在进程池中并行，结果保持输入顺序。
+
+    最多同时挂起 workers×2 个任务：前面的文件较慢时，后面已完成的结果
+    不会无限堆积在内存里。
+    """
+    if workers == 1:
+        for item in items:
+            yield func(item)
+        return
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for item in items:
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+            pending.append(pool.submit(func, item))
+        while pending:
+            yield pending.popleft().result()
+
 
+def filter_batches(accepted, normalize=True):
+    """
+    按 (采样率, 音名, 长度) 分组，每组堆叠成二维数组，一次完成带通滤波与 RMS 归一化。
 
-def process_directory(input_dir, output_dir):
+    :param accepted: analyze_file 返回的 ok 结果列表
+    :param normalize: False 时只滤波，不做逐文件音量归一化（全库统一增益时使用）
+    :return: 逐个产出 (文件名, 处理后的信号, 采样率)，顺序按分组
+    """
+    import numpy as np
+
+    groups = {}
+    for item in accepted:
+        key = (item["sr"], item["center_hz"], len(item["signal"]))
+        groups.setdefault(key, []).append(item)
+
+    for (sr, center_hz, _), items in groups.items():
+        for start in range(0, len(items), BATCH_MAX_ROWS):
+            chunk = items[start:start + BATCH_MAX_ROWS]
+            batch = bandpass_filter(np.stack([item["signal"] for item in chunk]), sr, center_hz, BANDWIDTH_OCT)
+            if normalize:
+                batch = normalize_rms(batch, RMS_TARGET_DB)
+            for item, row in zip(chunk, batch):
+                yield item["fname"], row, sr
+
+
+class ScratchSpill:
+    """
+    全库统一增益时的暂存区：滤波后的片段以 float32 追加写入输出目录下的临时文件，
+    同时累计总能量；全部文件处理完、增益确定后，再以 numpy.memmap 逐个读回、
+    乘以增益写出。内存中只保留每个片段的偏移与长度。
+    """
+
+    def __init__(self, directory):
+        import tempfile
+
+        self.file = tempfile.TemporaryFile(dir=directory, prefix=".filter_sound_")
+        self.entries = []  # (文件名, 采样率, 起始样本, 样本数)
+        self.samples = 0
+        self.energy = 0.0
+
+    def add(self, fname, signal, sr):
+        import numpy as np
+
+        self.energy += float(np.dot(signal, signal))
+        self.file.write(np.asarray(signal, dtype=np.float32).tobytes())
+        self.entries.append((fname, sr, self.samples, len(signal)))
+        self.samples += len(signal)
+
+    def gain(self, target_db):
+        """使全部片段合在一起的 RMS 等于 target_db 的线性增益。"""
+        import numpy as np
+
+        rms = np.sqrt(self.energy / max(1, self.samples))
+        return 10 ** ((target_db - 20 * np.log10(rms + 1e-9)) / 20)
+
+    def replay(self, gain):
+        """按写入顺序逐个产出 (文件名, 乘以增益后的信号, 采样率)。"""
+        import numpy as np
+
+        if not self.samples:
+            return
+        self.file.flush()
+        data = np.memmap(self.file, dtype=np.float32, mode="r", shape=(self.samples,))
+        for fname, sr, offset, length in self.entries:
+            yield fname, data[offset:offset + length] * gain, sr
+
+    def close(self):
+        self.file.close()
+
+
+def peak_rss_mb():
+    """本进程的峰值常驻内存（MB），平台不支持时返回 None。"""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    import sys
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def process_directory(input_dir, output_dir, workers=None, gain_mode=GAIN_FILE, cache_path="", resampler=RESAMPLER):
     """
     遍历输入目录中的 WAV，按文件名音高校验、带通滤波、音量均衡后写入输出目录。
     仅处理「检测音高与文件名一致」的文件。
+
+    流式处理：通过校验的片段最多缓冲 BATCH_MAX_ROWS 个，攒满即成批滤波并写出，
+    峰值内存与文件总数无关。
+
+    :param workers: 读取与音高检测的并行进程数，默认 CPU 核数；1 表示在本进程顺序处理
+    :param gain_mode: file=每个文件各自归一化到目标 RMS；library=全库统一增益，
+                      保留文件之间（如不同力度）的相对响度，滤波结果暂存到临时文件
+    :param cache_path: 音高缓存数据库路径；空字符串表示输入目录下的 PITCH_CACHE_NAME，
+                       None 表示不使用缓存
+    :param resampler: 采样率不是 SR 的文件所用的重采样后端（audio_io.RESAMPLERS 或 auto）
     """
+    import soundfile as sf
+
     input_path = os.path.abspath(input_dir)
     output_path = os.path.abspath(output_dir)
     os.makedirs(output_path, exist_ok=True)
@@ -85,65 +388,148 @@ def process_directory(input_dir, output_dir):
     print("=" * 50)
     print(f"输入目录: {input_path}")
     print(f"输出目录: {output_path}")
-    print(f"目标音量: {RMS_TARGET_DB} dB，带通带宽: ±{BANDWIDTH_OCT} 八度")
+    print(f"目标音量: {RMS_TARGET_DB} dB（{GAIN_MODES[gain_mode]}），带通带宽: ±{BANDWIDTH_OCT} 八度")
+
+    cache = None
+    if cache_path is not None:
+        cache_path = os.path.abspath(cache_path or os.path.join(input_path, PITCH_CACHE_NAME))
+        try:
+            cache = PitchCache(cache_path)
+            print(f"音高缓存: {cache_path}")
+        except sqlite3.Error as e:
+            # 输入目录只读等情况：不影响处理，只是每次都重新检测
+            print(f"⚠️ 无法打开音高缓存 {cache_path}（{e}），本次不使用缓存")
+            cache_path = None
     print("=" * 50)
 
-    wav_files = [f for f in os.listdir(input_dir) if f.lower().endswith(".wav")]
+    wav_files = sorted(f for f in os.listdir(input_dir) if f.lower().endswith(".wav"))
     if not wav_files:
         print("⚠️ 输入目录下没有 WAV 文件")
         return
 
-    print(f"找到 {len(wav_files)} 个 WAV 文件，开始校验与处理...")
+    workers = workers or os.cpu_count() or 1
+    print(f"找到 {len(wav_files)} 个 WAV 文件，开始校验与处理（{workers} 个进程）...")
     print()
 
-    accepted = []
-
-    for fname in wav_files:
-        # 文件名（不含扩展名）即期望音高，如 C4.wav -> C4
-        expected_note = os.path.splitext(fname)[0]
-        in_path = os.path.join(input_dir, fname)
-
-        y, sr = librosa.load(in_path, sr=SR, mono=True)
-
-        pitch_hz = detect_pitch(y, sr)
-        if pitch_hz is None:
-            print(f"❌ {fname}：无法识别音高")
-            continue
-
-        detected_note = librosa.hz_to_note(pitch_hz, octave=True)
-
-        if detected_note != expected_note:
-            print(f"❌ {fname}：音高不匹配（检测 {detected_note}，期望 {expected_note}）")
-            continue
-
-        print(f"✅ {fname}：音高校验通过")
-
-        # 以检测到的音高为中心做带通滤波，减弱带外噪声
-        y_filtered = bandpass_filter(y, sr, pitch_hz, BANDWIDTH_OCT)
-        accepted.append((fname, y_filtered))
-
-    if not accepted:
-        print("⚠️ 没有任何文件通过校验")
-        return
-
-    # 统一音量并写出
-    print()
-    print("🔊 开始音量均衡并写入输出目录")
-    for fname, y in accepted:
-        y_norm = normalize_rms(y, RMS_TARGET_DB)
-        out_path = os.path.join(output_dir, fname)
-        sf.write(out_path, y_norm, SR)
-        print(f"💾 已输出：{out_path}")
+    spill = ScratchSpill(output_path) if gain_mode == GAIN_LIBRARY else None
+    start = time.perf_counter()
+    pending = []
+    new_rows = []
+    cache_hits = 0
+    accepted = 0
+    audio_seconds = 0.0
+    write_time = 0.0
+
+    def flush():
+        # 以检测到的音名为中心做带通滤波，减弱带外噪声；逐文件归一化时直接写出
+        nonlocal write_time
+        flush_start = time.perf_counter()
+        for fname, y, sr in filter_batches(pending, normalize=spill is None):
+            if spill is not None:
+                spill.add(fname, y, sr)
+                continue
+            out_path = os.path.join(output_path, fname)
+            sf.write(out_path, y, sr)
+            print(f"💾 已输出：{out_path}")
+        pending.clear()
+        write_time += time.perf_counter() - flush_start
+
+    try:
+        in_paths = [os.path.join(input_dir, fname) for fname in wav_files]
+        for result in _map(partial(analyze_file, cache_path=cache_path, resampler=resampler), in_paths, workers):
+            fname = result["fname"]
+            audio_seconds += result["seconds"]
+            cache_hits += result["cached"]
+            if cache is not None and "cache_row" in result:
+                new_rows.append(result["cache_row"])
+                if len(new_rows) >= PITCH_CACHE_COMMIT_ROWS:
+                    cache.put(new_rows)
+                    new_rows.clear()
+            if result["status"] == "no_pitch":
+                print(f"❌ {fname}：无法识别音高")
+            elif result["status"] == "mismatch":
+                print(f"❌ {fname}：音高不匹配（检测 {result['detected']}，期望 {result['expected']}）")
+            else:
+                print(f"✅ {fname}：音高校验通过")
+                accepted += 1
+                pending.append(result)
+                if len(pending) >= BATCH_MAX_ROWS:
+                    flush()
+        flush()
+
+        if not accepted:
+            print("⚠️ 没有任何文件通过校验")
+            return
+
+        if spill is not None:
+            gain = spill.gain(RMS_TARGET_DB)
+            print()
+            print(f"🔊 全库统一增益 {20 * math.log10(gain):+.2f} dB，写入输出目录")
+            write_start = time.perf_counter()
+            for fname, y, sr in spill.replay(gain):
+                out_path = os.path.join(output_path, fname)
+                sf.write(out_path, y, sr)
+                print(f"💾 已输出：{out_path}")
+            write_time += time.perf_counter() - write_start
+    finally:
+        if spill is not None:
+            spill.close()
+        if cache is not None:
+            # 中途失败或中断时也保存已完成的检测结果
+            if new_rows:
+                cache.put(new_rows)
+            cache.close()
+    elapsed = time.perf_counter() - start
 
     print()
     print("🎉 处理完成")
-    print(f"通过校验并输出：{len(accepted)} 个文件")
+    print(f"通过校验并输出：{accepted} 个文件")
+    if cache is not None:
+        print(f"音高缓存命中：{cache_hits}/{len(wav_files)}")
+    print(
+        f"耗时 {elapsed:.2f} s（其中滤波与写出 {write_time:.2f} s），"
+        f"{len(wav_files) / elapsed:.1f} 文件/秒，音频 {audio_seconds:.0f} s（{audio_seconds / elapsed:.0f}x 实时）"
+    )
+    peak = peak_rss_mb()
+    if peak is not None:
+        print(f"峰值内存（RSS）：{peak:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="按文件名音高校验 WAV，带通滤波并统一音量后写入输出目录。",
+        epilog="示例：python filter_sound.py ./samples ./filtered -j 8",
+    )
+    parser.add_argument("input_dir", help="输入目录（WAV 文件名为期望音高，如 C4.wav、C4_v2.wav）")
+    parser.add_argument("output_dir", help="输出目录")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="并行进程数，默认 CPU 核数")
+    parser.add_argument(
+        "--gain",
+        choices=sorted(GAIN_MODES),
+        default=GAIN_FILE,
+        help="音量均衡方式：file=每个文件归一化到目标 RMS（默认）；"
+        "library=全库统一增益，保留不同力度之间的相对响度",
+    )
+    parser.add_argument(
+        "--cache",
+        default="",
+        metavar="PATH",
+        help=f"音高检测缓存（SQLite），默认 <输入目录>/{PITCH_CACHE_NAME}；只改滤波或响度参数重跑时跳过未变文件的检测",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="不读写音高缓存，每个文件都重新检测")
+    parser.add_argument(
+        "--resampler",
+        choices=(RESAMPLER_AUTO,) + tuple(RESAMPLERS),
+        default=RESAMPLER,
+        help=f"采样率不是 {SR} Hz 的文件所用的重采样后端（默认 auto：有 soxr 用 soxr_hq，否则 poly）",
+    )
+    args = parser.parse_args()
+
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers 必须为正整数")
+    cache_path = None if args.no_cache else args.cache
+    process_directory(args.input_dir, args.output_dir, args.workers, args.gain, cache_path, args.resampler)
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("用法：python filter_sound.py <输入目录> <输出目录>")
-        print("示例：python filter_sound.py ./samples ./filtered")
-        sys.exit(1)
-
-    process_directory(sys.argv[1], sys.argv[2])
+    main()
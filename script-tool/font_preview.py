@@ -3,15 +3,28 @@
 
 支持字体格式：TTF、OTF（含 CFF 轮廓）。预览页包含英文与中文示例句，便于快速查看字体效果。
 
+传入目录时生成字体样张目录（catalog）：目录下每个字体一页、一个书签，合并为一个 PDF。
+字体解析与子集化在进程池中并行完成，每个字体的单页 PDF 按「字体文件哈希」缓存，
+目录中新增或修改字体后重跑，只重新渲染变化的字体，其余直接复用缓存后合并。
+
+字形覆盖索引：--covers 文本 时先用 mmap 直接解析各字体的 cmap 表（不经 fpdf2），
+把每个字体覆盖的 Unicode 码位区间存入 SQLite 索引（按 路径+大小+mtime 与文件哈希复用），
+再查询「哪些字体覆盖了这段文字」，只为匹配的字体生成样张目录，或用 --list 只列出字体。
+
 命令行用法
 ---------
-    python font_preview.py <字体路径> [选项]
-    python -m font_preview <字体路径> [选项]
+    python font_preview.py <字体路径|字体目录> [选项]
+    python -m font_preview <字体路径|字体目录> [选项]
 
 选项
 ----
     --no-open           生成 PDF 后不自动打开
     -o, --output PATH   指定输出 PDF 路径（默认使用临时文件）
+    -j, --workers N     目录模式的并行进程数（默认 CPU 核数）
+    --cache-dir PATH    目录模式的缓存目录（默认 ~/.cache/font_preview）
+    --force             目录模式忽略缓存，全部重新渲染
+    --covers TEXT       目录模式只保留覆盖 TEXT 中全部字符的字体
+    --list              与 --covers 同用：只列出匹配的字体，不生成 PDF
 
 示例
 ----
@@ -21,19 +34,57 @@
     # 仅生成 PDF，不打开，并指定输出路径
     python font_preview.py ./MyFont.ttf --no-open -o preview.pdf
 
+    # 整个目录生成一份样张目录，8 进程并行
+    python font_preview.py ~/fonts/candidates --no-open -o catalog.pdf -j 8
+
+    # 列出覆盖「永和九年」的字体；再只为这些字体生成样张目录
+    python font_preview.py ~/fonts/candidates --covers "永和九年" --list
+    python font_preview.py ~/fonts/candidates --covers "永和九年" -o cjk.pdf
+
 依赖
 ----
     fpdf2：pip install fpdf2
+    目录模式另需 pypdf：pip install pypdf
 """
 import argparse
+import bisect
+import hashlib
+import mmap
 import os
+import sqlite3
+import struct
 import subprocess
 import sys
 import tempfile
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-from fpdf import FPDF
-from fpdf.enums import XPos, YPos
+# 目录模式收集的字体扩展名
+FONT_EXTENSIONS = (".ttf", ".otf")
+
+# 样张内容：(字号 pt, 示例文字)
+SPECIMEN = (
+    (11, "ABCDEFGHIJKLMNOPQRSTUVWXYZ abcdefghijklmnopqrstuvwxyz 0123456789 .,;:!?&@#%()"),
+    (36, "The quick brown fox"),
+    (24, "The quick brown fox jumps over the lazy dog"),
+    (12, "The quick brown fox jumps over the lazy dog"),
+    (36, "中文字体测试"),
+    (16, "永和九年，岁在癸丑，暮春之初，会于会稽山阴之兰亭"),
+)
+
+# 样张版本：修改 SPECIMEN 或页面布局时递增，使旧缓存失效
+SPECIMEN_VERSION = 1
+
+# 计算哈希时每次读取的字节数
+HASH_CHUNK = 1024 * 1024
+
+# 字形覆盖索引文件名（位于缓存目录下）
+COVERAGE_INDEX_NAME = "coverage.sqlite"
+
+# cmap 子表优先级：(platformID, encodingID) -> 越小越优先；(3, 0) 为符号字体，只在没有其他子表时使用
+CMAP_PREFERENCE = {(3, 10): 0, (0, 6): 1, (0, 4): 2, (3, 1): 3, (0, 3): 4, (0, 2): 5, (0, 1): 6, (0, 0): 7, (3, 0): 8}
 
 
 def _open_with_default_app(file_path: str) -> None:
@@ -75,6 +126,10 @@ def preview(
         fd, output_path = tempfile.mkstemp(suffix=".pdf", prefix="font_preview_")
         os.close(fd)
 
+    # fpdf2 在用到时才导入，保证 --help 启动足够快
+    from fpdf import FPDF
+    from fpdf.enums import XPos, YPos
+
     # 使用 fpdf2 生成单页 PDF：注册字体、写两行示例文字后输出
     pdf = FPDF()
     pdf.add_page()
@@ -91,15 +146,484 @@ def preview(
     return output_path
 
 
+def _default_cache_dir() -> Path:
+    """默认缓存目录：$XDG_CACHE_HOME/font_preview，未设置时为 ~/.cache/font_preview。"""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "font_preview"
+
+
+def _collect_fonts(font_dir: Path) -> list:
+    """递归收集目录下的字体文件，按相对路径排序。"""
+    return sorted(
+        p for p in font_dir.rglob("*")
+        if p.is_file() and p.suffix.lower() in FONT_EXTENSIONS
+    )
+
+
+def _cmap_subtable(mm, base: int) -> int:
+    """在 sfnt 中找到 cmap 表，返回最优先的格式 4 / 12 Unicode 子表的绝对偏移。"""
+    (num_tables,) = struct.unpack_from(">H", mm, base + 4)
+    cmap = None
+    for i in range(num_tables):
+        tag, _, offset, _ = struct.unpack_from(">4sIII", mm, base + 12 + 16 * i)
+        if tag == b"cmap":
+            cmap = offset
+            break
+    if cmap is None:
+        raise ValueError("字体没有 cmap 表")
+
+    (count,) = struct.unpack_from(">H", mm, cmap + 2)
+    best = None
+    for i in range(count):
+        platform, encoding, offset = struct.unpack_from(">HHI", mm, cmap + 4 + 8 * i)
+        rank = CMAP_PREFERENCE.get((platform, encoding))
+        if rank is None:
+            continue
+        (fmt,) = struct.unpack_from(">H", mm, cmap + offset)
+        if fmt not in (4, 12):
+            continue
+        # 同一编码下格式 12（32 位码位）优先于格式 4
+        key = (rank, fmt != 12)
+        if best is None or key < best[0]:
+            best = (key, cmap + offset)
+    if best is None:
+        raise ValueError("字体没有可识别的 Unicode cmap 子表（格式 4 / 12）")
+    return best[1]
+
+
+def _uint16_array(mm, offset: int, count: int) -> array:
+    """从 mmap 读取 count 个大端 uint16。"""
+    values = array("H", mm[offset:offset + 2 * count])
+    if sys.byteorder == "little":
+        values.byteswap()
+    return values
+
+
+def _cmap_format4(mm, sub: int) -> list:
+    """格式 4（分段映射，BMP）：逐段计算，字形号为 0 的码位视为未覆盖。"""
+    (seg_x2,) = struct.unpack_from(">H", mm, sub + 6)
+    segs = seg_x2 // 2
+    ends = _uint16_array(mm, sub + 14, segs)
+    starts = _uint16_array(mm, sub + 16 + seg_x2, segs)
+    deltas = _uint16_array(mm, sub + 16 + 2 * seg_x2, segs)
+    range_base = sub + 16 + 3 * seg_x2
+    range_offsets = _uint16_array(mm, range_base, segs)
+
+    ranges = []
+    for i in range(segs):
+        start, end, delta, ro = starts[i], ends[i], deltas[i], range_offsets[i]
+        if start == 0xFFFF or start > end:
+            continue
+        if ro == 0:
+            # 字形号 = (码位 + delta) mod 65536，整段只有一个码位可能落到 0
+            hole = -delta & 0xFFFF
+            if start <= hole <= end:
+                if hole > start:
+                    ranges.append((start, hole - 1))
+                if hole < end:
+                    ranges.append((hole + 1, end))
+            else:
+                ranges.append((start, end))
+            continue
+        # 经 glyphIdArray 间接映射：地址相对于 idRangeOffset[i] 自身
+        glyphs = _uint16_array(mm, range_base + 2 * i + ro, end - start + 1)
+        run = None
+        for code, glyph in enumerate(glyphs, start):
+            if glyph and (glyph + delta) & 0xFFFF:
+                if run is None:
+                    run = code
+            elif run is not None:
+                ranges.append((run, code - 1))
+                run = None
+        if run is not None:
+            ranges.append((run, end))
+    return ranges
+
+
+def _cmap_format12(mm, sub: int) -> list:
+    """格式 12（分段覆盖，32 位码位）：每组 (起始码位, 结束码位, 起始字形号)。"""
+    (groups,) = struct.unpack_from(">I", mm, sub + 12)
+    ranges = []
+    for start, end, glyph in struct.iter_unpack(">III", mm[sub + 16:sub + 16 + 12 * groups]):
+        # 起始字形号为 0 时该组第一个码位映射到 .notdef
+        if glyph == 0:
+            start += 1
+        if start <= end:
+            ranges.append((start, end))
+    return ranges
+
+
+def _merge_ranges(ranges: list) -> list:
+    """排序并合并重叠或相邻的码位区间。"""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def font_coverage(font_path: str) -> tuple:
+    """
+    Parse a font's cmap table via mmap and return its Unicode coverage.
+
+    Only the sfnt table directory and the chosen cmap subtable are read; glyph outlines
+    are never touched. For .ttc collections the first font is used.
+
+    Args:
+        font_path: Path to the font file.
+
+    Returns:
+        (sha256 hex digest of the file, sorted list of inclusive (start, end) code-point ranges)
+
+    Raises:
+        ValueError: If the file is not an sfnt font or has no Unicode cmap subtable.
+    """
+    with open(font_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < 12:
+            raise ValueError("文件过小，不是有效的字体")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            digest = hashlib.sha256(mm).hexdigest()
+            base = 0
+            if mm[:4] == b"ttcf":
+                (base,) = struct.unpack_from(">I", mm, 12)
+            if mm[base:base + 4] not in (b"\x00\x01\x00\x00", b"OTTO", b"true"):
+                raise ValueError("不是 TrueType / OpenType 字体")
+            try:
+                sub = _cmap_subtable(mm, base)
+                (fmt,) = struct.unpack_from(">H", mm, sub)
+                parse = _cmap_format12 if fmt == 12 else _cmap_format4
+                return digest, _merge_ranges(parse(mm, sub))
+            except struct.error:
+                raise ValueError("cmap 表被截断") from None
+
+
+def _scan_font(path: str) -> tuple:
+    """在工作进程中解析单个字体：返回 (路径, 哈希, 区间, 错误信息)。"""
+    try:
+        digest, ranges = font_coverage(path)
+        return path, digest, ranges, None
+    except (OSError, ValueError) as e:
+        return path, None, None, f"{type(e).__name__}: {e}"
+
+
+class CoverageIndex:
+    """
+    字形覆盖的 SQLite 持久化索引。
+
+    fonts 表以绝对路径为主键，记录文件大小、mtime（纳秒）与 SHA-256；coverage 表以
+    SHA-256 为主键保存码位区间（本机字节序的 uint32 起止对）。大小与 mtime 都没变的
+    字体不再打开；内容相同的字体（复制、改名）共用一份区间记录。
+    """
+
+    def __init__(self, db_path):
+        self.conn = sqlite3.connect(os.path.expanduser(db_path))
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS fonts ("
+            " path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL,"
+            " sha256 TEXT, error TEXT)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS coverage ("
+            " sha256 TEXT PRIMARY KEY, codepoints INTEGER NOT NULL, ranges BLOB NOT NULL)"
+        )
+
+    def _load(self, root) -> dict:
+        """读取 root 目录下的全部字体记录：{绝对路径: (size, mtime_ns)}。"""
+        prefix = os.path.join(os.path.abspath(root), "")
+        rows = self.conn.execute(
+            "SELECT path, size, mtime_ns FROM fonts WHERE substr(path, 1, ?) = ?",
+            (len(prefix), prefix),
+        )
+        return {path: (size, mtime_ns) for path, size, mtime_ns in rows}
+
+    def update(self, root, fonts, workers=None) -> dict:
+        """
+        使 root 目录下的索引与 fonts 一致：解析新增或变化的字体，删除已不存在的记录。
+
+        :return: 统计 {"parsed": 解析数, "reused": 复用数, "failed": 失败数}
+        """
+        known = self._load(root)
+        stale = []
+        rows = []
+        for font in fonts:
+            path = os.path.abspath(font)
+            st = os.stat(path)
+            if known.pop(path, None) == (st.st_size, st.st_mtime_ns):
+                continue
+            stale.append(path)
+            rows.append((path, st.st_size, st.st_mtime_ns))
+
+        stats = {"parsed": len(stale), "reused": len(fonts) - len(stale), "failed": 0}
+        if stale:
+            # 单个字体的解析只有几毫秒，只有一个时不值得启动进程池
+            if len(stale) == 1 or workers == 1:
+                results = [_scan_font(path) for path in stale]
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    results = list(pool.map(_scan_font, stale, chunksize=8))
+            fonts_rows = []
+            coverage_rows = []
+            for (path, size, mtime_ns), (_, digest, ranges, error) in zip(rows, results):
+                fonts_rows.append((path, size, mtime_ns, digest, error))
+                if error is not None:
+                    stats["failed"] += 1
+                    print(f"  跳过: {path} - {error}", file=sys.stderr)
+                    continue
+                blob = array("I", [v for pair in ranges for v in pair]).tobytes()
+                codepoints = sum(end - start + 1 for start, end in ranges)
+                coverage_rows.append((digest, codepoints, blob))
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO fonts (path, size, mtime_ns, sha256, error) VALUES (?, ?, ?, ?, ?)",
+                fonts_rows,
+            )
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO coverage (sha256, codepoints, ranges) VALUES (?, ?, ?)",
+                coverage_rows,
+            )
+        if known:
+            self.conn.executemany("DELETE FROM fonts WHERE path = ?", [(p,) for p in known])
+        if stale or known:
+            self.conn.execute("DELETE FROM coverage WHERE sha256 NOT IN (SELECT sha256 FROM fonts WHERE sha256 IS NOT NULL)")
+            self.conn.commit()
+        return stats
+
+    def covering(self, root, text: str) -> list:
+        """返回 root 目录下覆盖 text 中全部非空白字符的字体绝对路径（按路径排序）。"""
+        codepoints = sorted({ord(ch) for ch in text if not ch.isspace()})
+        prefix = os.path.join(os.path.abspath(root), "")
+        rows = self.conn.execute(
+            "SELECT f.path, c.ranges FROM fonts f JOIN coverage c ON f.sha256 = c.sha256"
+            " WHERE substr(f.path, 1, ?) = ? ORDER BY f.path",
+            (len(prefix), prefix),
+        )
+        matches = []
+        for path, blob in rows:
+            bounds = array("I")
+            bounds.frombytes(blob)
+            starts = bounds[0::2]
+            ends = bounds[1::2]
+            for cp in codepoints:
+                i = bisect.bisect_right(starts, cp) - 1
+                if i < 0 or ends[i] < cp:
+                    break
+            else:
+                matches.append(path)
+        return matches
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def find_covering(
+    font_dir: str,
+    text: str,
+    *,
+    workers: int | None = None,
+    cache_dir: str | None = None,
+) -> list:
+    """
+    Return the fonts under a directory whose cmap covers every non-space character of text.
+
+    The persistent coverage index in the cache directory is brought up to date first;
+    only fonts that are new or changed since the last run are parsed.
+
+    Args:
+        font_dir: Directory searched recursively for .ttf / .otf files.
+        text: Characters that must all be covered.
+        workers: Number of worker processes for parsing changed fonts (default: CPU count).
+        cache_dir: Directory holding the index (default: ~/.cache/font_preview).
+
+    Returns:
+        Sorted list of matching font paths.
+    """
+    root = Path(font_dir)
+    if not root.is_dir():
+        raise NotADirectoryError(f"Font directory not found: {font_dir}")
+    cache = Path(cache_dir) if cache_dir else _default_cache_dir()
+    cache.mkdir(parents=True, exist_ok=True)
+    fonts = _collect_fonts(root)
+
+    index = CoverageIndex(cache / COVERAGE_INDEX_NAME)
+    try:
+        t0 = time.perf_counter()
+        stats = index.update(root, fonts, workers)
+        t1 = time.perf_counter()
+        matches = index.covering(root, text)
+        t2 = time.perf_counter()
+    finally:
+        index.close()
+    chars = len({ch for ch in text if not ch.isspace()})
+    print(
+        f"覆盖索引：字体 {len(fonts)} 个，解析 {stats['parsed']}，复用 {stats['reused']}，"
+        f"失败 {stats['failed']}（{(t1 - t0) * 1000:.0f} ms）；"
+        f"覆盖全部 {chars} 个字符的字体 {len(matches)} 个（查询 {(t2 - t1) * 1000:.1f} ms）",
+        file=sys.stderr,
+    )
+    return matches
+
+
+def _section_key(font_path: str, label: str) -> str:
+    """缓存键：字体文件内容、页眉文字与样张版本的 SHA-256。"""
+    h = hashlib.sha256(f"{SPECIMEN_VERSION}\0{label}\0".encode("utf-8"))
+    with open(font_path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_CHUNK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _render_section(font_path: str, label: str, output_path: str) -> None:
+    """渲染单个字体的样张页：页眉为相对路径，其下按 SPECIMEN 逐行排版。"""
+    import logging
+
+    from fpdf import FPDF
+    from fpdf.enums import XPos, YPos
+
+    # 西文字体缺中文字形等情况 fpdf2 会逐个字体告警，目录模式下只在样张上体现（显示为空）
+    logging.getLogger("fpdf").setLevel(logging.ERROR)
+
+    pdf = FPDF()
+    pdf.set_auto_page_break(True, margin=15)
+    pdf.add_page()
+    # 页眉用内置字体，文件名中的非 Latin-1 字符以 ? 代替
+    pdf.set_font("Helvetica", "B", 12)
+    header = label.encode("latin-1", "replace").decode("latin-1")
+    pdf.cell(0, 8, text=header, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    pdf.ln(4)
+    pdf.add_font("specimen", "", font_path)
+    for size, text in SPECIMEN:
+        pdf.set_font("specimen", size=size)
+        pdf.multi_cell(0, size * 0.5, text=text, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        pdf.ln(2)
+    pdf.output(output_path)
+
+
+def _render_cached(font_path: str, label: str, cache_dir: str, force: bool) -> tuple:
+    """
+    在工作进程中渲染单个字体的样张页；缓存命中时直接返回缓存文件。
+
+    单个字体解析失败不影响其他字体。
+    :return: (状态 rendered / cached / failed, 样张 PDF 路径或错误信息)
+    """
+    try:
+        cached = os.path.join(cache_dir, _section_key(font_path, label) + ".pdf")
+        if not force and os.path.isfile(cached):
+            return "cached", cached
+        # 先写临时文件再改名，并发或中断时缓存中不会出现半截文件
+        tmp = f"{cached}.{os.getpid()}.tmp"
+        try:
+            _render_section(font_path, label, tmp)
+            os.replace(tmp, cached)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        return "rendered", cached
+    except Exception as e:
+        return "failed", f"{type(e).__name__}: {e}"
+
+
+def catalog(
+    font_dir: str,
+    output_path: str | None = None,
+    *,
+    open_file: bool = True,
+    workers: int | None = None,
+    cache_dir: str | None = None,
+    force: bool = False,
+    covers: str | None = None,
+) -> str:
+    """
+    Generate one specimen catalog PDF for every font under a directory.
+
+    Each font gets its own page and bookmark. Pages are rendered in a process pool
+    and cached by font file hash, so re-running after adding a font renders only that font.
+
+    Args:
+        font_dir: Directory searched recursively for .ttf / .otf files.
+        output_path: Where to write the PDF. If None, uses a temporary file.
+        open_file: Whether to open the generated PDF with the default application.
+        workers: Number of worker processes (default: CPU count).
+        cache_dir: Directory for cached per-font pages (default: ~/.cache/font_preview).
+        force: Re-render every font, ignoring the cache.
+        covers: If given, only fonts whose cmap covers every non-space character of this
+            text are included (see find_covering).
+
+    Returns:
+        The path to the generated PDF file.
+    """
+    root = Path(font_dir)
+    if not root.is_dir():
+        raise NotADirectoryError(f"Font directory not found: {font_dir}")
+    fonts = _collect_fonts(root)
+    if not fonts:
+        raise FileNotFoundError(f"No .ttf/.otf fonts found in: {font_dir}")
+    if covers is not None:
+        matching = set(find_covering(font_dir, covers, workers=workers, cache_dir=cache_dir))
+        fonts = [p for p in fonts if os.path.abspath(p) in matching]
+        if not fonts:
+            raise FileNotFoundError(f"No fonts in {font_dir} cover all characters of: {covers}")
+
+    # pypdf 只有目录模式需要，缺失时在渲染前就报错
+    try:
+        from pypdf import PdfWriter
+    except ImportError:
+        raise RuntimeError("目录模式需要 pypdf：pip install pypdf") from None
+
+    cache = Path(cache_dir) if cache_dir else _default_cache_dir()
+    cache.mkdir(parents=True, exist_ok=True)
+    labels = [p.relative_to(root).as_posix() for p in fonts]
+
+    counts = {"rendered": 0, "cached": 0, "failed": 0}
+    sections = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(
+            _render_cached,
+            [str(p) for p in fonts],
+            labels,
+            [str(cache)] * len(fonts),
+            [force] * len(fonts),
+        )
+        for label, (status, value) in zip(labels, results):
+            counts[status] += 1
+            if status == "failed":
+                print(f"  跳过: {label} - {value}", file=sys.stderr)
+            else:
+                sections.append((label, value))
+    if not sections:
+        raise RuntimeError("所有字体均渲染失败")
+
+    if output_path is None:
+        fd, output_path = tempfile.mkstemp(suffix=".pdf", prefix="font_catalog_")
+        os.close(fd)
+
+    # 按相对路径顺序合并，每个字体一个书签
+    writer = PdfWriter()
+    for label, section in sections:
+        writer.append(section, outline_item=label)
+    with open(output_path, "wb") as f:
+        writer.write(f)
+
+    print(
+        f"字体 {len(fonts)} 个：渲染 {counts['rendered']}，缓存 {counts['cached']}，"
+        f"失败 {counts['failed']}（缓存目录 {cache}）",
+        file=sys.stderr,
+    )
+    if open_file:
+        _open_with_default_app(output_path)
+    return output_path
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(
-        description="Generate a PDF preview for a font file and open it.",
+        description="Generate a PDF preview for a font file (or a catalog for a font directory) and open it.",
         prog="font_preview",
     )
     parser.add_argument(
         "font_path",
         type=Path,
-        help="Path to the font file (.ttf or .otf)",
+        help="Path to the font file (.ttf or .otf), or a directory of fonts",
     )
     parser.add_argument(
         "--no-open",
@@ -113,11 +637,77 @@ def main() -> None:
         default=None,
         help="Output PDF path (default: temporary file)",
     )
+    parser.add_argument(
+        "-j", "--workers",
+        type=int,
+        default=None,
+        help="Directory mode: number of worker processes (default: CPU count)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=None,
+        help="Directory mode: cache for per-font pages (default: ~/.cache/font_preview)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Directory mode: ignore the cache and re-render every font",
+    )
+    parser.add_argument(
+        "--covers",
+        metavar="TEXT",
+        default=None,
+        help="Directory mode: only fonts covering every character of TEXT (uses the glyph-coverage index)",
+    )
+    parser.add_argument(
+        "--list",
+        action="store_true",
+        help="With --covers: print the matching font paths instead of generating a PDF",
+    )
     args = parser.parse_args()
 
     if not args.font_path.exists():
         print(f"Error: Font file not found: {args.font_path}", file=sys.stderr)
         sys.exit(1)
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be a positive integer")
+    if args.covers is not None and not args.font_path.is_dir():
+        parser.error("--covers requires a font directory")
+    if args.list and args.covers is None:
+        parser.error("--list requires --covers")
+
+    if args.list:
+        try:
+            matches = find_covering(
+                str(args.font_path),
+                args.covers,
+                workers=args.workers,
+                cache_dir=str(args.cache_dir) if args.cache_dir else None,
+            )
+        except OSError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        for path in matches:
+            print(path)
+        sys.exit(0 if matches else 1)
+
+    if args.font_path.is_dir():
+        try:
+            out_path = catalog(
+                str(args.font_path),
+                output_path=str(args.output_path) if args.output_path else None,
+                open_file=not args.no_open,
+                workers=args.workers,
+                cache_dir=str(args.cache_dir) if args.cache_dir else None,
+                force=args.force,
+                covers=args.covers,
+            )
+        except (OSError, RuntimeError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(out_path)
+        return
 
     out_path = preview(
         str(args.font_path),
@@ -7,47 +7,131 @@
     python image2thumbnail.py icon.png
     python image2thumbnail.py photo.jpg -o thumb.jpg -W 120 -H 120 -m contain
 
+多尺寸批量输出（只解码一次，按尺寸从大到小逐级缩放）:
+    python image2thumbnail.py icon.png --sizes 58,120,180 -o ./icons
+    python image2thumbnail.py icon.png --icon-set ios -o ./AppIcon --workers 4
+
 缩放模式 (-m):
     cover   — 等比缩放后居中裁剪，铺满目标尺寸（默认，适合图标）
     contain — 完整显示原图，不足处透明留白（输出 PNG/WebP 时保留透明）
     stretch — 非等比拉伸至目标宽高
+
+大图缩小时默认先预缩：JPEG 用 draft 模式在 DCT 阶段按 1/2、1/4、1/8 解码，
+再用 Image.reduce 做整数倍盒式缩小，保留至少 2 倍余量后才做 LANCZOS。
+可用 --no-preshrink 关闭，用 --verify 与完整解码的结果对比耗时与 PSNR。
+
+动图（GIF / APNG / 动态 WebP）输出为 .gif、.png、.webp 时逐帧流式处理：
+每帧解码、缩放后立即编码写出，保留帧时长与处置方式，内存中只有少量帧。
+可用 --max-fps 限制帧率、--max-bytes 限制文件大小，超出时合并（丢弃）帧:
+    python image2thumbnail.py loading.gif -W 120 --max-fps 15
+    python image2thumbnail.py sticker.webp -o sticker_s.webp -W 160 --max-bytes 200000
+
+输入、输出也可以是 .rgba 未压缩中间格式（见 raw_image.py），在工具链中间传递时省去压缩与解压:
+    python image2thumbnail.py cut.rgba -W 512 -o small.rgba
 """
 
 from __future__ import annotations
 
 import argparse
+import io
+import math
+import os
+import struct
 import sys
+import tempfile
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 try:
-    from PIL import Image, ImageOps
+    from PIL import Image, ImageChops, ImageStat
 except ImportError:
     print("请先安装 Pillow: pip install Pillow", file=sys.stderr)
     sys.exit(1)
 
+from raw_image import is_raw_path, open_image, write_raw
 
-def resize_to_thumbnail(
+
+# 常用图标集：名称 -> [(相对输出路径, 宽, 高)]
+ICON_SETS = {
+    "ios": [
+        (f"AppIcon-{s}.png", s, s)
+        for s in (20, 29, 40, 58, 60, 76, 80, 87, 120, 152, 167, 180, 1024)
+    ],
+    "android": [
+        ("mipmap-mdpi/ic_launcher.png", 48, 48),
+        ("mipmap-hdpi/ic_launcher.png", 72, 72),
+        ("mipmap-xhdpi/ic_launcher.png", 96, 96),
+        ("mipmap-xxhdpi/ic_launcher.png", 144, 144),
+        ("mipmap-xxxhdpi/ic_launcher.png", 192, 192),
+        ("playstore-icon.png", 512, 512),
+    ],
+}
+
+
+# 预缩后至少保留「目标尺寸 × 该倍数」的像素，再交给 LANCZOS（与 Image.thumbnail 默认一致）
+REDUCING_GAP = 2.0
+
+
+def _open_source(
     src: Path,
-    dst: Path,
-    width: int,
-    height: int,
-    mode: str,
-) -> None:
-    im = Image.open(src)
+    target: tuple | None = None,
+    fit_mode: str = "cover",
+    preshrink: bool = True,
+) -> Image.Image:
+    """
+    打开源图并统一模式；给出 target=(宽, 高) 且 preshrink 时，JPEG 按目标尺寸缩小解码。
+
+    draft 让 libjpeg 在 DCT 阶段直接按 1/2～1/8 解码，结果不小于所需尺寸的
+    REDUCING_GAP 倍；其余格式的整数倍预缩由 _fit 中 resize 的 reducing_gap 完成。
+    """
+    im = open_image(src)
+    if target is not None and preshrink:
+        scale = _required_scale(im.size, target[0], target[1], fit_mode)
+        if scale * REDUCING_GAP < 1:
+            im.draft(None, (
+                math.ceil(im.width * scale * REDUCING_GAP),
+                math.ceil(im.height * scale * REDUCING_GAP),
+            ))
+
     # 非常见模式先转 RGBA，调色板图单独转 RGBA 以保留/处理透明
     if im.mode not in ("RGB", "RGBA", "L", "LA", "P"):
         im = im.convert("RGBA")
     elif im.mode == "P":
         im = im.convert("RGBA")
+    return im
+
 
+def _fit(
+    im: Image.Image,
+    width: int,
+    height: int,
+    mode: str,
+    reducing_gap: float | None = None,
+) -> Image.Image:
+    """
+    按 mode 缩放到 (width, height)。
+
+    cover/contain 的几何计算与 ImageOps.fit / ImageOps.contain 相同；
+    reducing_gap 不为 None 时，resize 会先用 Image.reduce 按整数倍缩小
+    （按精确的源区域 box，不引入亚像素偏移），再做 LANCZOS。
+    """
     size = (width, height)
     resample = Image.Resampling.LANCZOS
 
     if mode == "stretch":
-        out = im.resize(size, resample=resample)
+        out = im.resize(size, resample=resample, reducing_gap=reducing_gap)
     elif mode == "contain":
         # 缩小到能放进 size 的最大尺寸，再居中贴到透明画布上
-        out = ImageOps.contain(im, size, method=resample)
+        im_ratio = im.width / im.height
+        if im_ratio > width / height:
+            inner = (width, round(im.height / im.width * width))
+        elif im_ratio < width / height:
+            inner = (round(im_ratio * height), height)
+        else:
+            inner = size
+        out = im.resize(inner, resample=resample, reducing_gap=reducing_gap)
         canvas = Image.new("RGBA", size, (0, 0, 0, 0))
         x = (width - out.width) // 2
         y = (height - out.height) // 2
@@ -56,11 +140,25 @@ def resize_to_thumbnail(
         canvas.paste(out, (x, y))
         out = canvas
     elif mode == "cover":
-        out = ImageOps.fit(im, size, method=resample, centering=(0.5, 0.5))
+        # 从源图居中截取与目标同宽高比的区域，再缩放到目标尺寸
+        if im.width / im.height >= width / height:
+            crop_w, crop_h = width / height * im.height, im.height
+        else:
+            crop_w, crop_h = im.width, im.width * height / width
+        left = (im.width - crop_w) / 2
+        top = (im.height - crop_h) / 2
+        box = (left, top, left + crop_w, top + crop_h)
+        out = im.resize(size, resample=resample, box=box, reducing_gap=reducing_gap)
     else:
         raise ValueError(f"未知模式: {mode}")
+    return out
+
 
+def _save(out: Image.Image, dst: Path) -> None:
     dst.parent.mkdir(parents=True, exist_ok=True)
+    if is_raw_path(dst):
+        write_raw(out, dst)
+        return
     ext = dst.suffix.lower()
     save_kw: dict = {}
     if ext in (".jpg", ".jpeg"):
@@ -72,10 +170,498 @@ def resize_to_thumbnail(
     out.save(dst, **save_kw)
 
 
+# 帧处置方式（取 APNG dispose_op 的取值）：画下一帧前，本帧区域保留 / 清为透明 / 恢复为上一状态
+DISPOSE_NONE = 0
+DISPOSE_BACKGROUND = 1
+DISPOSE_PREVIOUS = 2
+
+# GIF disposal_method -> 上述取值（0 未指定按保留处理），以及反向映射
+_GIF_TO_DISPOSE = {0: DISPOSE_NONE, 1: DISPOSE_NONE, 2: DISPOSE_BACKGROUND, 3: DISPOSE_PREVIOUS}
+_DISPOSE_TO_GIF = {DISPOSE_NONE: 1, DISPOSE_BACKGROUND: 2, DISPOSE_PREVIOUS: 3}
+
+# 动态 WebP 的有损质量（与 _save 中静态 WebP 一致）
+WEBP_QUALITY = 90
+
+
+def _png_chunk(chunk_type: bytes, data: bytes) -> bytes:
+    """一个 PNG 块：长度 + 类型 + 数据 + CRC。"""
+    crc = zlib.crc32(data, zlib.crc32(chunk_type)) & 0xFFFFFFFF
+    return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", crc)
+
+
+class _GifWriter:
+    """
+    逐帧写 GIF：每帧单独量化并带局部调色板，写完即丢弃。
+
+    写入的都是完整画布的帧。GIF 没有「替换」混合方式，下一帧含透明像素时，
+    本帧必须处置为背景，否则会从下一帧的透明处透出来；因此保留一帧待写，
+    看到下一帧后再决定本帧的处置方式。每帧量化为 255 色，索引 255 留作透明色：
+    处置为背景的帧即使不透明也声明它，Pillow 等按「帧透明色」而不是背景色
+    还原的解码器才会清成透明。
+    """
+
+    def __init__(self, fp, size: tuple, loop):
+        from PIL import GifImagePlugin
+
+        self._getdata = GifImagePlugin.getdata
+        self.fp = fp
+        self._pending = None
+        self._first_transparent = None
+        # 逻辑屏幕描述符：无全局调色板
+        fp.write(b"GIF89a" + struct.pack("<HHBBB", size[0], size[1], 0, 0, 0))
+        if loop is not None:
+            fp.write(b"!\xff\x0bNETSCAPE2.0\x03\x01" + struct.pack("<H", loop) + b"\x00")
+
+    @staticmethod
+    def _quantize(frame: Image.Image):
+        """RGBA 帧 -> (P 模式帧, 是否含透明像素)；alpha < 128 的像素视为透明。"""
+        im = frame.convert("RGB").quantize(255)
+        palette = im.getpalette()
+        im.putpalette(palette + [0] * (768 - len(palette)))
+        mask = frame.getchannel("A").point(lambda a: 255 if a < 128 else 0)
+        if mask.getbbox() is None:
+            return im, False
+        im.paste(255, mask=mask)
+        return im, True
+
+    def _write(self, next_transparent: bool) -> None:
+        im, transparent, duration, disposal = self._pending
+        if next_transparent:
+            disposal = DISPOSE_BACKGROUND
+        params = {
+            "duration": duration,
+            "disposal": _DISPOSE_TO_GIF[disposal],
+            "include_color_table": True,
+        }
+        if transparent or disposal == DISPOSE_BACKGROUND:
+            params["transparency"] = 255
+        for data in self._getdata(im, **params):
+            self.fp.write(data)
+
+    def add(self, frame: Image.Image, duration: float, disposal: int) -> None:
+        im, transparent = self._quantize(frame)
+        if self._pending is None:
+            self._first_transparent = transparent
+        else:
+            self._write(transparent)
+        self._pending = (im, transparent, duration, disposal)
+
+    def close(self) -> None:
+        if self._pending is not None:
+            # 末帧之后循环回到首帧
+            self._write(self._first_transparent)
+        self.fp.write(b";")
+
+
+class _ApngWriter:
+    """
+    逐帧写 APNG：每帧用 Pillow 编码为 RGBA PNG，取出 IDAT 数据改写为 fdAT。
+
+    帧都是完整画布，blend_op 取 SOURCE（整块替换），处置方式原样保留。
+    帧数事先未知，acTL 先写占位，结束时回填。
+    """
+
+    def __init__(self, fp, size: tuple, loop):
+        self.fp = fp
+        self.size = size
+        self.loop = 1 if loop is None else loop
+        self.frames = 0
+        self._sequence = 0
+        fp.write(b"\x89PNG\r\n\x1a\n")
+        fp.write(_png_chunk(b"IHDR", struct.pack(">IIBBBBB", size[0], size[1], 8, 6, 0, 0, 0)))
+        self._actl_offset = fp.tell()
+        fp.write(_png_chunk(b"acTL", struct.pack(">II", 0, self.loop)))
+
+    @staticmethod
+    def _idat(frame: Image.Image) -> bytes:
+        buf = io.BytesIO()
+        frame.save(buf, "PNG")
+        data = buf.getvalue()
+        pos = 8
+        parts = []
+        while pos < len(data):
+            length, chunk_type = struct.unpack(">I4s", data[pos:pos + 8])
+            if chunk_type == b"IDAT":
+                parts.append(data[pos + 8:pos + 8 + length])
+            pos += 12 + length
+        return b"".join(parts)
+
+    def add(self, frame: Image.Image, duration: float, disposal: int) -> None:
+        fctl = struct.pack(
+            ">IIIIIHHBB",
+            self._sequence, self.size[0], self.size[1], 0, 0,
+            min(round(duration), 0xFFFF), 1000, disposal, 0,
+        )
+        self.fp.write(_png_chunk(b"fcTL", fctl))
+        self._sequence += 1
+        data = self._idat(frame)
+        if self.frames == 0:
+            self.fp.write(_png_chunk(b"IDAT", data))
+        else:
+            self.fp.write(_png_chunk(b"fdAT", struct.pack(">I", self._sequence) + data))
+            self._sequence += 1
+        self.frames += 1
+
+    def close(self) -> None:
+        self.fp.write(_png_chunk(b"IEND", b""))
+        end = self.fp.tell()
+        self.fp.seek(self._actl_offset)
+        self.fp.write(_png_chunk(b"acTL", struct.pack(">II", self.frames, self.loop)))
+        self.fp.seek(end)
+
+
+class _WebpWriter:
+    """
+    逐帧写动态 WebP：帧在加入时即由 WebPAnimEncoder 编码，只保留压缩后的数据；
+    处置方式由编码器按帧内容决定。
+
+    Pillow 公开的 save(save_all=True) 会先把 append_images 整个 list() 下来，
+    无法流式写出，所以这里直接调用它内部使用的同一个编码器（私有的 PIL._webp）。
+    该接口不存在或构造参数不兼容时退回公开 API：缓存全部缩略帧，close() 时一次性 save_all。
+    """
+
+    def __init__(self, fp, size: tuple, loop):
+        self.fp = fp
+        self.loop = 1 if loop is None else loop
+        self.timestamp = 0.0
+        self.enc = self._encoder(size, self.loop)
+        # 退回公开 API 时缓存的帧与时长（毫秒）
+        self._frames = []
+        self._durations = []
+
+    @staticmethod
+    def _encoder(size: tuple, loop: int):
+        try:
+            from PIL import _webp
+
+            # 参数依次为：尺寸、背景色、循环次数、minimize_size、kmin、kmax、allow_mixed、verbose
+            return _webp.WebPAnimEncoder(size, 0, loop, False, 3, 5, False, False)
+        except (ImportError, AttributeError, TypeError):
+            return None
+
+    def add(self, frame: Image.Image, duration: float, disposal: int) -> None:
+        if self.enc is None:
+            self._frames.append(frame)
+            self._durations.append(round(duration))
+            return
+        im = frame.getim() if hasattr(frame, "getim") else frame.im.id
+        self.enc.add(im, round(self.timestamp), False, WEBP_QUALITY, 100, 0)
+        self.timestamp += duration
+
+    def close(self) -> None:
+        if self.enc is None:
+            first, *rest = self._frames
+            first.save(
+                self.fp, "WEBP", save_all=True, append_images=rest,
+                duration=self._durations, loop=self.loop, quality=WEBP_QUALITY,
+            )
+            return
+        self.enc.add(None, round(self.timestamp), False, WEBP_QUALITY, 100, 0)
+        data = self.enc.assemble("", "", "")
+        if data is None:
+            raise OSError("WebP 编码失败")
+        self.fp.write(data)
+
+
+# 支持逐帧写出动画的输出扩展名
+ANIMATION_WRITERS = {
+    ".gif": _GifWriter,
+    ".png": _ApngWriter,
+    ".apng": _ApngWriter,
+    ".webp": _WebpWriter,
+}
+
+
+def is_animated(src: Path) -> bool:
+    """是否为多帧动图（只读文件头与帧索引，不解码像素）。"""
+    with open_image(src) as im:
+        return getattr(im, "n_frames", 1) > 1
+
+
+def _source_disposal(im: Image.Image) -> int:
+    """当前帧的处置方式：GIF 读 disposal_method，APNG 读 info["disposal"]。"""
+    if im.format == "GIF":
+        return _GIF_TO_DISPOSE.get(getattr(im, "disposal_method", 0), DISPOSE_NONE)
+    return int(im.info.get("disposal", DISPOSE_NONE))
+
+
+def _thumbnail_frames(
+    im: Image.Image,
+    width: int,
+    height: int,
+    mode: str,
+    max_fps: float | None,
+    step: int,
+):
+    """
+    逐帧解码、缩放，产出 (缩略帧, 时长毫秒, 处置方式)。
+
+    按源时间轴选帧：距上一个保留帧不足 1000/max_fps 毫秒的帧丢弃，
+    其余候选帧每 step 个保留一个；丢弃帧不缩放，时长并入前一个保留帧，
+    总时长不变。缩放后与前一帧完全相同的帧也合并。
+    Pillow 的 seek 会原地改写当前帧，所以保留帧在前进之前就缩放成新图；
+    任一时刻只持有源图当前帧（及 Pillow 合成所需的上一帧）和一个待产出的缩略帧。
+    """
+    min_interval = 1000.0 / max_fps if max_fps else 0.0
+    pending = None
+    clock = 0.0
+    next_due = 0.0
+    candidates = 0
+    for index in range(getattr(im, "n_frames", 1)):
+        im.seek(index)
+        # WebP 的帧时长在 load 时才填入 info；GIF/APNG 的增量帧也要依次解码才能合成
+        im.load()
+        duration = im.info.get("duration") or 0
+        keep = False
+        if pending is None or clock + 1e-6 >= next_due:
+            keep = candidates % step == 0
+            candidates += 1
+        if keep:
+            frame = im if im.mode in ("RGB", "RGBA") else im.convert("RGBA")
+            out = _fit(frame, width, height, mode, REDUCING_GAP)
+            if out.mode != "RGBA":
+                out = out.convert("RGBA")
+            if pending is not None and out.tobytes() == pending[0].tobytes():
+                keep = False
+        if keep:
+            if pending is not None:
+                yield tuple(pending)
+            pending = [out, duration, _source_disposal(im)]
+            next_due = clock + min_interval
+        else:
+            pending[1] += duration
+        clock += duration
+    if pending is not None:
+        yield tuple(pending)
+
+
+def _write_animation(
+    src: Path,
+    dst: Path,
+    width: int,
+    height: int,
+    mode: str,
+    max_fps: float | None,
+    step: int,
+) -> tuple:
+    """按 dst 扩展名逐帧写出缩略动画，返回 (源帧数, 输出帧数)。"""
+    writer_cls = ANIMATION_WRITERS[dst.suffix.lower()]
+    with Image.open(src) as im, open(dst, "wb") as fp:
+        writer = writer_cls(fp, (width, height), im.info.get("loop"))
+        frames = 0
+        for frame, duration, disposal in _thumbnail_frames(im, width, height, mode, max_fps, step):
+            writer.add(frame, duration, disposal)
+            frames += 1
+        writer.close()
+        return getattr(im, "n_frames", 1), frames
+
+
+def resize_animation(
+    src: Path,
+    dst: Path,
+    width: int,
+    height: int,
+    mode: str,
+    max_fps: float | None = None,
+    max_bytes: int | None = None,
+) -> dict:
+    """
+    动图逐帧缩放为缩略动画，输出格式由 dst 扩展名决定（.gif / .png / .webp）。
+
+    指定 max_bytes 时，结果超出上限就按「大小 / 上限」的比例加大抽帧间隔重写，
+    直到满足上限或只剩一帧。先写到同目录临时文件，完成后替换目标。
+
+    :return: {"frames": 源帧数, "kept": 输出帧数, "bytes": 文件大小, "passes": 编码轮数}
+    """
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(f".{dst.stem}.{os.getpid()}.tmp{dst.suffix}")
+    step = 1
+    passes = 0
+    try:
+        while True:
+            passes += 1
+            total, kept = _write_animation(src, tmp, width, height, mode, max_fps, step)
+            size = tmp.stat().st_size
+            if max_bytes is None or size <= max_bytes or kept <= 1:
+                break
+            step = max(step + 1, math.ceil(step * size / max_bytes))
+        os.replace(tmp, dst)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return {"frames": total, "kept": kept, "bytes": size, "passes": passes}
+
+
+def resize_to_thumbnail(
+    src: Path,
+    dst: Path,
+    width: int,
+    height: int,
+    mode: str,
+    preshrink: bool = True,
+    max_fps: float | None = None,
+    max_bytes: int | None = None,
+) -> None:
+    """
+    缩放为缩略图。源为动图且 dst 为 .gif/.png/.webp 时逐帧输出动画
+    （见 resize_animation），否则只取首帧。
+    """
+    if dst.suffix.lower() in ANIMATION_WRITERS and is_animated(src):
+        resize_animation(src, dst, width, height, mode, max_fps, max_bytes)
+        return
+    im = _open_source(src, (width, height), mode, preshrink)
+    _save(_fit(im, width, height, mode, REDUCING_GAP if preshrink else None), dst)
+
+
+def _psnr(a: Image.Image, b: Image.Image) -> float:
+    """两张同尺寸图片的 PSNR（dB），完全相同时返回 inf。"""
+    diff = ImageChops.difference(a.convert("RGBA"), b.convert("RGBA"))
+    mse = sum(v * v for v in ImageStat.Stat(diff).rms) / 4
+    return float("inf") if mse == 0 else 10 * math.log10(255 * 255 / mse)
+
+
+def compare_with_exact(src: Path, width: int, height: int, mode: str) -> None:
+    """
+    对比预缩路径与完整解码路径：打印解码尺寸、耗时与两者输出的 PSNR。
+
+    PSNR ≥ 40 dB 时肉眼基本无法区分。
+    """
+    results = {}
+    for preshrink in (False, True):
+        start = time.perf_counter()
+        im = _open_source(src, (width, height), mode, preshrink)
+        im.load()
+        decoded = im.size
+        out = _fit(im, width, height, mode, REDUCING_GAP if preshrink else None)
+        results[preshrink] = (time.perf_counter() - start, decoded, out)
+
+    exact_time, exact_size, exact_out = results[False]
+    fast_time, fast_size, fast_out = results[True]
+    print(f"完整路径: {exact_time:.3f} s，解码尺寸 {exact_size[0]}x{exact_size[1]}")
+    print(f"预缩路径: {fast_time:.3f} s，解码尺寸 {fast_size[0]}x{fast_size[1]}")
+    print(f"加速比: {exact_time / max(fast_time, 1e-9):.1f}x，PSNR: {_psnr(exact_out, fast_out):.2f} dB")
+
+
+def _fit_and_save(im: Image.Image, dst: Path, width: int, height: int, mode: str) -> None:
+    _save(_fit(im, width, height, mode), dst)
+
+
+def _required_scale(src_size: tuple, width: int, height: int, mode: str) -> float:
+    """目标尺寸对源图的最小等比缩放倍数：contain 只需放得下，cover/stretch 需两边都铺满。"""
+    sw, sh = src_size
+    if mode == "contain":
+        return min(width / sw, height / sh)
+    return max(width / sw, height / sh)
+
+
+def resize_to_sizes(
+    src: Path,
+    targets: list,
+    mode: str,
+    workers: int = 1,
+    preshrink: bool = True,
+) -> list:
+    """
+    源图只解码一次，输出多个尺寸。
+
+    预缩（draft/reduce）以最大的目标为准，保证所有尺寸都有足够余量。
+
+    目标按所需缩放倍数从大到小处理：每个目标先从「最接近且不小于所需尺寸」的
+    中间层等比缩小出一层新的中间层，再按 mode 裁剪/留白，所以每一层只对
+    上一层而不是原图做 LANCZOS。裁剪与编码放到线程池并行。
+
+    :param targets: [(输出路径, 宽, 高)]
+    :param workers: 编码线程数
+    :return: 输出路径列表（与 targets 顺序一致）
+    """
+    with open_image(src) as probe:
+        largest = max(targets, key=lambda t: _required_scale(probe.size, t[1], t[2], mode))
+    im = _open_source(src, (largest[1], largest[2]), mode, preshrink)
+    im.load()
+    src_size = im.size
+    # 等比缩放的金字塔层，按尺寸从大到小排列
+    levels = [im]
+    order = sorted(
+        range(len(targets)),
+        key=lambda i: -_required_scale(src_size, targets[i][1], targets[i][2], mode),
+    )
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = []
+        for i in order:
+            dst, width, height = targets[i]
+            scale = _required_scale(src_size, width, height, mode)
+            need = (max(1, math.ceil(src_size[0] * scale)), max(1, math.ceil(src_size[1] * scale)))
+            base = next(
+                lv for lv in reversed(levels)
+                if lv.width >= need[0] and lv.height >= need[1]
+            ) if scale < 1 else im
+            if scale < 1 and base.size != need:
+                gap = REDUCING_GAP if preshrink else None
+                base = base.resize(need, resample=Image.Resampling.LANCZOS, reducing_gap=gap)
+                levels.append(base)
+            futures.append(pool.submit(_fit_and_save, base, dst, width, height, mode))
+        for f in futures:
+            f.result()
+
+    return [dst for dst, _, _ in targets]
+
+
+def compare_with_per_call(src: Path, targets: list, mode: str, workers: int) -> None:
+    """
+    分别计时「逐个调用 resize_to_thumbnail」与「单次解码多尺寸」，打印节省的时间。
+
+    临时文件名带上目标序号：图标集里不同目录下的同名文件（如 mipmap-*/ic_launcher.png）
+    不能落到同一路径，否则并行写出时会争用同一个文件。
+    """
+    with tempfile.TemporaryDirectory(prefix="thumb_bench_") as tmp:
+        names = [f"{i}_{dst.name}" for i, (dst, _, _) in enumerate(targets)]
+        tmp_targets = [(Path(tmp) / "per_call" / name, w, h) for name, (_, w, h) in zip(names, targets)]
+        start = time.perf_counter()
+        for dst, w, h in tmp_targets:
+            resize_to_thumbnail(src, dst, w, h, mode)
+        per_call = time.perf_counter() - start
+
+        tmp_targets = [(Path(tmp) / "fan_out" / name, w, h) for name, (_, w, h) in zip(names, targets)]
+        start = time.perf_counter()
+        resize_to_sizes(src, tmp_targets, mode, workers)
+        fan_out = time.perf_counter() - start
+
+    print(f"逐个调用: {per_call:.3f} s（{len(targets)} 次解码）")
+    print(f"单次解码: {fan_out:.3f} s")
+    print(f"节省: {per_call - fan_out:.3f} s（{per_call / max(fan_out, 1e-9):.1f}x）")
+
+
+def parse_sizes(spec: str) -> list:
+    """解析 '58,120,180' 或 '1280x720,640x360' 为 [(宽, 高)]；单个数字表示正方形。"""
+    sizes = []
+    for item in spec.split(","):
+        item = item.strip().lower().replace("×", "x")
+        if not item:
+            continue
+        w_str, _, h_str = item.partition("x")
+        if not w_str.isdigit() or (h_str and not h_str.isdigit()):
+            raise ValueError(f"尺寸格式应为 58 或 1280x720，当前: {item!r}")
+        w = int(w_str)
+        h = int(h_str) if h_str else w
+        if w < 1 or h < 1:
+            raise ValueError(f"宽、高必须为正整数: {item!r}")
+        sizes.append((w, h))
+    if not sizes:
+        raise ValueError("--sizes 不能为空")
+    return sizes
+
+
 def main() -> None:
     p = argparse.ArgumentParser(
         description="将图片缩放到指定尺寸（如 1024×1024 → 58×58）。",
-        epilog="示例: %(prog)s app.png -W 58\n       %(prog)s logo.png -o out.png -m contain",
+        epilog=(
+            "示例: %(prog)s app.png -W 58\n"
+            "       %(prog)s logo.png -o out.png -m contain\n"
+            "       %(prog)s app.png --sizes 58,120,180 -o ./icons\n"
+            "       %(prog)s app.png --icon-set android -o ./res --workers 4 --compare\n"
+            "       %(prog)s loading.gif -W 120 --max-fps 15 --max-bytes 200000"
+        ),
         formatter_class=argparse.RawDescriptionHelpFormatter,
     )
     p.add_argument("input", type=Path, help="源图片路径（png、jpg、webp 等）")
@@ -84,13 +670,14 @@ def main() -> None:
         "--output",
         type=Path,
         default=None,
-        help="输出路径；默认在源文件同目录生成「原名_thumb.扩展名」",
+        help="输出路径；默认在源文件同目录生成「原名_thumb.扩展名」。"
+        "多尺寸模式下为输出目录，默认「原名_thumbs」",
     )
     p.add_argument(
         "-W",
         "--width",
         type=int,
-        default=58,
+        default=None,
         help="目标宽度，默认 58",
     )
     p.add_argument(
@@ -107,12 +694,98 @@ def main() -> None:
         default="cover",
         help="cover=裁剪填满；contain=完整放入可留白；stretch=拉伸变形",
     )
+    group = p.add_mutually_exclusive_group()
+    group.add_argument(
+        "--sizes",
+        default=None,
+        metavar="LIST",
+        help="多尺寸模式：逗号分隔的尺寸，如 58,120,180 或 1280x720,640x360",
+    )
+    group.add_argument(
+        "--icon-set",
+        choices=sorted(ICON_SETS),
+        default=None,
+        help="多尺寸模式：按预置图标集输出（ios=AppIcon 全尺寸，android=mipmap 各密度）",
+    )
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        metavar="N",
+        help="多尺寸模式的编码线程数，默认 1",
+    )
+    p.add_argument(
+        "--no-preshrink",
+        action="store_true",
+        help="关闭 JPEG draft / Image.reduce 预缩，始终完整解码后再 LANCZOS",
+    )
+    p.add_argument(
+        "--max-fps",
+        type=float,
+        default=None,
+        metavar="F",
+        help="动图：帧率上限，间隔过密的帧并入前一帧",
+    )
+    p.add_argument(
+        "--max-bytes",
+        type=int,
+        default=None,
+        metavar="N",
+        help="动图：输出文件字节上限，超出时加大抽帧间隔重新编码",
+    )
+    p.add_argument(
+        "--verify",
+        action="store_true",
+        help="单尺寸模式：额外对比完整解码路径，打印耗时与 PSNR",
+    )
+    p.add_argument(
+        "--compare",
+        action="store_true",
+        help="多尺寸模式：额外计时逐个调用的旧路径，报告节省的时间",
+    )
     args = p.parse_args()
     src = args.input.expanduser().resolve()
     if not src.is_file():
         print(f"文件不存在: {src}", file=sys.stderr)
         sys.exit(1)
 
+    if args.max_fps is not None and args.max_fps <= 0:
+        p.error("--max-fps 必须为正数")
+    if args.max_bytes is not None and args.max_bytes < 1:
+        p.error("--max-bytes 必须为正整数")
+
+    if args.sizes is not None or args.icon_set is not None:
+        if args.width is not None or args.height is not None:
+            p.error("多尺寸模式（--sizes / --icon-set）不能与 -W/-H 同时使用")
+        if args.max_fps is not None or args.max_bytes is not None:
+            p.error("--max-fps / --max-bytes 仅用于单尺寸模式")
+        if args.workers < 1:
+            p.error("--workers 必须为正整数")
+        if args.output is not None:
+            out_dir = args.output.expanduser().resolve()
+        else:
+            out_dir = src.with_name(f"{src.stem}_thumbs")
+        if args.icon_set is not None:
+            targets = [(out_dir / name, w, h) for name, w, h in ICON_SETS[args.icon_set]]
+        else:
+            try:
+                sizes = parse_sizes(args.sizes)
+            except ValueError as e:
+                p.error(str(e))
+            targets = [(out_dir / f"{src.stem}_{w}x{h}{src.suffix}", w, h) for w, h in sizes]
+
+        start = time.perf_counter()
+        resize_to_sizes(src, targets, args.mode, args.workers, preshrink=not args.no_preshrink)
+        elapsed = time.perf_counter() - start
+        for dst, _, _ in targets:
+            print(f"已写入: {dst}")
+        print(f"共 {len(targets)} 个尺寸，耗时 {elapsed:.3f} s")
+        if args.compare:
+            compare_with_per_call(src, targets, args.mode, args.workers)
+        return
+
+    if args.width is None:
+        args.width = 58
     h = args.height if args.height is not None else args.width
     if args.width < 1 or h < 1:
         print("宽、高必须为正整数", file=sys.stderr)
@@ -123,8 +796,25 @@ def main() -> None:
     else:
         dst = src.with_name(f"{src.stem}_thumb{src.suffix}")
 
-    resize_to_thumbnail(src, dst, args.width, h, args.mode)
+    if dst.suffix.lower() in ANIMATION_WRITERS and is_animated(src):
+        if args.verify:
+            p.error("--verify 不支持动图")
+        start = time.perf_counter()
+        stats = resize_animation(src, dst, args.width, h, args.mode, args.max_fps, args.max_bytes)
+        elapsed = time.perf_counter() - start
+        print(f"已写入: {dst}")
+        print(
+            f"动图: {stats['frames']} 帧 -> {stats['kept']} 帧，{stats['bytes']} 字节，"
+            f"编码 {stats['passes']} 轮，耗时 {elapsed:.3f} s"
+        )
+        if args.max_bytes is not None and stats["bytes"] > args.max_bytes:
+            print(f"警告: 只剩 1 帧仍超出上限 {args.max_bytes} 字节", file=sys.stderr)
+        return
+
+    resize_to_thumbnail(src, dst, args.width, h, args.mode, preshrink=not args.no_preshrink)
     print(f"已写入: {dst}")
+    if args.verify:
+        compare_with_exact(src, args.width, h, args.mode)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+PNG / JPG 批量格式转换（并行、增量）
+
+在 png2jpg.py / jpg2png.py 的转换函数之上提供批量入口：接受目录、文件或
+glob 通配符，在进程池中并行转换，省去每个文件一次的解释器启动开销。
+
+- 原子写入：先写到目标目录下的临时文件，完成后 os.replace 覆盖目标，
+  中断时不会留下半截文件
+- 增量：清单文件（manifest）记录每个输出对应的源文件 SHA-256、大小、修改时间与
+  转换参数，重跑时源文件与参数都没变、输出仍在的文件直接跳过；大小和修改时间都没变时
+  不再读文件计算哈希。清单在转换过程中定期原子保存，中断后重跑不会重做已完成的文件
+- 结束时报告 文件/秒、输入与输出字节数
+- 可选查重（--dedupe）：按感知哈希找出近似重复的源图，只转换每组第一张，
+  其余跳过或硬链接到它的输出（见 image_dedupe.py）
+
+依赖：Python 3.10+，Pillow (PIL)
+用法：python image_convert_batch.py <输入...> --to jpg|png [-o 输出目录] [-j N]
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from image_dedupe import DEDUPE_LINK, add_dedupe_arguments, check_dedupe_arguments, find_duplicates, link_or_copy
+from jpg2png import jpg_to_png
+from png2jpg import png_to_jpg
+
+# 目标格式 -> (可接受的源扩展名, 输出扩展名)
+FORMATS = {
+    "jpg": ((".png",), ".jpg"),
+    "png": ((".jpg", ".jpeg"), ".png"),
+}
+
+# 默认清单文件名
+MANIFEST_NAME = ".image_convert_manifest.json"
+
+# 计算哈希时每次读取的字节数
+HASH_CHUNK = 1024 * 1024
+
+# 转换过程中保存清单的最小间隔（秒）；每完成一个文件都重写整个清单，大批量时代价是平方级
+MANIFEST_SAVE_INTERVAL = 2.0
+
+
+def file_sha256(path: str) -> str:
+    """流式计算文件 SHA-256。"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_CHUNK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def collect_jobs(
+    inputs: list[str],
+    to: str,
+    output_dir: Path | None,
+) -> list[tuple[str, str]]:
+    """
+    展开输入为 [(源文件, 输出文件)]。
+
+    目录递归收集匹配扩展名的文件，指定输出目录时保持相对目录结构；
+    单个文件与 glob 匹配到的文件直接放到输出目录下。未指定输出目录时输出到源文件旁。
+    """
+    src_exts, out_ext = FORMATS[to]
+    jobs = []
+    seen = set()
+
+    def add(src: Path, rel: Path) -> None:
+        src = src.resolve()
+        if src in seen or src.suffix.lower() not in src_exts:
+            return
+        seen.add(src)
+        base = output_dir / rel if output_dir is not None else src
+        jobs.append((str(src), str(base.with_suffix(out_ext))))
+
+    for item in inputs:
+        path = Path(item).expanduser()
+        if path.is_dir():
+            for src in sorted(path.rglob("*")):
+                if src.is_file():
+                    add(src, src.relative_to(path))
+        elif path.is_file():
+            add(path, Path(path.name))
+        else:
+            for match in sorted(glob.glob(os.path.expanduser(item), recursive=True)):
+                if os.path.isfile(match):
+                    add(Path(match), Path(os.path.basename(match)))
+    return jobs
+
+
+def convert_one(
+    src: str,
+    dst: str,
+    to: str,
+    params: dict,
+    previous: dict | None,
+) -> dict:
+    """
+    在工作进程中转换单个文件；源哈希、参数与上次一致且输出存在时跳过。
+
+    源文件大小与修改时间（纳秒）都与上次记录一致时直接沿用记录的哈希，不再读文件。
+
+    :param previous: 清单中该输出的上一条记录，没有则为 None
+    :return: 结果记录（status 为 converted / skipped / failed）
+    """
+    result = {"src": src, "dst": dst, "params": params, "bytes_in": 0, "bytes_out": 0}
+    try:
+        st = os.stat(src)
+        result["bytes_in"] = result["size"] = st.st_size
+        result["mtime_ns"] = st.st_mtime_ns
+        if (
+            previous is not None
+            and previous.get("size") == st.st_size
+            and previous.get("mtime_ns") == st.st_mtime_ns
+            and previous.get("sha256")
+        ):
+            digest = previous["sha256"]
+        else:
+            digest = file_sha256(src)
+        result["sha256"] = digest
+        if (
+            previous is not None
+            and previous.get("sha256") == digest
+            and previous.get("params") == params
+            and os.path.isfile(dst)
+        ):
+            result["status"] = "skipped"
+            result["bytes_out"] = os.path.getsize(dst)
+            return result
+
+        out_dir = os.path.dirname(dst)
+        os.makedirs(out_dir, exist_ok=True)
+        stem, ext = os.path.splitext(os.path.basename(dst))
+        tmp = os.path.join(out_dir, f".{stem}.{os.getpid()}.tmp{ext}")
+        try:
+            if to == "jpg":
+                png_to_jpg(src, tmp, quality=params["quality"], verbose=False)
+            else:
+                jpg_to_png(src, tmp, compression=params["compression"], verbose=False)
+            os.replace(tmp, dst)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        result["status"] = "converted"
+        result["bytes_out"] = os.path.getsize(dst)
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def load_manifest(path: Path) -> dict:
+    if not path.is_file():
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        print(f"警告: 清单文件无法读取，将全部重新转换: {path}", file=sys.stderr)
+        return {}
+
+
+def save_manifest(path: Path, manifest: dict) -> None:
+    """原子写入清单文件。"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def run_batch(
+    jobs: list[tuple[str, str]],
+    to: str,
+    params: dict,
+    manifest_path: Path,
+    workers: int | None = None,
+    force: bool = False,
+) -> dict:
+    """
+    并行执行转换并更新清单，返回统计信息。
+
+    清单每隔 MANIFEST_SAVE_INTERVAL 秒保存一次，结束（包括异常、Ctrl+C）时再保存一次。
+
+    :param force: 为 True 时忽略清单，全部重新转换
+    """
+    manifest = load_manifest(manifest_path)
+    previous = [None if force else manifest.get(dst) for _, dst in jobs]
+
+    stats = {"converted": 0, "skipped": 0, "failed": 0, "bytes_in": 0, "bytes_out": 0}
+    start = time.perf_counter()
+    saved_at = start
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(
+                convert_one,
+                [src for src, _ in jobs],
+                [dst for _, dst in jobs],
+                [to] * len(jobs),
+                [params] * len(jobs),
+                previous,
+                chunksize=8,
+            )
+            for r in results:
+                stats[r["status"]] += 1
+                if r["status"] == "failed":
+                    print(f"  失败: {r['src']} - {r['error']}", file=sys.stderr)
+                    continue
+                stats["bytes_in"] += r["bytes_in"]
+                stats["bytes_out"] += r["bytes_out"]
+                if r["status"] == "converted":
+                    print(f"  OK: {r['src']} -> {r['dst']}")
+                manifest[r["dst"]] = {
+                    "src": r["src"],
+                    "sha256": r["sha256"],
+                    "size": r["size"],
+                    "mtime_ns": r["mtime_ns"],
+                    "params": params,
+                }
+                now = time.perf_counter()
+                if now - saved_at >= MANIFEST_SAVE_INTERVAL:
+                    save_manifest(manifest_path, manifest)
+                    saved_at = now
+    finally:
+        save_manifest(manifest_path, manifest)
+    stats["elapsed"] = time.perf_counter() - start
+    return stats
+
+
+def dedupe_jobs(
+    jobs: list[tuple[str, str]],
+    radius: int,
+    index_path: Path | None,
+    workers: int | None,
+) -> tuple[list[tuple[str, str]], dict[str, str]]:
+    """
+    按源图的感知哈希去掉近似重复的任务。
+
+    :return: (保留的任务, {重复任务的输出: 代表任务的输出})
+    """
+    duplicates = find_duplicates([src for src, _ in jobs], radius, index_path, workers)
+    dst_of = dict(jobs)
+    kept = []
+    redirects = {}
+    for src, dst in jobs:
+        if src in duplicates:
+            original, distance = duplicates[src]
+            redirects[dst] = dst_of[original]
+            print(f"  近似重复: {src} ≈ {original}（距离 {distance}）")
+        else:
+            kept.append((src, dst))
+    return kept, redirects
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="批量并行转换 PNG→JPG 或 JPG→PNG，支持目录、glob 与增量跳过。",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+示例:
+  python image_convert_batch.py ./assets --to jpg -o ./assets_jpg
+  python image_convert_batch.py "shots/**/*.png" --to jpg -q 85 -j 8
+  python image_convert_batch.py ./photos --to png -c 9
+  python image_convert_batch.py ./assets --to jpg -o ./out --force
+  python image_convert_batch.py ./screenshots --to jpg -o ./out --dedupe link
+        """,
+    )
+    parser.add_argument("inputs", nargs="+", help="输入目录、文件或 glob 通配符（支持 **）")
+    parser.add_argument("--to", choices=sorted(FORMATS), required=True, help="目标格式：jpg 或 png")
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        default=None,
+        help="输出目录（目录输入保持相对结构）；默认输出到源文件旁",
+    )
+    parser.add_argument(
+        "-q",
+        "--quality",
+        type=int,
+        default=95,
+        metavar="N",
+        help="--to jpg 时的 JPEG 质量 1–100（默认 95）",
+    )
+    parser.add_argument(
+        "-c",
+        "--compression",
+        type=int,
+        default=6,
+        metavar="N",
+        help="--to png 时的 PNG 压缩级别 0–9（默认 6）",
+    )
+    parser.add_argument("-j", "--workers", type=int, default=None, help="并行进程数，默认 CPU 核数")
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        default=None,
+        help=f"清单文件路径；默认 输出目录/{MANIFEST_NAME}（未指定输出目录时为当前目录）",
+    )
+    parser.add_argument("--force", action="store_true", help="忽略清单，全部重新转换")
+    add_dedupe_arguments(parser)
+    args = parser.parse_args()
+
+    if not (1 <= args.quality <= 100):
+        parser.error("JPEG 质量必须在 1–100 之间")
+    if not (0 <= args.compression <= 9):
+        parser.error("压缩级别必须在 0–9 之间")
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers 必须为正整数")
+    check_dedupe_arguments(parser, args)
+
+    output_dir = args.output.expanduser().resolve() if args.output else None
+    jobs = collect_jobs(args.inputs, args.to, output_dir)
+    if not jobs:
+        print("错误: 没有找到可转换的文件", file=sys.stderr)
+        sys.exit(1)
+
+    params = {"quality": args.quality} if args.to == "jpg" else {"compression": args.compression}
+    if args.manifest is not None:
+        manifest_path = args.manifest.expanduser().resolve()
+    else:
+        manifest_path = (output_dir or Path.cwd()) / MANIFEST_NAME
+
+    print(f"共 {len(jobs)} 个文件，目标格式: {args.to}，清单: {manifest_path}")
+    total = len(jobs)
+    start = time.perf_counter()
+    redirects = {}
+    if args.dedupe:
+        jobs, redirects = dedupe_jobs(jobs, args.dedupe_radius, args.dedupe_index, args.workers)
+    stats = run_batch(jobs, args.to, params, manifest_path, args.workers, args.force)
+    linked = 0
+    if args.dedupe == DEDUPE_LINK:
+        for dst, original_dst in redirects.items():
+            if os.path.isfile(original_dst):
+                link_or_copy(original_dst, dst)
+                linked += 1
+
+    elapsed = time.perf_counter() - start
+    rate = total / elapsed if elapsed > 0 else 0.0
+    print()
+    print(f"完成: 转换 {stats['converted']}，跳过 {stats['skipped']}，失败 {stats['failed']}")
+    if redirects:
+        action = f"链接 {linked} 个" if args.dedupe == DEDUPE_LINK else "未输出"
+        print(f"近似重复: {len(redirects)} 个，{action}")
+    print(f"耗时: {elapsed:.2f} s（{rate:.1f} 文件/秒）")
+    print(f"输入: {stats['bytes_in'] / 1024 / 1024:.2f} MB，输出: {stats['bytes_out'] / 1024 / 1024:.2f} MB")
+    sys.exit(1 if stats["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+图片近似重复检测（感知哈希索引）
+
+截屏、素材目录里常有大量几乎相同的图片（同一页面多截了几次、只差状态栏时间），
+批量缩放、转码时每张都要完整解码和编码。本模块为图片计算 64 位 dHash，
+把结果存入磁盘索引，并按汉明距离快速找出近似重复，供批量工具跳过或直接复用结果。
+
+- 缩小解码：JPEG 用 draft 在 DCT 阶段按 1/8 解码，其他格式用 Image.reduce 整数倍缩小，
+  只需要 9×8 灰度图，不做完整分辨率的处理
+- 持久化：SQLite 索引按 (绝对路径, 大小, mtime) 复用哈希，重跑只计算新增或变化的图片；
+  计算在进程池中并行
+- 快速查找：多索引哈希（multi-index hashing）——64 位哈希切成 r+1 段（至多 5 段）分别建表，
+  距离不超过 r 的两个哈希至少有一段完全相同，只需在各段表中精确查找候选，
+  再校验完整的汉明距离；10 万张图的查重不做两两比较
+
+依赖：Python 3.10+，Pillow (PIL)
+用法：python image_dedupe.py <目录或文件...> [-r N] [--index PATH] [-j N] [--format text|json]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from pathlib import Path
+
+from PIL import Image
+
+# dHash 边长：比较 (HASH_SIZE+1)×HASH_SIZE 灰度图相邻像素，得到 HASH_SIZE² 位
+HASH_SIZE = 8
+HASH_BITS = HASH_SIZE * HASH_SIZE
+
+# Image.reduce 能直接处理的模式；其余（P、PA、1、I;16 等）先转 L 或 RGBA 再缩小
+_REDUCE_MODES = ("L", "LA", "RGB", "RGBA", "CMYK", "YCbCr", "I", "F")
+
+# 多索引哈希的最大分段数：段太短时每个桶里的候选过多
+MIH_MAX_SEGMENTS = 5
+
+# 默认近似重复阈值：汉明距离不超过该值视为重复（64 位中约 6%）
+DEFAULT_RADIUS = 4
+
+# 收集的图片扩展名
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".webp", ".bmp", ".gif")
+
+# 默认索引文件名（位于缓存目录下）
+INDEX_NAME = "dhash.sqlite"
+
+# 重复图片的处理方式：skip=不处理；link=复用代表图的输出（硬链接，失败时复制）
+DEDUPE_SKIP = "skip"
+DEDUPE_LINK = "link"
+DEDUPE_MODES = (DEDUPE_SKIP, DEDUPE_LINK)
+
+
+def default_index_path() -> Path:
+    """默认索引路径：$XDG_CACHE_HOME/image_dedupe/dhash.sqlite，未设置时在 ~/.cache 下。"""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "image_dedupe" / INDEX_NAME
+
+
+def dhash(path) -> int:
+    """
+    计算图片的 64 位 dHash（差值哈希）。
+
+    缩小为 9×8 灰度图后逐行比较相邻像素，左边比右边亮记 1。
+    JPEG 用 draft 直接按灰度、最多 1/8 解码；再在源模式下用 reduce 整数倍缩到约为目标的 8 倍，
+    缩小后才转灰度（或白底合成），最后一步 BOX 缩放。
+    除了解码本身，只有 reduce 不支持的模式（P、PA 等）要先在完整分辨率上转换。
+    """
+    width, height = HASH_SIZE + 1, HASH_SIZE
+    with Image.open(path) as src:
+        src.draft("L", (width * 8, height * 8))
+        transparent = src.mode in ("RGBA", "LA", "PA") or (src.mode == "P" and "transparency" in src.info)
+        img = src if src.mode in _REDUCE_MODES else src.convert("RGBA" if transparent else "L")
+        factor = min(img.width // (width * 8), img.height // (height * 8))
+        if factor > 1:
+            img = img.reduce(factor)
+        if transparent:
+            # 透明区域按白底计算，与批量工具导出 JPG 时的白底填充一致
+            bg = Image.new("RGBA", img.size, (255, 255, 255, 255))
+            img = Image.alpha_composite(bg, img.convert("RGBA")).convert("L")
+        else:
+            img = img.convert("L")
+    pixels = img.resize((width, height), Image.BOX).tobytes()
+    bits = 0
+    for y in range(height):
+        row = pixels[y * width:(y + 1) * width]
+        for x in range(HASH_SIZE):
+            bits = (bits << 1) | (row[x] > row[x + 1])
+    return bits
+
+
+def _to_signed(h: int) -> int:
+    """64 位无符号哈希 -> SQLite INTEGER（有符号 64 位）。"""
+    return h - (1 << 64) if h >= 1 << 63 else h
+
+
+def _hash_one(path: str) -> tuple[str, int | None, str | None]:
+    """在工作进程中计算单张图片的哈希：返回 (路径, 哈希, 错误信息)。"""
+    try:
+        return path, dhash(path), None
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {e}"
+
+
+class HashIndex:
+    """
+    dHash 的 SQLite 持久化索引。
+
+    以绝对路径为主键，同时记录文件大小与 mtime（纳秒）；两者都没变时直接复用
+    上次的哈希，不再打开文件。无法解码的图片记录错误，未变化前不再重试。
+    """
+
+    def __init__(self, db_path):
+        db_path = Path(os.path.expanduser(str(db_path)))
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(db_path))
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS hashes ("
+            " path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL,"
+            " dhash INTEGER, error TEXT)"
+        )
+
+    def hashes(self, paths: Iterable, workers: int | None = None) -> tuple[dict[str, int], dict]:
+        """
+        返回 {绝对路径: 哈希}；索引中没有或已变化的图片在进程池中重新计算并写回。
+
+        :return: (哈希表, 统计 {"hashed": 计算数, "reused": 复用数, "failed": 失败数})
+        """
+        stats = {"hashed": 0, "reused": 0, "failed": 0}
+        result = {}
+        stale = []
+        for p in paths:
+            path = os.path.abspath(p)
+            st = os.stat(path)
+            row = self.conn.execute(
+                "SELECT size, mtime_ns, dhash, error FROM hashes WHERE path = ?", (path,)
+            ).fetchone()
+            if row is not None and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+                stats["reused"] += 1
+                if row[2] is None:
+                    stats["failed"] += 1
+                else:
+                    result[path] = row[2] & ((1 << 64) - 1)
+                continue
+            stale.append((path, st.st_size, st.st_mtime_ns))
+
+        if stale:
+            names = [path for path, _, _ in stale]
+            if len(stale) == 1 or workers == 1:
+                computed = [_hash_one(path) for path in names]
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    computed = list(pool.map(_hash_one, names, chunksize=32))
+            rows = []
+            for (path, size, mtime_ns), (_, h, error) in zip(stale, computed):
+                stats["hashed"] += 1
+                if error is not None:
+                    stats["failed"] += 1
+                    print(f"  无法计算哈希: {path} - {error}", file=sys.stderr)
+                    rows.append((path, size, mtime_ns, None, error))
+                    continue
+                result[path] = h
+                rows.append((path, size, mtime_ns, _to_signed(h), None))
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO hashes (path, size, mtime_ns, dhash, error) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self.conn.commit()
+        return result, stats
+
+    def prune(self, root) -> int:
+        """删除 root 目录下已不存在的文件对应的记录，返回删除条数。"""
+        prefix = os.path.join(os.path.abspath(root), "")
+        rows = self.conn.execute(
+            "SELECT path FROM hashes WHERE substr(path, 1, ?) = ?", (len(prefix), prefix)
+        ).fetchall()
+        gone = [(path,) for (path,) in rows if not os.path.exists(path)]
+        self.conn.executemany("DELETE FROM hashes WHERE path = ?", gone)
+        self.conn.commit()
+        return len(gone)
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+class MultiIndex:
+    """
+    多索引哈希：按汉明距离查找近似哈希。
+
+    64 位哈希切成 m 段，每段一张 {段值: [编号]} 的表。由抽屉原理，距离不超过 r 的
+    两个哈希至少有一段的距离不超过 r // m。段数取 r + 1 时只需在各表中精确查找段值，
+    不必枚举邻居；但段越多每段越短、候选越多，因此段数不超过 MIH_MAX_SEGMENTS，
+    更大的 r 在每段内枚举 r // m 位以内的翻转。候选最后都按完整 64 位精确校验。
+    """
+
+    def __init__(self, radius: int = DEFAULT_RADIUS):
+        """:param radius: 之后查询使用的最大距离，决定分段方式"""
+        self.radius = radius
+        count = max(1, min(radius + 1, MIH_MAX_SEGMENTS))
+        # 尽量均分：前 HASH_BITS % count 段各多 1 位
+        widths = [HASH_BITS // count + (i < HASH_BITS % count) for i in range(count)]
+        shifts = [sum(widths[:i]) for i in range(count)]
+        self.segments = [(shift, (1 << width) - 1) for shift, width in zip(shifts, widths)]
+        flips = radius // count
+        # 每段需要探测的 XOR 掩码（含 0，即原段值）
+        self.masks = [
+            tuple(
+                sum(1 << pos for pos in positions)
+                for bits in range(flips + 1)
+                for positions in combinations(range(width), bits)
+            )
+            for width in widths
+        ]
+        self.keys = []
+        self.hashes = []
+        self.tables = [dict() for _ in range(count)]
+
+    def add(self, key, h: int) -> None:
+        """加入一个哈希，key 为任意标识（如文件路径）。"""
+        n = len(self.keys)
+        self.keys.append(key)
+        self.hashes.append(h)
+        for table, (shift, mask) in zip(self.tables, self.segments):
+            table.setdefault((h >> shift) & mask, []).append(n)
+
+    def query(self, h: int, radius: int | None = None) -> list[tuple[int, object]]:
+        """返回距离不超过 radius（默认构造时的距离，不能更大）的 [(距离, key)]，按距离、加入顺序排序。"""
+        if radius is None:
+            radius = self.radius
+        elif radius > self.radius:
+            raise ValueError(f"查询距离 {radius} 超过建索引时的 {self.radius}")
+        hashes = self.hashes
+        # 同一条目可能在多张表中命中，按编号去重；重复校验比维护 seen 集合更便宜
+        found = {}
+        for table, (shift, mask), probes in zip(self.tables, self.segments, self.masks):
+            seg = (h >> shift) & mask
+            for probe in probes:
+                bucket = table.get(seg ^ probe)
+                if bucket is None:
+                    continue
+                for n in bucket:
+                    d = (h ^ hashes[n]).bit_count()
+                    if d <= radius:
+                        found[n] = d
+        return [(d, self.keys[n]) for n, d in sorted(found.items(), key=lambda item: (item[1], item[0]))]
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+
+def find_duplicates(
+    paths: list,
+    radius: int = DEFAULT_RADIUS,
+    index_path=None,
+    workers: int | None = None,
+    out=sys.stdout,
+) -> dict[str, tuple[str, int]]:
+    """
+    找出 paths 中的近似重复图片。
+
+    按给定顺序逐张查询：与之前某张代表图的距离不超过 radius 即视为其重复，否则成为新的代表图。
+    因此同一组中排在最前面的图片会被保留（批量工具按文件名排序时即为字典序最小的一张）。
+
+    :param index_path: 哈希索引路径，默认 default_index_path()
+    :param out: 统计信息的输出流，None 表示不输出
+    :return: {重复图片绝对路径: (代表图绝对路径, 汉明距离)}；无法解码的图片不参与查重
+    """
+    index = HashIndex(index_path or default_index_path())
+    try:
+        start = time.perf_counter()
+        hashes, stats = index.hashes(paths, workers)
+        hashed = time.perf_counter()
+    finally:
+        index.close()
+
+    mih = MultiIndex(radius)
+    duplicates = {}
+    for p in paths:
+        path = os.path.abspath(p)
+        h = hashes.get(path)
+        if h is None:
+            continue
+        match = mih.query(h, radius)
+        if match:
+            distance, original = match[0]
+            duplicates[path] = (original, distance)
+        else:
+            mih.add(path, h)
+    if out is not None:
+        print(
+            f"感知哈希：{len(paths)} 张（计算 {stats['hashed']}，复用 {stats['reused']}，失败 {stats['failed']}，"
+            f"{hashed - start:.2f} s），近似重复 {len(duplicates)} 张（阈值 {radius}，"
+            f"查重 {(time.perf_counter() - hashed) * 1000:.0f} ms）",
+            file=out,
+        )
+    return duplicates
+
+
+def link_or_copy(src: str, dst: str) -> None:
+    """让 dst 与 src 内容相同：优先硬链接，跨文件系统等情况退回复制；dst 已存在时覆盖。"""
+    import shutil
+
+    os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+    tmp = os.path.join(os.path.dirname(dst) or ".", f".{os.path.basename(dst)}.{os.getpid()}.tmp")
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copy2(src, tmp)
+    os.replace(tmp, dst)
+
+
+def add_dedupe_arguments(parser: argparse.ArgumentParser) -> None:
+    """为批量工具添加 --dedupe / --dedupe-radius / --dedupe-index 选项。"""
+    parser.add_argument(
+        "--dedupe",
+        choices=DEDUPE_MODES,
+        default=None,
+        help="近似重复图片的处理：skip=跳过不输出；link=复用同组第一张的输出（硬链接）；默认不查重",
+    )
+    parser.add_argument(
+        "--dedupe-radius",
+        type=int,
+        default=DEFAULT_RADIUS,
+        metavar="N",
+        help=f"dHash 汉明距离不超过 N 视为近似重复（0–{HASH_BITS // 2}，默认 {DEFAULT_RADIUS}）",
+    )
+    parser.add_argument(
+        "--dedupe-index",
+        type=Path,
+        default=None,
+        help=f"感知哈希索引路径（默认 {default_index_path()}）",
+    )
+
+
+def check_dedupe_arguments(parser: argparse.ArgumentParser, args) -> None:
+    """校验 add_dedupe_arguments() 添加的选项，--dedupe-radius 超出 0–HASH_BITS/2 时经 parser.error 退出。"""
+    if not (0 <= args.dedupe_radius <= HASH_BITS // 2):
+        parser.error(f"--dedupe-radius 必须在 0–{HASH_BITS // 2} 之间")
+
+
+def iter_images(inputs: list[str]) -> list[Path]:
+    """展开输入为图片文件列表：目录递归收集，文件原样保留；去重并保持顺序。"""
+    files = []
+    for item in inputs:
+        path = Path(item).expanduser()
+        if path.is_dir():
+            files.extend(sorted(p for p in path.rglob("*") if p.is_file() and p.suffix.lower() in IMAGE_EXTS))
+        elif path.is_file():
+            files.append(path)
+        else:
+            print(f"警告: 路径不存在，已忽略: {item}", file=sys.stderr)
+    return list(dict.fromkeys(p.resolve() for p in files))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="用感知哈希（dHash）找出近似重复的图片。",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+示例:
+  python image_dedupe.py ./screenshots
+  python image_dedupe.py ./assets ./more_assets -r 6 -j 8
+  python image_dedupe.py ./assets --format json > dupes.jsonl
+  python image_dedupe.py ./assets --prune
+        """,
+    )
+    parser.add_argument("inputs", nargs="+", help="输入目录或图片文件（目录递归收集）")
+    parser.add_argument(
+        "-r",
+        "--radius",
+        type=int,
+        default=DEFAULT_RADIUS,
+        metavar="N",
+        help=f"汉明距离不超过 N 视为近似重复（0–{HASH_BITS // 2}，默认 {DEFAULT_RADIUS}）",
+    )
+    parser.add_argument("--index", type=Path, default=None, help=f"哈希索引路径（默认 {default_index_path()}）")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="计算哈希的并行进程数，默认 CPU 核数")
+    parser.add_argument(
+        "--format",
+        choices=["text", "json"],
+        default="text",
+        help="输出格式：text=按组列出（默认）；json=每行一个 {\"duplicate\", \"original\", \"distance\"}",
+    )
+    parser.add_argument("--prune", action="store_true", help="同时删除索引中输入目录下已不存在的文件记录")
+    args = parser.parse_args()
+
+    if not (0 <= args.radius <= HASH_BITS // 2):
+        parser.error(f"--radius 必须在 0–{HASH_BITS // 2} 之间")
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers 必须为正整数")
+
+    files = iter_images(args.inputs)
+    if not files:
+        print("错误: 没有找到图片", file=sys.stderr)
+        sys.exit(1)
+
+    index_path = args.index or default_index_path()
+    # 统计信息输出到标准错误，标准输出只留结果，便于重定向
+    duplicates = find_duplicates(files, args.radius, index_path, args.workers, out=sys.stderr)
+    if args.prune:
+        index = HashIndex(index_path)
+        removed = sum(index.prune(item) for item in args.inputs if os.path.isdir(item))
+        index.close()
+        print(f"已从索引删除 {removed} 条失效记录", file=sys.stderr)
+
+    if args.format == "json":
+        for dup, (original, distance) in duplicates.items():
+            print(json.dumps({"duplicate": dup, "original": original, "distance": distance}, ensure_ascii=False))
+    else:
+        groups = {}
+        for dup, (original, distance) in duplicates.items():
+            groups.setdefault(original, []).append((dup, distance))
+        for original in sorted(groups):
+            print(original)
+            for dup, distance in groups[original]:
+                print(f"  ≈ {dup}（距离 {distance}）")
+
+
+if __name__ == "__main__":
+    main()
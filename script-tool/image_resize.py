@@ -9,6 +9,7 @@
 用法示例:
     python image_resize.py photo.jpg --size 1920x1080
     python image_resize.py icon.png -W 512 -H 512 -o out.png -m contain
+    python image_resize.py cut.rgba --size 1280x720 -o small.rgba   # 未压缩中间格式，见 raw_image.py
 """
 
 from __future__ import annotations
@@ -85,7 +86,7 @@ def main() -> None:
         "--output",
         type=Path,
         default=None,
-        help="输出路径；默认在源文件同目录生成「原名_宽x高.扩展名」",
+        help="输出路径；默认在源文件同目录生成「原名_宽x高.扩展名」；以 .rgba 结尾时输出未压缩中间格式",
     )
     p.add_argument(
         "-m",
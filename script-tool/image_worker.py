@@ -0,0 +1,785 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+图片处理常驻服务（worker）与客户端
+
+构建脚本成千上万次调用 png2jpg.py、image_resize.py 等脚本时，每次都要付出
+解释器启动 + 导入 Pillow 的开销。本脚本启动一个本地常驻进程，预先导入各图片工具，
+通过 Unix 套接字（默认，文件权限 0600）或本地 HTTP（仅监听 127.0.0.1）接收请求：
+
+- 有界工作池：固定数量的工作线程（Pillow 解码/编码/缩放时释放 GIL），
+  排队请求超过上限时直接返回 503，避免无限堆积
+- 解码缓存：按 (路径, 大小, 修改时间) 缓存最近解码的源图（LRU，按像素字节数限额），
+  同一源图生成多个尺寸/格式时只解码一次；文件被修改后自动失效
+- 输入、输出（png_cutout、image_resize、image2thumbnail）可以是 .rgba 未压缩中间格式（见 raw_image.py）
+- 统计：按操作记录请求数、失败数与延迟（平均、p50、p95、最大）
+- 访问限制：服务没有认证，默认只在当前用户可访问的 Unix 套接字上监听；使用 --port 时
+  只接受 Host 为 127.0.0.1:端口 / localhost:端口、不带 Origin 的请求，POST 必须是
+  application/json，浏览器页面无法借此跨站调用（含 /shutdown）
+
+客户端命令（run / batch / stats / stop）启动时不导入 Pillow，也不导入 http.client /
+http.server（二者会连带导入 email、ssl 等模块，启动慢几十毫秒），而是直接在套接字上
+收发最简单的 HTTP/1.1 请求；服务端相关的模块在 serve 时才导入。
+
+支持的操作（参数与对应脚本一致）：
+  png2jpg          input, output, quality, max_bytes
+  jpg2png          input, output, compression（0–9 或 auto）
+  image_resize     input, size（宽x高）或 width/height, output, mode
+  image2thumbnail  input, output, width, height, mode
+  image_filter     input, output, chain 或 radius, engine
+  png_cutout       input, output, region
+
+依赖：Python 3.10+；服务端另需 Pillow (PIL) 及各工具自身的依赖
+用法：
+  python image_worker.py serve [--socket PATH | --port N] [-j N]
+  python image_worker.py run <操作> key=value ...
+  python image_worker.py batch [jobs.jsonl] [-j N]
+  python image_worker.py stats
+  python image_worker.py stop
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+
+# 默认监听地址（仅本机，--port 时使用）
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8731
+
+# 默认 Unix 套接字文件名，放在 $XDG_RUNTIME_DIR 或 ~/.cache/image_worker/ 下
+SOCKET_NAME = "image_worker.sock"
+
+# 请求体上限（字节）；/run 的请求只是一小段 JSON
+MAX_BODY_BYTES = 1024 * 1024
+
+# 解码缓存默认上限（MB，按解码后的像素字节数计）
+DEFAULT_CACHE_MB = 512
+
+# 每个操作保留最近多少次请求的延迟用于计算分位数
+LATENCY_WINDOW = 1000
+
+# 客户端请求超时（秒）
+CLIENT_TIMEOUT = 600
+
+# 这些参数是文件路径，客户端发送前转成绝对路径（服务端的工作目录可能不同）
+PATH_KEYS = ("input", "output")
+
+
+# ---------------------------------------------------------------------------
+# 服务端：解码缓存、操作、统计
+# ---------------------------------------------------------------------------
+
+
+class DecodedCache:
+    """
+    已解码源图的 LRU 缓存，线程安全。
+
+    get() 返回缓存图像的副本：各操作可以随意修改，也不会在同一对象上并发 save()
+    （save 会改写图像对象上的 encoderinfo）。复制比重新解码便宜得多。
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str):
+        from raw_image import open_image
+
+        st = os.stat(path)
+        key = (os.path.realpath(path), st.st_size, st.st_mtime_ns)
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return entry[0].copy()
+            self.misses += 1
+
+        # 解码放在锁外；并发未命中同一文件时可能重复解码，结果相同，无碍
+        with open_image(path) as im:
+            im.load()
+            img = im.copy() if im.mode not in ("P", "PA") else im.convert("RGBA")
+        size = img.width * img.height * len(img.getbands())
+        if size <= self.max_bytes:
+            with self._lock:
+                if key not in self._items:
+                    self._items[key] = (img, size)
+                    self.bytes += size
+                    while self.bytes > self.max_bytes:
+                        _, (_, evicted) = self._items.popitem(last=False)
+                        self.bytes -= evicted
+        return img.copy()
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._items),
+                "mb": round(self.bytes / 1024 / 1024, 1),
+                "limit_mb": round(self.max_bytes / 1024 / 1024, 1),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+class LatencyStats:
+    """按操作统计请求数、失败数与延迟分位数，线程安全。"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._count = defaultdict(int)
+        self._errors = defaultdict(int)
+        self._recent = defaultdict(lambda: deque(maxlen=LATENCY_WINDOW))
+
+    def record(self, op: str, seconds: float, ok: bool) -> None:
+        with self._lock:
+            self._count[op] += 1
+            if not ok:
+                self._errors[op] += 1
+            self._recent[op].append(seconds * 1000)
+
+    def summary(self) -> dict:
+        with self._lock:
+            result = {}
+            for op, count in sorted(self._count.items()):
+                samples = sorted(self._recent[op])
+                result[op] = {
+                    "count": count,
+                    "errors": self._errors[op],
+                    "mean_ms": round(sum(samples) / len(samples), 2),
+                    "p50_ms": round(samples[len(samples) // 2], 2),
+                    "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 2),
+                    "max_ms": round(samples[-1], 2),
+                }
+            return result
+
+
+def _default_output(path: str, ext: str) -> str:
+    return os.path.splitext(path)[0] + ext
+
+
+def op_png2jpg(cache, input, output=None, quality=95, max_bytes=None):
+    from png2jpg import flatten_to_rgb, search_quality
+
+    output = output or _default_output(input, ".jpg")
+    img = flatten_to_rgb(cache.get(input))
+    if max_bytes is None:
+        img.save(output, "JPEG", quality=quality)
+        return {"output": output}
+    quality, data = search_quality(img, max_bytes, quality)
+    with open(output, "wb") as f:
+        f.write(data)
+    return {"output": output, "quality": quality, "bytes": len(data)}
+
+
+def op_jpg2png(cache, input, output=None, compression=6):
+    output = output or _default_output(input, ".png")
+    img = cache.get(input)
+    if img.mode not in ("RGB", "RGBA", "L"):
+        img = img.convert("RGB")
+    if compression == "auto":
+        import numpy as np
+        from png_stream import choose_level
+
+        compression, _ = choose_level(np.asarray(img), img.mode)
+    img.save(output, "PNG", compress_level=compression)
+    return {"output": output, "compression": compression}
+
+
+def _fit_to_file(cache, input, output, width, height, mode):
+    from pathlib import Path
+
+    from image2thumbnail import REDUCING_GAP, _fit, _save
+
+    img = cache.get(input)
+    if img.mode not in ("RGB", "RGBA", "L", "LA"):
+        img = img.convert("RGBA")
+    _save(_fit(img, width, height, mode, REDUCING_GAP), Path(output))
+    return {"output": output, "width": width, "height": height}
+
+
+def op_image_resize(cache, input, size=None, width=None, height=None, output=None, mode="cover"):
+    from pathlib import Path
+
+    from image_resize import default_output_path, parse_size
+
+    if size is not None:
+        width, height = parse_size(size)
+    elif width is not None:
+        height = height if height is not None else width
+    else:
+        raise ValueError("请指定 size（宽x高）或 width/height")
+    output = output or str(default_output_path(Path(input), width, height))
+    return _fit_to_file(cache, input, output, width, height, mode)
+
+
+def op_image2thumbnail(cache, input, output, width=58, height=None, mode="cover"):
+    return _fit_to_file(cache, input, output, width, height if height is not None else width, mode)
+
+
+def op_image_filter(cache, input, output, chain=None, radius=5, engine="pillow"):
+    from image_filter import FILTER_GAUSSIAN_BLUR, apply_chain, fuse_chain, parse_chain
+
+    img = cache.get(input)
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    stages = parse_chain(chain) if chain is not None else [(FILTER_GAUSSIAN_BLUR, radius)]
+    result = apply_chain(img, fuse_chain(stages, img.size), engine)
+    result.save(output, quality=95)
+    return {"output": output}
+
+
+def op_png_cutout(cache, input, output, region="all"):
+    import numpy as np
+    from PIL import Image
+
+    from png_cutout import REGION_BORDER, border_connected, checker_mask
+    from raw_image import save_image
+
+    arr = np.array(cache.get(input).convert("RGBA"))
+    mask = checker_mask(arr)
+    if region == REGION_BORDER:
+        mask = border_connected(mask)
+    arr[..., 3][mask] = 0
+    save_image(Image.fromarray(arr, "RGBA"), output, "PNG")
+    return {"output": output, "replaced": int(np.count_nonzero(mask)), "total": arr.shape[0] * arr.shape[1]}
+
+
+OPS = {
+    "png2jpg": op_png2jpg,
+    "jpg2png": op_jpg2png,
+    "image_resize": op_image_resize,
+    "image2thumbnail": op_image2thumbnail,
+    "image_filter": op_image_filter,
+    "png_cutout": op_png_cutout,
+}
+
+# 服务启动时预先导入的模块，首个请求不再付出导入开销
+PRELOAD_MODULES = ("PIL.Image", "png2jpg", "jpg2png", "image2thumbnail", "image_resize", "image_filter", "png_cutout")
+
+
+class Worker:
+    """持有工作池、排队上限、解码缓存与统计，供请求处理器调用。"""
+
+    def __init__(self, workers: int, max_pending: int, cache_bytes: int):
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.cache = DecodedCache(cache_bytes)
+        self.stats = LatencyStats()
+        self.workers = workers
+        self.max_pending = max_pending
+        self.started = time.time()
+
+    def run(self, op: str, args: dict):
+        """
+        在工作池中执行一个操作，返回 (HTTP 状态码, 响应字典)。
+
+        排队中的请求数达到上限时立即返回 503，由调用方稍后重试。
+        """
+        func = OPS.get(op)
+        if func is None:
+            return 400, {"ok": False, "error": f"未知操作: {op}，可用: {', '.join(OPS)}"}
+        if not self.slots.acquire(blocking=False):
+            return 503, {"ok": False, "error": f"服务繁忙：排队请求已达上限 {self.max_pending}"}
+
+        received = time.perf_counter()
+        try:
+            def task():
+                started = time.perf_counter()
+                return started, func(self.cache, **args)
+
+            try:
+                started, result = self.pool.submit(task).result()
+            except Exception as e:
+                self.stats.record(op, time.perf_counter() - received, ok=False)
+                return 500, {"ok": False, "op": op, "error": f"{type(e).__name__}: {e}"}
+            done = time.perf_counter()
+            self.stats.record(op, done - received, ok=True)
+            return 200, {
+                "ok": True,
+                "op": op,
+                "result": result,
+                "queued_ms": round((started - received) * 1000, 2),
+                "elapsed_ms": round((done - started) * 1000, 2),
+            }
+        finally:
+            self.slots.release()
+
+    def summary(self) -> dict:
+        return {
+            "uptime_s": round(time.time() - self.started, 1),
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "cache": self.cache.summary(),
+            "ops": self.stats.summary(),
+        }
+
+
+def default_socket_path() -> str:
+    """默认 Unix 套接字路径：$XDG_RUNTIME_DIR/image_worker.sock，未设置时为 ~/.cache/image_worker/image_worker.sock。"""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return os.path.join(runtime_dir, SOCKET_NAME)
+    return os.path.join(os.path.expanduser("~"), ".cache", "image_worker", SOCKET_NAME)
+
+
+def resolve_transport(socket_path: str | None = None, port: int | None = None):
+    """
+    确定连接方式，返回 (socket_path, port)，二者恰有一个不为 None。
+
+    指定了 port 时用本地 HTTP；否则用 Unix 套接字（未指定路径时用 default_socket_path()）；
+    平台不支持 Unix 套接字时退回 127.0.0.1:DEFAULT_PORT。
+    """
+    if port is not None:
+        return None, port
+    if socket_path is not None:
+        return socket_path, None
+    if hasattr(socket, "AF_UNIX"):
+        return default_socket_path(), None
+    return None, DEFAULT_PORT
+
+
+def _make_server(socket_path: str | None, port: int | None):
+    """
+    创建 HTTP 服务器（TCP 或 Unix 套接字）。
+
+    http.server 只在这里导入，客户端命令不必为它付出启动时间。
+    Unix 套接字在 umask 0177 下创建并设为 0600，只有当前用户能连接。
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from socketserver import ThreadingMixIn
+
+    class WorkerRequestHandler(BaseHTTPRequestHandler):
+        """
+        HTTP 接口：
+          POST /run       {"op": "...", "args": {...}}
+          GET  /stats     统计信息
+          GET  /health    存活检查
+          POST /shutdown  停止服务
+        """
+
+        # 保持连接，客户端 batch 模式可复用同一连接
+        protocol_version = "HTTP/1.1"
+
+        def address_string(self):
+            # Unix 套接字的 client_address 不是 (host, port)
+            return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+        def log_message(self, format, *args):
+            if self.server.verbose:
+                timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+                print(f"[{timestamp}] {format % args}")
+
+        def _reject(self, status: int, error: str) -> None:
+            # 拒绝后关闭连接：请求体可能尚未读取，不能继续复用
+            self.close_connection = True
+            self._send_json(status, {"ok": False, "error": error})
+
+        def _check_origin(self) -> bool:
+            """
+            拒绝来自浏览器页面的请求（防 DNS 重绑定与跨站 POST）：带 Origin 头的一律拒绝，
+            TCP 模式下 Host 必须是 127.0.0.1:端口 或 localhost:端口。
+            """
+            if self.headers.get("Origin") is not None:
+                self._reject(403, "不接受带 Origin 的请求")
+                return False
+            allowed = self.server.allowed_hosts
+            if allowed is not None and (self.headers.get("Host") or "").lower() not in allowed:
+                self._reject(403, f"Host 不被允许: {self.headers.get('Host')}")
+                return False
+            return True
+
+        def _send_json(self, status: int, payload: dict) -> None:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if not self._check_origin():
+                return
+            if self.path == "/stats":
+                self._send_json(200, self.server.worker.summary())
+            elif self.path == "/health":
+                self._send_json(200, {"ok": True})
+            else:
+                self._send_json(404, {"ok": False, "error": f"未知路径: {self.path}"})
+
+        def do_POST(self):
+            if not self._check_origin():
+                return
+            if self.headers.get_content_type() != "application/json":
+                self._reject(415, "Content-Type 必须是 application/json")
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                if not 0 <= length <= MAX_BODY_BYTES:
+                    raise ValueError(f"应在 0–{MAX_BODY_BYTES} 之间")
+            except ValueError as e:
+                self._reject(400, f"Content-Length 无效: {e}")
+                return
+            body = self.rfile.read(length) if length > 0 else b""
+            if self.path == "/shutdown":
+                self._send_json(200, {"ok": True})
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+            if self.path != "/run":
+                self._send_json(404, {"ok": False, "error": f"未知路径: {self.path}"})
+                return
+            try:
+                request = json.loads(body.decode("utf-8"))
+                if not isinstance(request, dict):
+                    raise ValueError("请求体必须是 JSON 对象")
+                op, args = request["op"], request.get("args") or {}
+                if not isinstance(op, str):
+                    raise ValueError("op 必须是字符串")
+                if not isinstance(args, dict):
+                    raise ValueError("args 必须是对象")
+            except (ValueError, KeyError, TypeError, UnicodeDecodeError) as e:
+                self._send_json(400, {"ok": False, "error": f"请求格式错误: {e}"})
+                return
+            status, payload = self.server.worker.run(op, args)
+            self._send_json(status, payload)
+
+    if socket_path is None:
+        server = ThreadingHTTPServer((DEFAULT_HOST, port), WorkerRequestHandler)
+        server.allowed_hosts = {f"{DEFAULT_HOST}:{port}", f"localhost:{port}"}
+    else:
+        if not hasattr(socket, "AF_UNIX"):
+            raise RuntimeError("当前平台不支持 Unix 套接字，请改用 --port")
+        from socketserver import UnixStreamServer
+
+        class UnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+            pass
+
+        old_umask = os.umask(0o177)
+        try:
+            server = UnixHTTPServer(socket_path, WorkerRequestHandler)
+        finally:
+            os.umask(old_umask)
+        os.chmod(socket_path, 0o600)
+        server.allowed_hosts = None
+    server.daemon_threads = True
+    return server
+
+
+def serve(
+    socket_path: str | None = None,
+    port: int | None = None,
+    workers: int | None = None,
+    max_pending: int | None = None,
+    cache_mb: int = DEFAULT_CACHE_MB,
+    verbose: bool = False,
+) -> None:
+    """启动服务并阻塞，直到收到 /shutdown 或 Ctrl+C。连接方式见 resolve_transport()。"""
+    import importlib
+
+    socket_path, port = resolve_transport(socket_path, port)
+
+    for name in PRELOAD_MODULES:
+        importlib.import_module(name)
+
+    workers = workers or os.cpu_count() or 1
+    worker = Worker(workers, max_pending or workers * 4, cache_mb * 1024 * 1024)
+
+    if socket_path is not None and not os.path.exists(socket_path):
+        os.makedirs(os.path.dirname(os.path.abspath(socket_path)), mode=0o700, exist_ok=True)
+    elif socket_path is not None:
+        # 只清理残留的套接字文件；若已有服务在监听则报错
+        try:
+            WorkerClient(socket_path=socket_path, timeout=1).health()
+        except OSError:
+            os.remove(socket_path)
+        else:
+            raise RuntimeError(f"已有服务在监听: {socket_path}")
+    server = _make_server(socket_path, port)
+    address = socket_path if socket_path is not None else f"http://{DEFAULT_HOST}:{port}"
+    server.worker = worker
+    server.verbose = verbose
+
+    print(f"图片 worker 已启动: {address}（{workers} 个工作线程，排队上限 {worker.max_pending}，缓存 {cache_mb} MB）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        worker.pool.shutdown(wait=True)
+        if socket_path is not None and os.path.exists(socket_path):
+            os.remove(socket_path)
+        print("图片 worker 已停止")
+
+
+# ---------------------------------------------------------------------------
+# 客户端
+# ---------------------------------------------------------------------------
+
+
+class WorkerClient:
+    """
+    worker 客户端，复用同一连接（HTTP/1.1 keep-alive）。
+
+    :param socket_path: Unix 套接字路径
+    :param port: 本地 HTTP 端口；二者都为 None 时连接默认 Unix 套接字，见 resolve_transport()
+    """
+
+    def __init__(
+        self, socket_path: str | None = None, port: int | None = None, timeout: float = CLIENT_TIMEOUT
+    ):
+        self.socket_path, self.port = resolve_transport(socket_path, port)
+        self.host = "localhost" if self.socket_path is not None else f"{DEFAULT_HOST}:{self.port}"
+        self.timeout = timeout
+        self._sock = None
+        self._reader = None
+
+    def _connect(self) -> None:
+        if self.socket_path is not None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+        else:
+            sock = socket.create_connection((DEFAULT_HOST, self.port), timeout=self.timeout)
+        self._sock = sock
+        self._reader = sock.makefile("rb")
+
+    def _exchange(self, data: bytes):
+        if self._sock is None:
+            self._connect()
+        self._sock.sendall(data)
+        status_line = self._reader.readline()
+        if not status_line:
+            raise ConnectionResetError("连接已被服务端关闭")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = self._reader.readline().decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        body = self._reader.read(int(headers.get("content-length", 0)))
+        if headers.get("connection", "").lower() == "close":
+            self.close()
+        return status, json.loads(body.decode("utf-8")) if body else {}
+
+    def request(self, method: str, path: str, payload: dict | None = None):
+        """发送请求，返回 (HTTP 状态码, 响应字典)。空闲连接已被关闭时重连一次。"""
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8") if payload is not None else b""
+        head = (
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+        )
+        data = head.encode("ascii") + body
+        reused = self._sock is not None
+        try:
+            return self._exchange(data)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close()
+            if not reused:
+                raise
+            return self._exchange(data)
+
+    def run(self, op: str, **args) -> dict:
+        """执行一个操作，失败时抛出 RuntimeError。"""
+        for key in PATH_KEYS:
+            if args.get(key) is not None:
+                args[key] = os.path.abspath(os.path.expanduser(args[key]))
+        status, payload = self.request("POST", "/run", {"op": op, "args": args})
+        if not payload.get("ok"):
+            raise RuntimeError(f"[{status}] {payload.get('error')}")
+        return payload
+
+    def health(self) -> bool:
+        return self.request("GET", "/health")[1].get("ok", False)
+
+    def stats(self) -> dict:
+        return self.request("GET", "/stats")[1]
+
+    def shutdown(self) -> None:
+        self.request("POST", "/shutdown")
+
+    def close(self) -> None:
+        if self._sock is not None:
+            self._reader.close()
+            self._sock.close()
+            self._sock = self._reader = None
+
+
+def parse_kv(items) -> dict:
+    """把 key=value 列表解析为字典；value 能按 JSON 解析时取解析结果（数字、null 等），否则作为字符串。"""
+    args = {}
+    for item in items:
+        key, sep, value = item.partition("=")
+        if not sep or not key:
+            raise ValueError(f"参数格式应为 key=value: {item}")
+        try:
+            args[key] = json.loads(value)
+        except ValueError:
+            args[key] = value
+    return args
+
+
+def run_batch(lines, make_client, workers: int) -> int:
+    """
+    并发发送 JSON Lines 任务（每行 {"op": ..., "args": {...}}），返回失败数。
+
+    每个客户端线程各持有一条保持的连接。
+    """
+    jobs = []
+    for lineno, line in enumerate(lines, 1):
+        line = line.strip()
+        if line and not line.startswith("#"):
+            try:
+                job = json.loads(line)
+                jobs.append((lineno, job["op"], dict(job.get("args") or {})))
+            except (ValueError, KeyError) as e:
+                raise ValueError(f"第 {lineno} 行格式错误: {e}") from None
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    local = threading.local()
+
+    def send(job):
+        lineno, op, args = job
+        if not hasattr(local, "client"):
+            local.client = make_client()
+        try:
+            return lineno, op, local.client.run(op, **args), None
+        except (RuntimeError, OSError) as e:
+            return lineno, op, None, str(e)
+
+    failed = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for lineno, op, payload, error in pool.map(send, jobs):
+            if error is not None:
+                failed += 1
+                print(f"  失败 #{lineno} {op}: {error}", file=sys.stderr)
+            else:
+                output = payload["result"].get("output", "")
+                print(f"  OK #{lineno} {op} -> {output}（{payload['elapsed_ms']:.1f} ms）")
+    elapsed = time.perf_counter() - start
+    rate = len(jobs) / elapsed if elapsed > 0 else 0.0
+    print(f"完成: {len(jobs) - failed} 成功，{failed} 失败，耗时 {elapsed:.2f} s（{rate:.1f} 请求/秒）")
+    return failed
+
+
+def print_stats(stats: dict) -> None:
+    cache = stats["cache"]
+    print(f"运行时长: {stats['uptime_s']} s，工作线程: {stats['workers']}，排队上限: {stats['max_pending']}")
+    print(
+        f"解码缓存: {cache['entries']} 项，{cache['mb']}/{cache['limit_mb']} MB，"
+        f"命中 {cache['hits']}，未命中 {cache['misses']}"
+    )
+    if not stats["ops"]:
+        print("尚无请求")
+        return
+    print(f"{'操作':<18}{'次数':>8}{'失败':>6}{'平均ms':>10}{'p50ms':>10}{'p95ms':>10}{'最大ms':>10}")
+    for op, s in stats["ops"].items():
+        print(
+            f"{op:<18}{s['count']:>8}{s['errors']:>6}{s['mean_ms']:>10.1f}"
+            f"{s['p50_ms']:>10.1f}{s['p95_ms']:>10.1f}{s['max_ms']:>10.1f}"
+        )
+
+
+def main() -> None:
+    transport = argparse.ArgumentParser(add_help=False)
+    transport.add_argument(
+        "--socket", default=None, metavar="PATH", help="Unix 套接字路径（默认 $XDG_RUNTIME_DIR/image_worker.sock）"
+    )
+    transport.add_argument(
+        "--port", type=int, default=None, help=f"改用本地 HTTP（仅 127.0.0.1），如 {DEFAULT_PORT}；与 --socket 互斥"
+    )
+
+    parser = argparse.ArgumentParser(
+        description="图片处理常驻服务：预加载 Pillow 与各图片工具，通过本地 HTTP 或 Unix 套接字接收请求。",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=f"""
+操作: {', '.join(OPS)}
+
+示例:
+  python image_worker.py serve -j 8 --cache-mb 1024
+  python image_worker.py serve --port 8731
+  python image_worker.py run png2jpg input=a.png output=a.jpg quality=85
+  python image_worker.py run image_resize input=a.jpg size=1280x720 mode=contain
+  python image_worker.py run image_filter input=a.jpg output=b.jpg chain=gaussian_blur:8,sharpen
+  python image_worker.py batch jobs.jsonl -j 8
+  python image_worker.py stats
+  python image_worker.py stop
+        """,
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_serve = sub.add_parser("serve", parents=[transport], help="启动服务")
+    p_serve.add_argument("-j", "--workers", type=int, default=None, help="工作线程数，默认 CPU 核数")
+    p_serve.add_argument("--max-pending", type=int, default=None, help="同时排队/执行的请求上限，默认 工作线程数×4")
+    p_serve.add_argument(
+        "--cache-mb", type=int, default=DEFAULT_CACHE_MB, help=f"解码缓存上限（MB，默认 {DEFAULT_CACHE_MB}，0 为关闭）"
+    )
+    p_serve.add_argument("-v", "--verbose", action="store_true", help="打印每个请求的访问日志")
+
+    p_run = sub.add_parser("run", parents=[transport], help="执行一个操作")
+    p_run.add_argument("op", choices=sorted(OPS), help="操作名")
+    p_run.add_argument("args", nargs="*", metavar="key=value", help="操作参数，数值按 JSON 解析")
+
+    p_batch = sub.add_parser("batch", parents=[transport], help="从 JSON Lines 文件（或标准输入）批量执行")
+    p_batch.add_argument("file", nargs="?", default="-", help='任务文件，每行 {"op": ..., "args": {...}}；默认标准输入')
+    p_batch.add_argument("-j", "--jobs", type=int, default=4, help="并发连接数（默认 4）")
+
+    sub.add_parser("stats", parents=[transport], help="查看统计信息")
+    sub.add_parser("stop", parents=[transport], help="停止服务")
+    args = parser.parse_args()
+    if args.socket is not None and args.port is not None:
+        parser.error("--socket 与 --port 只能指定一个")
+
+    try:
+        if args.command == "serve":
+            if args.workers is not None and args.workers < 1:
+                parser.error("--workers 必须为正整数")
+            if args.max_pending is not None and args.max_pending < 1:
+                parser.error("--max-pending 必须为正整数")
+            serve(args.socket, args.port, args.workers, args.max_pending, args.cache_mb, args.verbose)
+            return
+
+        client = WorkerClient(socket_path=args.socket, port=args.port)
+        if args.command == "run":
+            payload = client.run(args.op, **parse_kv(args.args))
+            print(json.dumps(payload["result"], ensure_ascii=False))
+        elif args.command == "batch":
+            if args.jobs < 1:
+                parser.error("--jobs 必须为正整数")
+            if args.file == "-":
+                lines = sys.stdin.readlines()
+            else:
+                with open(args.file, "r", encoding="utf-8") as f:
+                    lines = f.readlines()
+            failed = run_batch(lines, lambda: WorkerClient(socket_path=args.socket, port=args.port), args.jobs)
+            sys.exit(1 if failed else 0)
+        elif args.command == "stats":
+            print_stats(client.stats())
+        elif args.command == "stop":
+            client.shutdown()
+            print("已请求停止服务")
+    except (ConnectionRefusedError, FileNotFoundError) as e:
+        print(f"错误: 无法连接到 worker（是否已执行 serve？）: {e}", file=sys.stderr)
+        sys.exit(1)
+    except (RuntimeError, ValueError, OSError) as e:
+        print(f"错误: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -25,11 +25,20 @@ iOS App Store 截屏尺寸转换工具
 
     # 缩放模式：fill=裁剪填满，fit=留边适配，stretch=拉伸
     python ios_screenshot_resize.py screenshot.png --preset iphone67 --mode fill
+
+    # 一次输出多个预设（或全部预设），每张图只解码一次，多进程并行
+    python ios_screenshot_resize.py ./screenshots/ --preset iphone67 iphone65 ipad129
+    python ios_screenshot_resize.py ./screenshots/ --preset all --workers 8
+
+    # 近似重复的截屏只处理一张，其余直接硬链接到它的输出
+    python ios_screenshot_resize.py ./screenshots/ --preset iphone67 --dedupe link
 """
 
 import argparse
 import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 try:
@@ -38,6 +47,8 @@ except ImportError:
     print("错误: 需要安装 Pillow。请执行: pip install Pillow")
     sys.exit(1)
 
+from image_dedupe import DEDUPE_LINK, add_dedupe_arguments, check_dedupe_arguments, find_duplicates
+
 # App Store 常用截屏尺寸（竖版 portrait，宽 x 高）
 PRESETS = {
     "iphone69": (1260, 2736),   # 6.9" (部分机型)
@@ -117,19 +128,64 @@ def process_file(
     suffix: str = "",
 ) -> bool:
     """处理单张图片，保存到 out_dir。返回是否成功。"""
+    ok, _ = process_file_targets(path, [(target_w, target_h, out_dir)], mode, suffix)
+    return ok
+
+
+def process_file_targets(
+    path: Path,
+    targets: list,
+    mode: str,
+    suffix: str = "",
+) -> tuple:
+    """
+    只解码一次，把单张图片缩放到多个目标尺寸。
+
+    :param targets: [(宽, 高, 输出目录)]
+    :return: (是否全部成功, 耗时秒数)
+    """
+    start = time.perf_counter()
     try:
         with Image.open(path) as img:
             rgb = img.convert("RGB") if img.mode not in ("RGB", "RGBA") else img
-            out_img = resize_image(rgb, target_w, target_h, mode)
-        out_name = path.stem + suffix + ".jpg"
-        out_path = out_dir / out_name
-        out_path.parent.mkdir(parents=True, exist_ok=True)
-        out_img.save(out_path, "JPEG", quality=95)
-        print(f"  OK: {path.name} -> {out_path}")
-        return True
+            rgb.load()
+            for target_w, target_h, out_dir in targets:
+                out_img = resize_image(rgb, target_w, target_h, mode)
+                out_path = out_dir / (path.stem + suffix + ".jpg")
+                out_path.parent.mkdir(parents=True, exist_ok=True)
+                out_img.save(out_path, "JPEG", quality=95)
+                print(f"  OK: {path.name} -> {out_path}")
+        return True, time.perf_counter() - start
     except Exception as e:
         print(f"  失败: {path.name} - {e}", file=sys.stderr)
-        return False
+        return False, time.perf_counter() - start
+
+
+def link_duplicate_outputs(duplicates: dict, targets: list, suffix: str) -> int:
+    """
+    --dedupe link：把代表图的各尺寸输出硬链接（或复制）为重复图的输出。
+
+    :param duplicates: {重复图路径: (代表图路径, 距离)}
+    :return: 生成的文件数
+    """
+    from image_dedupe import link_or_copy
+
+    linked = 0
+    for dup, (original, _) in duplicates.items():
+        for _, _, out_dir in targets:
+            src = out_dir / (Path(original).stem + suffix + ".jpg")
+            if not src.is_file():
+                continue
+            link_or_copy(str(src), str(out_dir / (Path(dup).stem + suffix + ".jpg")))
+            linked += 1
+    return linked
+
+
+def resolve_presets(names: list) -> list:
+    """把 --preset 的取值展开为 [(预设名, 宽, 高)]，all 表示全部预设，重复项只保留一次。"""
+    if "all" in names:
+        names = list(PRESETS)
+    return [(name, *PRESETS[name]) for name in dict.fromkeys(names)]
 
 
 def main() -> None:
@@ -144,8 +200,9 @@ def main() -> None:
     )
     parser.add_argument(
         "--preset", "-p",
-        choices=list(PRESETS.keys()),
-        help="预设尺寸名称（如 iphone67、iphone65、ipad129）",
+        nargs="+",
+        choices=list(PRESETS.keys()) + ["all"],
+        help="预设尺寸名称（如 iphone67、iphone65、ipad129），可指定多个；all 表示全部预设",
     )
     parser.add_argument(
         "--size", "-s",
@@ -168,16 +225,30 @@ def main() -> None:
         default="_ios",
         help="输出文件名后缀，默认 _ios",
     )
+    parser.add_argument(
+        "--workers", "-j",
+        type=int,
+        default=None,
+        help="目录模式的并行进程数，默认 CPU 核数",
+    )
+    add_dedupe_arguments(parser)
     args = parser.parse_args()
 
     if not args.preset and not args.size:
         parser.error("必须指定 --preset 或 --size 之一")
+    if args.preset and args.size:
+        parser.error("--preset 与 --size 不能同时使用")
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers 必须为正整数")
+    check_dedupe_arguments(parser, args)
 
     if args.preset:
-        target_w, target_h = PRESETS[args.preset]
-        print(f"使用预设: {args.preset} = {target_w} x {target_h}")
+        presets = resolve_presets(args.preset)
+        for name, target_w, target_h in presets:
+            print(f"使用预设: {name} = {target_w} x {target_h}")
     else:
         target_w, target_h = parse_size(args.size)
+        presets = [(None, target_w, target_h)]
         print(f"目标尺寸: {target_w} x {target_h}")
 
     path = Path(args.input)
@@ -194,18 +265,48 @@ def main() -> None:
     print(f"输出目录: {out_dir}")
     print(f"缩放模式: {args.mode}\n")
 
+    # 多个预设时按预设名分子目录输出，单个目标时保持原来的平铺输出
+    if len(presets) > 1:
+        targets = [(w, h, out_dir / name) for name, w, h in presets]
+    else:
+        targets = [(presets[0][1], presets[0][2], out_dir)]
+
     if path.is_file():
-        ok = process_file(path, target_w, target_h, args.mode, out_dir, args.suffix)
+        ok, _ = process_file_targets(path, targets, args.mode, args.suffix)
         sys.exit(0 if ok else 3)
     else:
-        count, failed = 0, 0
-        for f in sorted(path.iterdir()):
-            if f.suffix.lower() in (".png", ".jpg", ".jpeg", ".webp"):
-                if process_file(f, target_w, target_h, args.mode, out_dir, args.suffix):
-                    count += 1
-                else:
-                    failed += 1
+        # 先解析目录：find_duplicates 以 os.path.abspath 为键，输入目录是符号链接时
+        # 这里的路径也必须与之一致，否则 --dedupe skip 过滤不掉重复图。文件本身不解析，保留原文件名
+        files = [f for f in sorted(path.resolve().iterdir()) if f.suffix.lower() in (".png", ".jpg", ".jpeg", ".webp")]
+        start = time.perf_counter()
+        duplicates = {}
+        if args.dedupe:
+            duplicates = find_duplicates(files, args.dedupe_radius, args.dedupe_index, args.workers)
+            for dup, (original, distance) in duplicates.items():
+                print(f"  近似重复: {Path(dup).name} ≈ {Path(original).name}（距离 {distance}）")
+            files = [f for f in files if str(f) not in duplicates]
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            results = list(pool.map(
+                process_file_targets,
+                files,
+                [targets] * len(files),
+                [args.mode] * len(files),
+                [args.suffix] * len(files),
+            ))
+        linked = link_duplicate_outputs(duplicates, targets, args.suffix) if args.dedupe == DEDUPE_LINK else 0
+        wall = time.perf_counter() - start
+        count = sum(1 for ok, _ in results if ok)
+        failed = len(results) - count
+        busy = sum(t for _, t in results)
         print(f"\n完成: 成功 {count} 张，失败 {failed} 张")
+        if duplicates:
+            action = f"链接 {linked} 个输出文件" if args.dedupe == DEDUPE_LINK else "已跳过"
+            print(f"近似重复: {len(duplicates)} 张，{action}")
+        print(
+            f"耗时: {wall:.2f} s，共输出 {count * len(targets)} 个文件（{len(targets)} 个尺寸），"
+            f"{len(files) / wall if wall > 0 else 0:.1f} 张/秒；"
+            f"单张累计 {busy:.2f} s，并行加速 {busy / wall if wall > 0 else 0:.1f}x"
+        )
         sys.exit(3 if failed else 0)
 
 
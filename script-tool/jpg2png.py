@@ -5,29 +5,70 @@
 JPG 转 PNG 图片格式转换
 
 将 JPG/JPEG 图片转换为 PNG 格式。PNG 为无损格式，适合需要保留图片质量或后续编辑的场景。
-依赖：Python 3.6+，Pillow (PIL)
-用法：python jpg2png.py <input.jpg> [output.png] [-c N]
+
+默认使用 Pillow 单线程编码；指定 -j 时改用 png_stream 的并行写出器，把滤波后的
+扫描行分块后在多个线程中 deflate（与 pigz 相同的做法），大图高压缩级别下明显更快。
+-c auto 先在采样行上实测各压缩级别的速度与压缩率，再决定用哪个级别。
+
+依赖：Python 3.6+，Pillow (PIL)；-j / -c auto / --benchmark 另需 numpy
+用法：python jpg2png.py <input.jpg> [output.png] [-c N|auto] [-j N] [--benchmark]
 """
 
 import argparse
 import os
 import sys
-from typing import Optional
+import tempfile
+import time
+from typing import Optional, Union
 
 from PIL import Image
 
+# 自动选择压缩级别的取值
+AUTO = "auto"
+
+
+def _resolve_level(img: Image.Image, compression: Union[int, str], verbose: bool) -> int:
+    """compression 为 "auto" 时在采样行上实测并选择级别，否则原样返回。"""
+    if compression != AUTO:
+        return compression
+    import numpy as np
+    from png_stream import choose_level
+
+    level, stats = choose_level(np.asarray(img), img.mode)
+    if verbose:
+        for lv, ratio, speed in stats:
+            mark = " <" if lv == level else ""
+            print(f"  级别 {lv}: 压缩率 {ratio:.1%}，{speed:.1f} MB/s{mark}")
+        print(f"自动选择压缩级别: {level}")
+    return level
+
+
+def _write_parallel(img: Image.Image, output_path: str, level: int, workers: int) -> None:
+    import numpy as np
+    from png_stream import icc_chunk, write_png_parallel
+
+    extra = []
+    if img.info.get("icc_profile"):
+        extra.append(icc_chunk(img.info["icc_profile"]))
+    write_png_parallel(output_path, np.asarray(img), img.mode, level, workers, extra)
+
 
 def jpg_to_png(
     input_path: str,
     output_path: Optional[str] = None,
-    compression: int = 6,
+    compression: Union[int, str] = 6,
+    verbose: bool = True,
+    workers: Optional[int] = None,
 ) -> None:
     """
     将 JPG/JPEG 图片转换为 PNG 格式。
 
     :param input_path: 输入 JPG/JPEG 文件路径
     :param output_path: 输出 PNG 路径，未指定时默认与输入同目录、同主名的 .png
-    :param compression: PNG 压缩级别 0–9，0 无压缩最快，9 最高压缩最小文件（默认 6）
+    :param compression: PNG 压缩级别 0–9，0 无压缩最快，9 最高压缩最小文件（默认 6）；
+        "auto" 表示采样实测后自动选择
+    :param verbose: 是否打印「转换完成」提示，批量调用时可关闭
+    :param workers: 并行 deflate 的线程数；None 时使用 Pillow 单线程编码
     """
     if not os.path.exists(input_path):
         raise FileNotFoundError(f"文件不存在: {input_path}")
@@ -40,19 +81,75 @@ def jpg_to_png(
         # 若为其他模式（如 CMYK），转换为 RGB
         if img.mode not in ("RGB", "RGBA", "L"):
             img = img.convert("RGB")
-        img.save(output_path, "PNG", compress_level=compression)
+        level = _resolve_level(img, compression, verbose)
+        if workers is None:
+            img.save(output_path, "PNG", compress_level=level)
+        else:
+            _write_parallel(img, output_path, level, workers)
+
+    if verbose:
+        print(f"转换完成: {output_path}")
+
+
+def benchmark(input_path: str, levels=(1, 6, 9)) -> None:
+    """
+    对比 Pillow 单线程与并行写出器在不同级别、线程数下的耗时与文件大小。
 
-    print(f"转换完成: {output_path}")
+    每个并行结果都会重新解码并与源像素比对，确认无损。
+    """
+    import numpy as np
+
+    cores = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, cores} & set(range(1, cores + 1))) or [1]
+    with Image.open(input_path) as img:
+        if img.mode not in ("RGB", "RGBA", "L"):
+            img = img.convert("RGB")
+        img.load()
+    expected = np.asarray(img)
+    print(f"输入: {input_path}（{img.width}x{img.height} {img.mode}），CPU 核数: {cores}")
+    print(f"{'写出器':<10}{'级别':>6}{'线程':>6}{'耗时(s)':>10}{'大小(KB)':>12}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, "out.png")
+        for level in levels:
+            t0 = time.perf_counter()
+            img.save(out, "PNG", compress_level=level)
+            elapsed = time.perf_counter() - t0
+            print(f"{'Pillow':<10}{level:>6}{1:>6}{elapsed:>10.3f}{os.path.getsize(out) / 1024:>12.1f}")
+            for workers in worker_counts:
+                t0 = time.perf_counter()
+                _write_parallel(img, out, level, workers)
+                elapsed = time.perf_counter() - t0
+                with Image.open(out) as check:
+                    if not np.array_equal(np.asarray(check), expected):
+                        raise RuntimeError(f"并行写出结果与源像素不一致（级别 {level}，{workers} 线程）")
+                print(f"{'parallel':<10}{level:>6}{workers:>6}{elapsed:>10.3f}{os.path.getsize(out) / 1024:>12.1f}")
+
+
+def _compression_arg(value: str) -> Union[int, str]:
+    if value == AUTO:
+        return AUTO
+    try:
+        level = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"压缩级别应为 0–9 或 {AUTO}: {value}")
+    if not (0 <= level <= 9):
+        raise argparse.ArgumentTypeError("压缩级别必须在 0–9 之间")
+    return level
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(
         description="将 JPG/JPEG 图片转换为 PNG 格式。PNG 为无损格式，适合保留图片质量或后续编辑。",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 示例:
   python jpg2png.py photo.jpg
   python jpg2png.py photo.jpg photo.png
   python jpg2png.py photo.jpg --compression 9
+  python jpg2png.py photo.jpg -c 9 -j 8
+  python jpg2png.py photo.jpg -c auto -j 4
+  python jpg2png.py photo.jpg --benchmark
         """,
     )
     parser.add_argument("input", help="输入 JPG/JPEG 文件路径")
@@ -65,19 +162,34 @@ def main() -> None:
     parser.add_argument(
         "-c",
         "--compression",
-        type=int,
+        type=_compression_arg,
         default=6,
         metavar="N",
-        help="PNG 压缩级别 0–9，0 无压缩最快，9 最小文件（默认 6）",
+        help=f"PNG 压缩级别 0–9，0 无压缩最快，9 最小文件（默认 6）；{AUTO} 为采样实测后自动选择",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=None,
+        help="使用并行写出器及其线程数（默认不启用，使用 Pillow 单线程编码）",
+    )
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="对比 Pillow 与并行写出器在级别 1/6/9、不同线程数下的耗时与大小，不写输出文件",
     )
     args = parser.parse_args()
 
-    if not (0 <= args.compression <= 9):
-        print("错误: 压缩级别必须在 0–9 之间", file=sys.stderr)
+    if args.workers is not None and args.workers < 1:
+        print("错误: --workers 必须为正整数", file=sys.stderr)
         sys.exit(1)
 
     try:
-        jpg_to_png(args.input, args.output, compression=args.compression)
+        if args.benchmark:
+            benchmark(args.input)
+        else:
+            jpg_to_png(args.input, args.output, compression=args.compression, workers=args.workers)
     except FileNotFoundError as e:
         print(f"错误: {e}", file=sys.stderr)
         sys.exit(1)
@@ -19,29 +19,26 @@
     - Python 3.6+
     - sounddevice（录音）
     - soundfile（写 WAV）
-    - librosa（音高检测 YIN、音高转音名）
-    - numpy
+    - numpy（音高检测见 pitch.py：起音后稳态段的向量化 YIN）
+    sounddevice、soundfile 在开始拾音时才导入，--help 不需要
 """
 
+import argparse
 import os
 import queue
 import sys
 import threading
 import time
 
-import librosa
-import numpy as np
-import sounddevice as sd
-import soundfile as sf
-
 # ================= 配置参数 =================
 SAMPLE_RATE = 44100
 CHANNELS = 1
 CHUNK_DURATION = 0.5  # 每次分析的音频块时长（秒）
 MAX_RECORD_DURATION = 1.0  # 每个音高最多保存的时长（秒）
 ENERGY_THRESHOLD = 0.01  # 能量阈值，低于此值视为静音/环境噪声，不处理
-FMIN = librosa.note_to_hz("C2")  # 检测音高下限（约 65 Hz）
-FMAX = librosa.note_to_hz("C7")  # 检测音高上限（约 2093 Hz）
+FMIN = 440.0 * 2 ** ((36 - 69) / 12)  # 检测音高下限 C2（MIDI 36，约 65 Hz）
+FMAX = 440.0 * 2 ** ((96 - 69) / 12)  # 检测音高上限 C7（MIDI 96，约 2093 Hz）
+MIN_CONFIDENCE = 0.5  # 音高置信度下限，低于此值（如噪声、和弦）不保存
 # ===========================================
 
 # 录音数据队列（由 sounddevice 回调写入，主循环读取）
@@ -61,25 +58,22 @@ def audio_callback(indata, frames, time_info, status):
 
 def rms_energy(audio):
     """计算音频块 RMS 能量，用于过滤静音。"""
+    import numpy as np
+
     return np.sqrt(np.mean(audio ** 2))
 
 
 def detect_pitch(audio):
     """
-    使用 YIN 算法检测音频块的主音高（基频，Hz）。
-    若无法可靠检测则返回 None。
+    检测音频块的主音高（基频，Hz），只分析起音之后稳态段的几帧。
+    若无法可靠检测（或置信度低于 MIN_CONFIDENCE）则返回 None。
     """
-    audio = audio.flatten()
-    f0 = librosa.yin(
-        audio,
-        fmin=FMIN,
-        fmax=FMAX,
-        sr=SAMPLE_RATE,
-    )
-    f0 = f0[np.isfinite(f0)]
-    if len(f0) == 0:
+    from pitch import estimate_pitch
+
+    pitch_hz, confidence = estimate_pitch(audio.flatten(), SAMPLE_RATE, FMIN, FMAX)
+    if pitch_hz is None or confidence < MIN_CONFIDENCE:
         return None
-    return np.median(f0)
+    return pitch_hz
 
 
 def _wait_enter_stop():
@@ -94,6 +88,12 @@ def _wait_enter_stop():
 
 def main(output_dir):
     """主流程：打开麦克风，循环检测音高并保存新音高到输出目录，直到用户按 Enter。"""
+    import numpy as np
+    import sounddevice as sd
+    import soundfile as sf
+
+    from pitch import hz_to_note
+
     global running
     output_path = os.path.abspath(output_dir)
     os.makedirs(output_path, exist_ok=True)
@@ -132,7 +132,8 @@ def main(output_dir):
             if pitch_hz is None:
                 continue
 
-            note = librosa.hz_to_note(pitch_hz, octave=True)
+            # 用 # 表示升号，保存的文件名可直接交给 filter_sound.py 校验
+            note = hz_to_note(pitch_hz)
 
             # 该音高已保存过则跳过
             if note in captured_notes:
@@ -164,8 +165,9 @@ def main(output_dir):
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("用法：python pick_sound.py <输出目录>")
-        print("示例：python pick_sound.py ./samples")
-        sys.exit(1)
-    main(sys.argv[1])
+    parser = argparse.ArgumentParser(
+        description="从麦克风实时采集音频，按检测到的音高分别保存为 WAV（按 Enter 结束）。",
+        epilog="示例：python pick_sound.py ./samples",
+    )
+    parser.add_argument("output_dir", help="输出目录，每个音高保存为 <音名>.wav")
+    main(parser.parse_args().output_dir)
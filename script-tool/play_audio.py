@@ -24,8 +24,6 @@
 import argparse
 import sys
 from pathlib import Path
-from pydub import AudioSegment
-from pydub.playback import play
 
 
 def change_speed(audio, speed=1.0):
@@ -113,6 +111,10 @@ def main():
     if args.speed <= 0 or args.speed > 3.0:
         print("⚠️  警告：播放速度建议在0.5-2.0之间，当前值可能影响音质", file=sys.stderr)
     
+    # pydub 较重，参数校验通过后再导入，--help 与参数错误不必付出导入开销
+    from pydub import AudioSegment
+    from pydub.playback import play
+
     # 加载音频文件
     print(f"📂 正在加载音频文件: {args.audio_file}")
     try:
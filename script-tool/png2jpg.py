@@ -5,29 +5,107 @@
 PNG 转 JPG 图片格式转换
 
 将 PNG 图片转换为 JPG 格式。若 PNG 有透明通道，会先以白色填充后再导出。
+指定 --max-bytes 时在内存中搜索不超过字节上限的最高 JPEG 质量，只写出最终结果。
+输入也可以是 .rgba 未压缩中间格式（见 raw_image.py），作为工具链的最后一步压缩输出。
 依赖：Python 3.6+，Pillow (PIL)
-用法：python png2jpg.py <input.png> [output.jpg] [--quality N]
+用法：python png2jpg.py <input.png> [output.jpg] [--quality N] [--max-bytes N]
 """
 
 import argparse
+import io
 import os
 import sys
-from typing import Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
 
 from PIL import Image
 
+from raw_image import open_image
+
+# 质量搜索时每轮并发试编码的质量个数
+SEARCH_PROBES = 4
+
+
+def flatten_to_rgb(img: Image.Image) -> Image.Image:
+    """转为 RGB；有透明通道时先以白色填充（JPG 不支持透明）。"""
+    if img.mode in ("RGBA", "LA"):
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        background.paste(img, mask=img.split()[-1])
+        return background
+    return img.convert("RGB")
+
+
+def encode_jpeg(img: Image.Image, quality: int) -> bytes:
+    """把图片按指定质量编码为内存中的 JPEG 字节串。"""
+    buf = io.BytesIO()
+    img.save(buf, "JPEG", quality=quality)
+    return buf.getvalue()
+
+
+def search_quality(
+    img: Image.Image,
+    max_bytes: int,
+    max_quality: int = 95,
+    probes: int = SEARCH_PROBES,
+) -> Tuple[int, bytes]:
+    """
+    在 [1, max_quality] 中搜索编码后不超过 max_bytes 的最高质量。
+
+    多路二分：每轮在当前区间内均匀取 probes 个质量，用线程池并发编码
+    （Pillow 编码时释放 GIL），据结果把区间缩小到相邻两个探测点之间。
+    所有试编码都在内存中进行，复用同一张已解码、已去透明的图片。
+
+    :return: (质量, 对应的 JPEG 字节串)
+    :raises ValueError: 质量 1 仍超过上限
+    """
+    # Image.save 会改写图片对象上的 encoderinfo，并发编码同一对象会互相覆盖参数，
+    # 因此每个线程持有一份自己的副本（只复制一次）
+    local = threading.local()
+
+    def measure(q: int) -> Tuple[int, bytes]:
+        if not hasattr(local, "img"):
+            local.img = img.copy()
+        return q, encode_jpeg(local.img, q)
+
+    with ThreadPoolExecutor(max_workers=probes) as pool:
+        results = dict(pool.map(measure, sorted({1, max_quality})))
+        if len(results[max_quality]) <= max_bytes:
+            return max_quality, results[max_quality]
+        if len(results[1]) > max_bytes:
+            raise ValueError(f"质量为 1 时仍有 {len(results[1])} 字节，无法满足上限 {max_bytes} 字节")
+
+        # 不变量：low 满足上限，high 超出上限
+        low, high = 1, max_quality
+        while high - low > 1:
+            step = (high - low) / (probes + 1)
+            candidates = sorted({min(high - 1, max(low + 1, round(low + step * i))) for i in range(1, probes + 1)})
+            for q, data in pool.map(measure, candidates):
+                results[q] = data
+            for q in candidates:
+                if len(results[q]) <= max_bytes:
+                    low = q
+                else:
+                    high = q
+                    break
+    return low, results[low]
+
 
 def png_to_jpg(
     input_path: str,
     output_path: Optional[str] = None,
     quality: int = 95,
+    verbose: bool = True,
+    max_bytes: Optional[int] = None,
 ) -> None:
     """
     将 PNG 图片转换为 JPG 格式。
 
     :param input_path: 输入 PNG 文件路径
     :param output_path: 输出 JPG 路径，未指定时默认与输入同目录、同主名的 .jpg
-    :param quality: JPEG 质量 1–100，默认 95
+    :param quality: JPEG 质量 1–100，默认 95；指定 max_bytes 时为质量上限
+    :param verbose: 是否打印「转换完成」提示，批量调用时可关闭
+    :param max_bytes: 输出文件字节上限；指定时自动搜索满足上限的最高质量
     """
     if not os.path.exists(input_path):
         raise FileNotFoundError(f"文件不存在: {input_path}")
@@ -35,18 +113,20 @@ def png_to_jpg(
     if output_path is None:
         output_path = os.path.splitext(input_path)[0] + ".jpg"
 
-    with Image.open(input_path) as img:
-        # PNG 有透明通道时，需先以白色填充（JPG 不支持透明）
-        if img.mode in ("RGBA", "LA"):
-            background = Image.new("RGB", img.size, (255, 255, 255))
-            background.paste(img, mask=img.split()[-1])
-            img = background
-        else:
-            img = img.convert("RGB")
+    with open_image(input_path) as img:
+        img = flatten_to_rgb(img)
 
-        img.save(output_path, "JPEG", quality=quality)
+        if max_bytes is None:
+            img.save(output_path, "JPEG", quality=quality)
+        else:
+            quality, data = search_quality(img, max_bytes, quality)
+            with open(output_path, "wb") as f:
+                f.write(data)
+            if verbose:
+                print(f"选定质量: {quality}，大小: {len(data)} 字节（上限 {max_bytes}）")
 
-    print(f"转换完成: {output_path}")
+    if verbose:
+        print(f"转换完成: {output_path}")
 
 
 def main() -> None:
@@ -57,6 +137,7 @@ def main() -> None:
   python png2jpg.py logo.png
   python png2jpg.py logo.png logo.jpg
   python png2jpg.py logo.png --quality 90
+  python png2jpg.py screenshot.png --max-bytes 500000
         """,
     )
     parser.add_argument("input", help="输入 PNG 文件路径")
@@ -67,12 +148,26 @@ def main() -> None:
         type=int,
         default=95,
         metavar="N",
-        help="JPEG 质量 1–100（默认 95）",
+        help="JPEG 质量 1–100（默认 95）；与 --max-bytes 同用时为质量上限",
+    )
+    parser.add_argument(
+        "--max-bytes",
+        type=int,
+        default=None,
+        metavar="N",
+        help="输出字节上限：自动搜索不超过 N 字节的最高质量",
     )
     args = parser.parse_args()
 
+    if not (1 <= args.quality <= 100):
+        print("错误: JPEG 质量必须在 1–100 之间", file=sys.stderr)
+        sys.exit(1)
+    if args.max_bytes is not None and args.max_bytes < 1:
+        print("错误: --max-bytes 必须为正整数", file=sys.stderr)
+        sys.exit(1)
+
     try:
-        png_to_jpg(args.input, args.output, quality=args.quality)
+        png_to_jpg(args.input, args.output, quality=args.quality, max_bytes=args.max_bytes)
     except FileNotFoundError as e:
         print(f"错误: {e}", file=sys.stderr)
         sys.exit(1)
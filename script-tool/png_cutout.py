@@ -7,17 +7,49 @@ PNG 棋盘格转透明脚本
 将 PNG 中“棋盘格”颜色（灰白格）的像素改为透明。
 常见导出错误会把透明区域变成 #fff / #c0c0c0 等灰白格，本脚本把这些像素的 alpha 置为 0。
 
-依赖：Python 3.6+，Pillow (PIL)
+输入、输出都可以是 .rgba 未压缩中间格式（见 raw_image.py），供后续工具零拷贝读取。
+
+依赖：Python 3.6+，Pillow (PIL)，numpy（可选，用于向量化引擎与分块模式）
 用法：python png_cutout.py <输入.png> [输出.png]
 """
 
 import argparse
 import os
 import sys
+import tempfile
+import time
 from pathlib import Path
 
 from PIL import Image
 
+from raw_image import RAW_EXTENSION, is_raw_file, is_raw_path, open_image, save_image
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# 棋盘格判定阈值：通道差上限、平均亮度下限
+CHECKER_SPREAD_MAX = 15
+CHECKER_BRIGHTNESS_MIN = 170
+
+# 处理引擎：numpy=整图数组运算（默认，需 numpy），pixel=逐像素遍历
+ENGINE_NUMPY = "numpy"
+ENGINE_PIXEL = "pixel"
+
+# 透明化范围：all=所有棋盘格像素，border=仅与图像边缘连通的棋盘格区域
+REGION_ALL = "all"
+REGION_BORDER = "border"
+
+
+def _have_numpy() -> bool:
+    """numpy 是否可用。numpy 导入较慢（约数十毫秒），各函数在用到时才在函数内导入。"""
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
 
 def is_checker_color(r: int, g: int, b: int) -> bool:
     """
@@ -33,18 +65,56 @@ def is_checker_color(r: int, g: int, b: int) -> bool:
     """
     avg = (r + g + b) / 3
     spread = max(r, g, b) - min(r, g, b)
-    return spread <= 15 and avg >= 170
+    return spread <= CHECKER_SPREAD_MAX and avg >= CHECKER_BRIGHTNESS_MIN
 
 
-def checker_to_transparent(input_path: str, output_path: str) -> tuple:
+def checker_mask(rgba):
     """
-    将输入 PNG 中棋盘格颜色的像素设为透明，写入输出 PNG。
+    对 RGBA 数组整体计算棋盘格掩码，判定条件与 is_checker_color 完全一致。
 
-    :param input_path: 输入 PNG 路径
-    :param output_path: 输出 PNG 路径
-    :return: (被设为透明的像素数, 总像素数)
+    平均亮度 ≥ 170 等价于 R+G+B ≥ 510，用整数求和避免浮点除法。
+
+    :param rgba: 形状为 (高, 宽, 4) 的 uint8 数组
+    :return: 形状为 (高, 宽) 的 bool 数组，True 表示棋盘格像素
     """
-    img = Image.open(input_path).convert("RGBA")
+    import numpy as np
+
+    rgb = rgba[..., :3]
+    spread = rgb.max(axis=2) - rgb.min(axis=2)
+    total = rgb.sum(axis=2, dtype=np.uint16)
+    return (spread <= CHECKER_SPREAD_MAX) & (total >= CHECKER_BRIGHTNESS_MIN * 3)
+
+
+def border_connected(mask):
+    """
+    只保留掩码中与图像四条边连通（4 邻接）的区域。
+
+    用 scipy.ndimage.label 一次性标记全部连通域，再通过标签查找表筛出
+    出现在边缘上的标签，全程为 C 层向量化运算，不做 Python 级洪水填充。
+    画面内部被主体包围的白色高光不会被误清除。
+
+    :param mask: 形状为 (高, 宽) 的 bool 数组
+    :return: 同形状的 bool 数组
+    """
+    import numpy as np
+
+    try:
+        from scipy import ndimage
+    except ImportError:
+        raise RuntimeError("border 模式需要 scipy：pip install scipy") from None
+
+    labels, count = ndimage.label(mask)
+    if count == 0:
+        return mask
+    edge_labels = np.concatenate((labels[0], labels[-1], labels[:, 0], labels[:, -1]))
+    keep = np.zeros(count + 1, dtype=bool)
+    keep[edge_labels] = True
+    keep[0] = False
+    return keep[labels]
+
+
+def _checker_to_transparent_pixel(img: Image.Image) -> tuple:
+    """逐像素引擎：通过 img.load() 遍历并原地修改 alpha，返回 (图像, 替换数)。"""
     width, height = img.size
     pixels = img.load()
     replaced = 0
@@ -56,10 +126,130 @@ def checker_to_transparent(input_path: str, output_path: str) -> tuple:
                 pixels[x, y] = (r, g, b, 0)
                 replaced += 1
 
-    img.save(output_path, "PNG")
+    return img, replaced
+
+
+def _checker_to_transparent_numpy(img: Image.Image, region: str = REGION_ALL) -> tuple:
+    """向量化引擎：一次数组运算得到掩码，再批量写 alpha 通道，返回 (图像, 替换数)。"""
+    import numpy as np
+
+    arr = np.array(img)
+    img.close()
+    mask = checker_mask(arr)
+    if region == REGION_BORDER:
+        mask = border_connected(mask)
+    arr[..., 3][mask] = 0
+    return Image.fromarray(arr, "RGBA"), int(np.count_nonzero(mask))
+
+
+def _checker_to_transparent_tiled(input_path: str, output_path: str, band_height: int) -> tuple:
+    """
+    分块模式：按水平条带解码、计算掩码并流式编码，峰值内存只取决于条带高度。
+
+    仅支持 8 位非隔行 PNG 输入；输出为 8 位 RGBA PNG，保留 iCCP/sRGB/gAMA 等色彩块。
+    """
+    import numpy as np
+
+    from png_stream import PngBandReader, PngBandWriter
+
+    replaced = 0
+    with PngBandReader(input_path) as reader:
+        width, height = reader.width, reader.height
+        with PngBandWriter(output_path, width, height, "RGBA", reader.color_chunks) as writer:
+            for band in reader.iter_bands(band_height):
+                arr = np.array(band.convert("RGBA"))
+                mask = checker_mask(arr)
+                arr[..., 3][mask] = 0
+                replaced += int(np.count_nonzero(mask))
+                writer.write_rows(arr)
     return replaced, width * height
 
 
+def peak_rss_mb():
+    """返回本进程的峰值常驻内存（MB），平台不支持时返回 None。"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def checker_to_transparent(
+    input_path: str,
+    output_path: str,
+    engine: str = ENGINE_NUMPY,
+    band_height: int = None,
+    region: str = REGION_ALL,
+) -> tuple:
+    """
+    将输入 PNG 中棋盘格颜色的像素设为透明，写入输出 PNG。
+
+    :param input_path: 输入 PNG 路径
+    :param output_path: 输出 PNG 路径
+    :param engine: numpy（默认，未安装 numpy 时自动退回 pixel）或 pixel
+    :param band_height: 指定时按该行数分块流式处理（需 numpy，忽略 engine），用于超大图
+    :param region: all=所有棋盘格像素；border=仅与边缘连通的区域（需 numpy 与 scipy，只支持 numpy 引擎，不能与分块同用）
+    :return: (被设为透明的像素数, 总像素数)
+    """
+    if region not in (REGION_ALL, REGION_BORDER):
+        raise ValueError(f"未知范围: {region}，可选: {REGION_ALL}, {REGION_BORDER}")
+    if region == REGION_BORDER:
+        if band_height is not None:
+            raise ValueError("border 模式需要整图连通性，不能与分块模式同时使用")
+        if engine == ENGINE_PIXEL:
+            raise ValueError("border 模式只支持 numpy 引擎，不能与 pixel 引擎同时使用")
+        if not _have_numpy():
+            raise RuntimeError("border 模式需要 numpy：pip install numpy")
+
+    if band_height is not None:
+        if not _have_numpy():
+            raise RuntimeError("分块模式需要 numpy：pip install numpy")
+        if is_raw_file(input_path) or is_raw_path(output_path):
+            raise ValueError(f"分块模式只支持 PNG 输入与输出，不支持 {RAW_EXTENSION} 中间格式")
+        return _checker_to_transparent_tiled(input_path, output_path, band_height)
+
+    if engine not in (ENGINE_NUMPY, ENGINE_PIXEL):
+        raise ValueError(f"未知引擎: {engine}，可选: {ENGINE_NUMPY}, {ENGINE_PIXEL}")
+    if engine == ENGINE_NUMPY and not _have_numpy():
+        engine = ENGINE_PIXEL
+
+    # .rgba 输入为只读映射，convert 会复制出可修改的图像
+    img = open_image(input_path).convert("RGBA")
+    width, height = img.size
+    if engine == ENGINE_NUMPY:
+        img, replaced = _checker_to_transparent_numpy(img, region)
+    else:
+        img, replaced = _checker_to_transparent_pixel(img)
+
+    save_image(img, output_path, "PNG")
+    return replaced, width * height
+
+
+def benchmark(input_path: str) -> None:
+    """
+    对同一输入分别用 pixel 与 numpy 引擎处理并计时，校验两者替换像素数一致。
+
+    输出写入临时目录，不影响原图与正式输出。
+    """
+    if not _have_numpy():
+        raise RuntimeError("基准测试需要 numpy：pip install numpy")
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="png_cutout_bench_") as tmp:
+        for engine in (ENGINE_PIXEL, ENGINE_NUMPY):
+            out = os.path.join(tmp, f"{engine}.png")
+            start = time.perf_counter()
+            replaced, total = checker_to_transparent(input_path, out, engine=engine)
+            results[engine] = (time.perf_counter() - start, replaced)
+            print(f"{engine:>6}: {results[engine][0]:.3f} s，透明像素 {replaced} / {total}")
+
+    pixel_time, pixel_replaced = results[ENGINE_PIXEL]
+    numpy_time, numpy_replaced = results[ENGINE_NUMPY]
+    if pixel_replaced != numpy_replaced:
+        raise RuntimeError(f"两种引擎结果不一致：pixel={pixel_replaced}，numpy={numpy_replaced}")
+    print(f"结果一致，numpy 加速比：{pixel_time / max(numpy_time, 1e-9):.1f}x")
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(
         description="将 PNG 中棋盘格（灰白格）颜色的像素改为透明。",
@@ -73,6 +263,11 @@ def main() -> None:
   python png_cutout.py image.png
   python png_cutout.py image.png -o image_transparent.png
   python png_cutout.py image.png --output image_clean.png
+  python png_cutout.py image.png --engine pixel
+  python png_cutout.py image.png --benchmark
+  python png_cutout.py huge_poster.png --band-height 256
+  python png_cutout.py artwork.png --region border
+  python png_cutout.py image.png -o image.rgba
         """,
     )
     parser.add_argument(
@@ -85,17 +280,56 @@ def main() -> None:
         "--output",
         type=str,
         default=None,
-        help="输出 PNG 路径（可选，默认：输入同目录下 输入名.transparent.png）",
+        help="输出 PNG 路径（可选，默认：输入同目录下 输入名.transparent.png）；以 .rgba 结尾时输出未压缩中间格式",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=[ENGINE_NUMPY, ENGINE_PIXEL],
+        default=ENGINE_NUMPY,
+        help="处理引擎：numpy=整图数组运算（默认，未安装 numpy 时退回 pixel）；pixel=逐像素遍历",
+    )
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="对比 pixel 与 numpy 两种引擎的耗时并校验结果一致（不写正式输出）",
+    )
+    parser.add_argument(
+        "--band-height",
+        type=int,
+        default=None,
+        metavar="N",
+        help="分块模式：每次只解码/处理/编码 N 行，峰值内存与图片尺寸无关（仅支持 8 位非隔行 PNG）",
+    )
+    parser.add_argument(
+        "--region",
+        choices=[REGION_ALL, REGION_BORDER],
+        default=REGION_ALL,
+        help="透明化范围：all=所有棋盘格像素（默认）；border=仅与图像边缘连通的棋盘格区域，保留主体内部的白色高光（需 scipy）",
     )
     args = parser.parse_args()
 
+    if args.band_height is not None and args.band_height < 1:
+        parser.error("--band-height 必须为正整数")
+    if args.region == REGION_BORDER and args.band_height is not None:
+        parser.error("--region border 需要整图连通性，不能与 --band-height 同时使用")
+    if args.region == REGION_BORDER and args.engine == ENGINE_PIXEL:
+        parser.error("--region border 只支持 numpy 引擎，不能与 --engine pixel 同时使用")
+
     input_path = args.input
     if not os.path.isfile(input_path):
         print(f"错误：输入文件不存在：{input_path}", file=sys.stderr)
         sys.exit(1)
-    if not input_path.lower().endswith(".png"):
+    if not input_path.lower().endswith(".png") and not is_raw_file(input_path):
         print("提示：输入文件建议为 PNG 格式，其他格式会按图像读取并输出为 PNG。", file=sys.stderr)
 
+    if args.benchmark:
+        try:
+            benchmark(input_path)
+        except Exception as e:
+            print(f"错误：{e}", file=sys.stderr)
+            sys.exit(1)
+        return
+
     if args.output is not None:
         output_path = args.output
     else:
@@ -107,9 +341,18 @@ def main() -> None:
         sys.exit(1)
 
     try:
-        replaced, total = checker_to_transparent(input_path, output_path)
+        replaced, total = checker_to_transparent(
+            input_path,
+            output_path,
+            engine=args.engine,
+            band_height=args.band_height,
+            region=args.region,
+        )
         print(f"已保存：{output_path}")
         print(f"设为透明的像素：{replaced} / {total}")
+        peak = peak_rss_mb()
+        if peak is not None:
+            print(f"峰值内存（RSS）：{peak:.1f} MB")
     except Exception as e:
         print(f"错误：{e}", file=sys.stderr)
         sys.exit(1)
@@ -6,43 +6,499 @@ PNG图片信息分析工具
 
 功能：
     分析PNG图片的尺寸信息（宽度和高度）、是否有 alpha 通道等，并打印出来。
+    也可只读文件头（PNG IHDR / JPEG SOF / WebP VP8X 等）快速获取尺寸，
+    或多线程遍历整个目录，每个文件输出一行 JSON/CSV，用于资源清单盘点。
+    --chunks 模式用 mmap 遍历 PNG 块列表，统计 IDAT 与辅助块（tEXt/iCCP/eXIf 等）
+    占用的字节、校验 CRC、估算压缩率，全程不解码像素；结果可写入按
+    路径 + 大小 + 修改时间索引的 SQLite 文件，重复审计时只分析有变化的文件。
 
 依赖：
     - Python 3.6+
-    - Pillow (PIL) 库
+    - Pillow (PIL) 库（仅完整分析单个文件时需要）
 
 用法：
-    python png_info.py <image.png>
+    python png_info.py <image.png> [--header-only]
+    python png_info.py <目录> [--format json|csv] [--workers N] [--index png_index.sqlite]
+    python png_info.py <图片或目录> --chunks（--format/--workers/--index 只用于目录）
 
 示例：
     python png_info.py example.png
     python png_info.py /path/to/image.png
+    python png_info.py example.png --header-only
+    python png_info.py ./assets --format csv > inventory.csv
+    python png_info.py ./assets --chunks --index ~/.cache/png_index.sqlite
 """
 
-import sys
+import argparse
+import csv
+import json
+import mmap
 import os
-from PIL import Image
+import sqlite3
+import struct
+import sys
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+# 目录盘点时收集的图片扩展名
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".webp")
+
+# 盘点输出字段
+INVENTORY_FIELDS = ("path", "format", "width", "height", "mode", "has_alpha", "file_size", "error")
+
+# 块分析模式的输出字段（JSON 额外包含 chunk_bytes / chunk_counts 明细）
+CHUNK_FIELDS = (
+    "path", "file_size", "width", "height", "bit_depth", "color_type", "interlace",
+    "idat_bytes", "idat_chunks", "ancillary_bytes", "text_bytes", "iccp_bytes", "exif_bytes",
+    "raw_bytes", "compression_ratio", "crc_errors", "truncated", "error",
+)
+
+# 文本类辅助块
+_TEXT_CHUNKS = ("tEXt", "zTXt", "iTXt")
+
+# PNG 颜色类型 -> 每像素通道数
+_PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+# Adam7 七趟扫描的 (起始 x, 起始 y, x 步长, y 步长)
+_ADAM7_PASSES = ((0, 0, 8, 8), (4, 0, 8, 8), (0, 4, 4, 8), (2, 0, 4, 4), (0, 2, 2, 4), (1, 0, 2, 2), (0, 1, 1, 2))
+
+# PNG 只读取文件开头这么多字节（IHDR 固定在前 33 字节，tRNS 通常也在前几 KB）
+PNG_HEADER_BYTES = 4096
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# PNG 颜色类型 -> Pillow 风格的模式名
+_PNG_MODES = {0: "L", 2: "RGB", 3: "P", 4: "LA", 6: "RGBA"}
+
+# JPEG 中携带尺寸信息的 SOF 标记（排除 DHT=C4、JPG=C8、DAC=CC）
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+# JPEG 分量数 -> 模式名
+_JPEG_MODES = {1: "L", 3: "RGB", 4: "CMYK"}
+
 
+def _read_png_header(f) -> dict:
+    """解析 PNG 的 IHDR，并在 IDAT 之前查找 tRNS 判断透明。"""
+    data = f.read(PNG_HEADER_BYTES)
+    if data[12:16] != b"IHDR":
+        raise ValueError("PNG 缺少 IHDR")
+    width, height, bit_depth, color_type = struct.unpack(">IIBB", data[16:26])
+    mode = _PNG_MODES.get(color_type, "Unknown")
+    if color_type == 0 and bit_depth == 1:
+        mode = "1"
+    elif color_type == 0 and bit_depth == 16:
+        mode = "I;16"
 
-def print_usage():
-    """打印使用说明"""
-    print("Usage:")
-    print("  python png_info.py <image.png>")
-    print("")
-    print("Description:")
-    print("  Analyze a PNG image and print its pixel dimensions (width x height).")
-    print("")
-    print("Example:")
-    print("  python png_info.py example.png")
-    print("  python png_info.py /path/to/image.png")
+    has_alpha = color_type in (4, 6)
+    pos = 33
+    while not has_alpha and pos + 8 <= len(data):
+        length, chunk_type = struct.unpack(">I4s", data[pos:pos + 8])
+        if chunk_type == b"tRNS":
+            has_alpha = True
+        elif chunk_type == b"IDAT":
+            break
+        pos += 12 + length
+    return {"format": "PNG", "width": width, "height": height, "mode": mode, "has_alpha": has_alpha}
 
 
-def analyze_image(image_path):
+def _read_jpeg_header(f) -> dict:
+    """逐段跳读 JPEG，直到遇到 SOF 段，不读取 EXIF 等段的内容。"""
+    f.seek(2)
+    while True:
+        byte = f.read(1)
+        if not byte:
+            raise ValueError("JPEG 中未找到 SOF 段")
+        if byte != b"\xff":
+            continue
+        marker = f.read(1)
+        while marker == b"\xff":  # 填充字节
+            marker = f.read(1)
+        if not marker:
+            raise ValueError("JPEG 中未找到 SOF 段")
+        code = marker[0]
+        # 无长度字段的标记：RSTn、SOI、EOI、TEM
+        if 0xD0 <= code <= 0xD9 or code == 0x01:
+            continue
+        length = struct.unpack(">H", f.read(2))[0]
+        if code in _JPEG_SOF_MARKERS:
+            _, height, width, components = struct.unpack(">BHHB", f.read(6))
+            mode = _JPEG_MODES.get(components, "Unknown")
+            return {"format": "JPEG", "width": width, "height": height, "mode": mode, "has_alpha": False}
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+def _read_webp_header(f) -> dict:
+    """解析 WebP 的首个块：VP8X（扩展）、VP8L（无损）或 VP8（有损）。"""
+    data = f.read(30)
+    chunk = data[12:16]
+    if chunk == b"VP8X":
+        has_alpha = bool(data[20] & 0x10)
+        width = 1 + int.from_bytes(data[24:27], "little")
+        height = 1 + int.from_bytes(data[27:30], "little")
+    elif chunk == b"VP8L":
+        if data[20] != 0x2F:
+            raise ValueError("VP8L 签名错误")
+        bits = int.from_bytes(data[21:25], "little")
+        width = 1 + (bits & 0x3FFF)
+        height = 1 + ((bits >> 14) & 0x3FFF)
+        has_alpha = bool((bits >> 28) & 1)
+    elif chunk == b"VP8 ":
+        if data[23:26] != b"\x9d\x01\x2a":
+            raise ValueError("VP8 帧起始码错误")
+        width = int.from_bytes(data[26:28], "little") & 0x3FFF
+        height = int.from_bytes(data[28:30], "little") & 0x3FFF
+        has_alpha = False
+    else:
+        raise ValueError(f"未知 WebP 块: {chunk!r}")
+    mode = "RGBA" if has_alpha else "RGB"
+    return {"format": "WEBP", "width": width, "height": height, "mode": mode, "has_alpha": has_alpha}
+
+
+def read_image_header(image_path) -> dict:
+    """
+    只读取文件头获取图片格式、尺寸、模式与是否透明，不经过 Pillow 解码。
+
+    支持 PNG（IHDR）、JPEG（SOF）、WebP（VP8X/VP8L/VP8）。
+
+    参数：
+        image_path: 图片文件路径
+
+    返回：
+        dict: format / width / height / mode / has_alpha
+
+    异常：
+        ValueError: 格式不支持或文件头损坏
+    """
+    with open(image_path, "rb") as f:
+        magic = f.read(16)
+        f.seek(0)
+        if magic.startswith(PNG_SIGNATURE):
+            return _read_png_header(f)
+        if magic.startswith(b"\xff\xd8"):
+            return _read_jpeg_header(f)
+        if magic[:4] == b"RIFF" and magic[8:12] == b"WEBP":
+            return _read_webp_header(f)
+    raise ValueError("不支持的图片格式（仅支持 PNG/JPEG/WebP 文件头解析）")
+
+
+def _raw_png_bytes(width, height, bit_depth, color_type, interlace) -> int:
+    """按 IHDR 计算解压后的扫描行总字节数（含每行的滤波类型字节）。"""
+    bits = _PNG_CHANNELS.get(color_type, 4) * bit_depth
+
+    def rows(w, h):
+        return h * (1 + (w * bits + 7) // 8) if w and h else 0
+
+    if not interlace:
+        return rows(width, height)
+    return sum(
+        rows((width - x0 + dx - 1) // dx, (height - y0 + dy - 1) // dy)
+        for x0, y0, dx, dy in _ADAM7_PASSES
+    )
+
+
+def analyze_png_chunks(image_path) -> dict:
+    """
+    用 mmap 遍历 PNG 的块列表，不解码像素。
+
+    统计每种块的数量与数据字节数、校验每个块的 CRC，并用 IHDR 算出的
+    原始扫描行大小除以 IDAT 总字节数估算压缩率。
+
+    参数：
+        image_path: PNG 文件路径
+
+    返回：
+        dict: CHUNK_FIELDS 中的各项，以及 chunk_bytes / chunk_counts 明细
+
+    异常：
+        ValueError: 不是 PNG 或缺少 IHDR
+    """
+    with open(image_path, "rb") as f:
+        file_size = os.fstat(f.fileno()).st_size
+        if file_size < len(PNG_SIGNATURE):
+            raise ValueError("文件过小，不是有效的 PNG")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                return _walk_png_chunks(image_path, mm, view, file_size)
+            finally:
+                view.release()
+
+
+def _walk_png_chunks(image_path, mm, view, file_size) -> dict:
+    if mm[:8] != PNG_SIGNATURE:
+        raise ValueError("不是有效的 PNG 文件")
+
+    chunk_bytes = {}
+    chunk_counts = {}
+    crc_errors = 0
+    ihdr = None
+    truncated = True
+    pos = 8
+    while pos + 12 <= file_size:
+        length, chunk_type = struct.unpack_from(">I4s", mm, pos)
+        data_end = pos + 8 + length
+        if data_end + 4 > file_size:
+            break
+        name = chunk_type.decode("latin-1")
+        (stored_crc,) = struct.unpack_from(">I", mm, data_end)
+        # 切 memoryview 不复制数据，CRC 覆盖块类型与数据
+        if zlib.crc32(view[pos + 4:data_end]) & 0xFFFFFFFF != stored_crc:
+            crc_errors += 1
+        chunk_bytes[name] = chunk_bytes.get(name, 0) + length
+        chunk_counts[name] = chunk_counts.get(name, 0) + 1
+        if chunk_type == b"IHDR" and length >= 13:
+            ihdr = struct.unpack_from(">IIBBBBB", mm, pos + 8)
+        pos = data_end + 4
+        if chunk_type == b"IEND":
+            truncated = False
+            break
+
+    if ihdr is None:
+        raise ValueError("PNG 缺少 IHDR")
+    width, height, bit_depth, color_type, _, _, interlace = ihdr
+    idat_bytes = chunk_bytes.get("IDAT", 0)
+    raw_bytes = _raw_png_bytes(width, height, bit_depth, color_type, interlace)
+    # 块类型首字母小写即为辅助块（ancillary）
+    ancillary_bytes = sum(n for name, n in chunk_bytes.items() if name[0].islower())
+
+    return {
+        "path": image_path,
+        "file_size": file_size,
+        "width": width,
+        "height": height,
+        "bit_depth": bit_depth,
+        "color_type": color_type,
+        "interlace": interlace,
+        "idat_bytes": idat_bytes,
+        "idat_chunks": chunk_counts.get("IDAT", 0),
+        "ancillary_bytes": ancillary_bytes,
+        "text_bytes": sum(chunk_bytes.get(name, 0) for name in _TEXT_CHUNKS),
+        "iccp_bytes": chunk_bytes.get("iCCP", 0),
+        "exif_bytes": chunk_bytes.get("eXIf", 0),
+        "raw_bytes": raw_bytes,
+        "compression_ratio": round(raw_bytes / idat_bytes, 3) if idat_bytes else None,
+        "crc_errors": crc_errors,
+        "truncated": truncated,
+        "error": None,
+        "chunk_bytes": chunk_bytes,
+        "chunk_counts": chunk_counts,
+    }
+
+
+class ScanIndex:
+    """
+    分析结果的 SQLite 持久化索引。
+
+    以 (绝对路径, 分析类型) 为主键，同时记录文件大小与 mtime（纳秒）；
+    两者都没变时直接返回上次的结果，不再打开文件。
+    """
+
+    def __init__(self, db_path):
+        self.conn = sqlite3.connect(os.path.expanduser(db_path))
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS scans ("
+            " path TEXT NOT NULL, kind TEXT NOT NULL, size INTEGER NOT NULL,"
+            " mtime_ns INTEGER NOT NULL, record TEXT NOT NULL, scanned_at REAL NOT NULL,"
+            " PRIMARY KEY (path, kind))"
+        )
+
+    def load(self, kind, root) -> dict:
+        """读取 root 目录下某类分析的全部记录：{绝对路径: (size, mtime_ns, record)}。"""
+        prefix = os.path.join(os.path.abspath(root), "")
+        rows = self.conn.execute(
+            "SELECT path, size, mtime_ns, record FROM scans WHERE kind = ? AND substr(path, 1, ?) = ?",
+            (kind, len(prefix), prefix),
+        )
+        return {path: (size, mtime_ns, record) for path, size, mtime_ns, record in rows}
+
+    def save(self, kind, entries) -> None:
+        """批量写入 [(绝对路径, size, mtime_ns, record_dict)]。"""
+        now = time.time()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO scans (path, kind, size, mtime_ns, record, scanned_at) VALUES (?, ?, ?, ?, ?, ?)",
+            [(path, kind, size, mtime_ns, json.dumps(record, ensure_ascii=False), now)
+             for path, size, mtime_ns, record in entries],
+        )
+        self.conn.commit()
+
+    def prune(self, kind, paths) -> None:
+        """删除已不存在的文件对应的记录。"""
+        self.conn.executemany("DELETE FROM scans WHERE path = ? AND kind = ?", [(p, kind) for p in paths])
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def describe_file(image_path) -> dict:
+    """读取单个文件的头信息，生成一条盘点记录；出错时记录 error 字段而不抛异常。"""
+    record = dict.fromkeys(INVENTORY_FIELDS)
+    record["path"] = image_path
+    try:
+        record["file_size"] = os.path.getsize(image_path)
+        record.update(read_image_header(image_path))
+    except (OSError, ValueError, struct.error) as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    return record
+
+
+def describe_chunks(image_path) -> dict:
+    """分析单个 PNG 的块列表，生成一条记录；出错时记录 error 字段而不抛异常。"""
+    try:
+        return analyze_png_chunks(image_path)
+    except (OSError, ValueError, struct.error) as e:
+        record = dict.fromkeys(CHUNK_FIELDS)
+        record["path"] = image_path
+        record["error"] = f"{type(e).__name__}: {e}"
+        return record
+
+
+def iter_image_files(root, exts=IMAGE_EXTS):
+    """递归遍历目录，产出扩展名属于 exts 的文件路径。"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.lower().endswith(exts):
+                yield os.path.join(dirpath, name)
+
+
+def _describe_cached(describe, cached):
+    """
+    包装 describe：stat 结果与索引中的 size/mtime 一致时直接复用缓存记录。
+
+    返回的函数产出 (record, 需写回索引的条目或 None)。
+    """
+    def run(image_path):
+        abs_path = os.path.abspath(image_path)
+        try:
+            st = os.stat(abs_path)
+        except OSError:
+            return describe(image_path), None
+        hit = cached.get(abs_path)
+        if hit is not None and hit[0] == st.st_size and hit[1] == st.st_mtime_ns:
+            record = json.loads(hit[2])
+            record["path"] = image_path
+            return record, None
+        record = describe(image_path)
+        return record, (abs_path, st.st_size, st.st_mtime_ns, record)
+
+    return run
+
+
+def inventory(root, fmt="json", workers=None, out=sys.stdout, chunks=False, index_path=None) -> int:
+    """
+    多线程盘点目录下所有图片，每个文件输出一行 JSON 或 CSV。
+
+    默认只读取文件头；chunks=True 时改为对 PNG 做块级分析。耗时主要在
+    文件系统 I/O，因此用线程池并发读取。统计信息输出到 stderr，不影响
+    stdout 的数据行。
+
+    参数：
+        root: 目录路径
+        fmt: json（每行一个 JSON 对象）或 csv（带表头）
+        workers: 线程数，默认 min(32, CPU 数 × 4)
+        out: 输出流
+        chunks: 是否做 PNG 块级分析（只遍历 .png 文件）
+        index_path: SQLite 索引路径；指定后未变化的文件直接复用上次结果
+
+    返回：
+        int: 读取失败的文件数
+    """
+    if workers is None:
+        workers = min(32, (os.cpu_count() or 1) * 4)
+
+    if chunks:
+        kind, describe, fields, exts = "chunks", describe_chunks, CHUNK_FIELDS, (".png",)
+    else:
+        kind, describe, fields, exts = "header", describe_file, INVENTORY_FIELDS, IMAGE_EXTS
+
+    index = ScanIndex(index_path) if index_path else None
+    cached = index.load(kind, root) if index else {}
+    run = _describe_cached(describe, cached)
+
+    writer = None
+    if fmt == "csv":
+        writer = csv.DictWriter(out, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+
+    start = time.perf_counter()
+    count = failed = 0
+    fresh = []
+    seen = set()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for record, entry in pool.map(run, iter_image_files(root, exts)):
+            count += 1
+            seen.add(os.path.abspath(record["path"]))
+            if record["error"]:
+                failed += 1
+            elif entry is not None:
+                fresh.append(entry)
+            if writer is not None:
+                writer.writerow(record)
+            else:
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    if index:
+        index.save(kind, fresh)
+        index.prune(kind, [p for p in cached if p not in seen])
+        index.close()
+
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed > 0 else 0.0
+    summary = f"共 {count} 个文件，失败 {failed} 个，耗时 {elapsed:.2f} 秒（{rate:.0f} 文件/秒）"
+    if index:
+        summary += f"，重新分析 {len(fresh)} 个，复用索引 {count - failed - len(fresh)} 个"
+    print(summary, file=sys.stderr)
+    return failed
+
+
+def print_chunk_report(report) -> None:
+    """打印单个 PNG 的块级分析结果"""
+    file_size = report["file_size"]
+    ratio = report["compression_ratio"]
+
+    print("=" * 60)
+    print("PNG 块分析")
+    print("=" * 60)
+    print(f"文件路径: {report['path']}")
+    print(f"图片尺寸: {report['width']} x {report['height']} 像素，位深 {report['bit_depth']}，"
+          f"颜色类型 {report['color_type']}，{'隔行' if report['interlace'] else '非隔行'}")
+    print(f"文件大小: {file_size:,} 字节")
+    print(f"{'块类型':<8}{'数量':>8}{'字节数':>16}{'占比':>10}")
+    for name, nbytes in sorted(report["chunk_bytes"].items(), key=lambda kv: -kv[1]):
+        share = nbytes / file_size * 100 if file_size else 0.0
+        print(f"{name:<10}{report['chunk_counts'][name]:>8}{nbytes:>18,}{share:>11.2f}%")
+    print(f"IDAT 字节: {report['idat_bytes']:,}，辅助块字节: {report['ancillary_bytes']:,}")
+    print(f"原始扫描行: {report['raw_bytes']:,} 字节，压缩率: {f'{ratio:.2f}x' if ratio else 'N/A'}")
+    print(f"CRC 错误: {report['crc_errors']} 个" + ("，文件被截断（缺少 IEND）" if report["truncated"] else ""))
+    print("=" * 60)
+
+
+def print_info(image_path, img_format, width, height, has_alpha):
+    """按统一格式打印单张图片信息"""
+    file_size = os.path.getsize(image_path)
+    file_size_mb = file_size / (1024 * 1024)
+
+    print("=" * 60)
+    print("PNG 图片信息")
+    print("=" * 60)
+    print(f"文件路径: {image_path}")
+    print(f"图片格式: {img_format or 'Unknown'}")
+    print(f"图片尺寸: {width} x {height} 像素")
+    print(f"文件大小: {file_size:,} 字节 ({file_size_mb:.2f} MB)")
+    print(f"宽高比: {width/height:.2f}" if height > 0 else "宽高比: N/A")
+    print(f"是否有 alpha 通道: {'是' if has_alpha else '否'}")
+    print("=" * 60)
+
+
+def analyze_image(image_path, header_only=False):
     """
     分析PNG图片的尺寸信息
     
     参数：
         image_path: 图片文件路径
+        header_only: 为 True 时只解析文件头，不经过 Pillow
     
     返回：
         tuple: (width, height) 图片尺寸，失败时返回 None
@@ -57,7 +513,17 @@ def analyze_image(image_path):
         _, ext = os.path.splitext(image_path)
         if ext.lower() not in ['.png']:
             print(f"警告: 文件扩展名不是 .png ({ext})，但仍会尝试解析")
-        
+
+        if header_only:
+            info = read_image_header(image_path)
+            if info["format"] != 'PNG':
+                print(f"警告: 图片格式是 {info['format']}，不是 PNG")
+            width, height = info["width"], info["height"]
+            print_info(image_path, info["format"], width, height, info["has_alpha"])
+            return (width, height)
+
+        from PIL import Image
+
         # 打开并分析图片
         with Image.open(image_path) as img:
             # 获取图片格式
@@ -68,24 +534,11 @@ def analyze_image(image_path):
             # 获取图片尺寸
             width, height = img.size
             
-            # 获取文件大小
-            file_size = os.path.getsize(image_path)
-            file_size_mb = file_size / (1024 * 1024)
-            
             # 是否有 alpha 通道（RGBA/LA/PA 等模式包含 A）
             has_alpha = img.mode and 'A' in img.mode
             
             # 打印信息
-            print("=" * 60)
-            print("PNG 图片信息")
-            print("=" * 60)
-            print(f"文件路径: {image_path}")
-            print(f"图片格式: {img_format or 'Unknown'}")
-            print(f"图片尺寸: {width} x {height} 像素")
-            print(f"文件大小: {file_size:,} 字节 ({file_size_mb:.2f} MB)")
-            print(f"宽高比: {width/height:.2f}" if height > 0 else "宽高比: N/A")
-            print(f"是否有 alpha 通道: {'是' if has_alpha else '否'}")
-            print("=" * 60)
+            print_info(image_path, img_format, width, height, has_alpha)
             
             return (width, height)
             
@@ -102,21 +555,79 @@ def analyze_image(image_path):
 
 def main():
     """主函数"""
-    # 检查参数数量
-    if len(sys.argv) != 2:
-        print("错误: 参数数量不正确")
-        print()
-        print_usage()
-        sys.exit(1)
-    
-    # 检查帮助参数
-    image_path = sys.argv[1]
-    if image_path in ['-h', '--help', 'help']:
-        print_usage()
-        sys.exit(0)
-    
+    parser = argparse.ArgumentParser(
+        description="分析图片尺寸、格式与透明通道；传入目录时多线程盘点，每个文件输出一行 JSON/CSV。",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+示例:
+  python png_info.py example.png
+  python png_info.py example.png --header-only
+  python png_info.py ./assets > inventory.jsonl
+  python png_info.py ./assets --format csv --workers 64 > inventory.csv
+  python png_info.py example.png --chunks
+  python png_info.py ./assets --chunks --index png_index.sqlite > chunks.jsonl
+        """,
+    )
+    parser.add_argument("path", help="图片文件路径，或要盘点的目录")
+    parser.add_argument(
+        "--header-only",
+        action="store_true",
+        help="单文件模式下只解析文件头（PNG IHDR / JPEG SOF / WebP），不经过 Pillow 解码",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["json", "csv"],
+        default=None,
+        help="目录盘点的输出格式：json=每行一个 JSON 对象（默认）；csv=带表头的 CSV",
+    )
+    parser.add_argument(
+        "--chunks",
+        action="store_true",
+        help="PNG 块级分析：用 mmap 统计 IDAT/辅助块字节、校验 CRC、估算压缩率，不解码像素",
+    )
+    parser.add_argument(
+        "--index",
+        default=None,
+        metavar="DB",
+        help="SQLite 索引文件；目录盘点时按 路径+大小+mtime 复用上次结果，只分析有变化的文件",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        metavar="N",
+        help="目录盘点的线程数，默认 min(32, CPU 数 × 4)",
+    )
+    args = parser.parse_args()
+
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers 必须为正整数")
+
+    if os.path.isdir(args.path):
+        failed = inventory(
+            args.path,
+            fmt=args.format or "json",
+            workers=args.workers,
+            chunks=args.chunks,
+            index_path=args.index,
+        )
+        sys.exit(2 if failed else 0)
+
+    # 以下为单文件模式，只对目录盘点有意义的选项不能静默忽略
+    for option, value in (("--format", args.format), ("--index", args.index), ("--workers", args.workers)):
+        if value is not None:
+            parser.error(f"{option} 只用于目录盘点，{args.path} 不是目录")
+
+    if args.chunks:
+        record = describe_chunks(args.path)
+        if record["error"]:
+            print(f"错误: {record['error']}")
+            sys.exit(2)
+        print_chunk_report(record)
+        sys.exit(1 if record["crc_errors"] or record["truncated"] else 0)
+
     # 分析图片
-    result = analyze_image(image_path)
+    result = analyze_image(args.path, header_only=args.header_only)
     
     # 根据结果退出
     if result is None:
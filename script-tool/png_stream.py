@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+PNG 条带流式读写
+
+按水平条带（band）解码、编码 8 位非隔行 PNG。无论图片多大，
+内存里只保留一个条带和 zlib 的流状态，所以峰值内存只和条带高度有关。
+
+解码：按顺序 inflate IDAT 数据流，每凑够一个条带的扫描行，就把上一条带的
+最后一行（已还原）当作 filter=0 的首行拼到前面，交给 Pillow 的 zip 解码器
+还原滤波，然后丢掉这一行。Up/Average/Paeth 滤波依赖上一行，这样拼接之后
+每个条带都能单独解码。
+
+编码：用 numpy 对整块扫描行向量化计算 5 种 PNG 滤波，逐行选绝对值和最小的
+一种（与 libpng 的启发式相同），然后流式 deflate 并写成 IDAT 块。
+
+并行编码（write_png_parallel）：与 pigz 相同的做法，把滤波后的数据切成
+约 128 KB 的块，每块以前一块末尾 32 KB 作为预置字典、在线程池中独立 deflate
+（zlib 压缩期间释放 GIL），块尾用 Z_SYNC_FLUSH 对齐到字节边界，最后一块
+Z_FINISH；拼接后补上 zlib 头与 Adler-32 校验，就是一个合法的 zlib 流。
+
+供 png_cutout.py 等脚本导入使用，不单独作为命令行工具。
+
+依赖：Python 3.6+，Pillow (PIL)，numpy
+"""
+
+import struct
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# (位深, 颜色类型) -> (Pillow 模式, 每像素字节数)；仅支持 8 位
+_LAYOUTS = {
+    (8, 0): ("L", 1),
+    (8, 2): ("RGB", 3),
+    (8, 3): ("P", 1),
+    (8, 4): ("LA", 2),
+    (8, 6): ("RGBA", 4),
+}
+
+# Pillow 模式 -> (PNG 颜色类型, 每像素字节数)
+_COLOR_TYPES = {
+    "L": (0, 1),
+    "RGB": (2, 3),
+    "LA": (4, 2),
+    "RGBA": (6, 4),
+}
+
+# 与像素内容无关、需原样保留到输出的色彩/物理尺寸相关辅助块
+COLOR_CHUNKS = (b"iCCP", b"sRGB", b"gAMA", b"cHRM", b"pHYs")
+
+# 单个 IDAT 块的目标大小
+IDAT_SIZE = 64 * 1024
+
+# 滤波时一次处理的行数，限制中间数组（5 种候选 × int16）的内存
+FILTER_BLOCK_ROWS = 16
+
+# 并行 deflate 时每块的目标字节数与预置字典长度（deflate 窗口上限 32 KB）
+DEFLATE_BLOCK_SIZE = 128 * 1024
+DEFLATE_DICT_SIZE = 32 * 1024
+
+# 自动选择压缩级别：候选级别、采样条带数、容差
+# 取压缩后大小不超过最优结果 (1 + 容差) 倍的级别中实测最快的一个
+AUTO_LEVELS = (1, 3, 6, 9)
+AUTO_SAMPLE_BANDS = 8
+AUTO_TOLERANCE = 0.01
+
+
+def write_chunk(f, chunk_type: bytes, data: bytes = b"") -> None:
+    """写入一个 PNG 块：长度 + 类型 + 数据 + CRC。"""
+    f.write(struct.pack(">I", len(data)))
+    f.write(chunk_type)
+    f.write(data)
+    f.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(chunk_type)) & 0xFFFFFFFF))
+
+
+class PngBandReader:
+    """
+    按条带顺序解码 PNG。
+
+    打开时只读取 IDAT 之前的块；iter_bands() 每次产出一个原始模式
+    （L/RGB/P/LA/RGBA）的 Pillow 图像，调色板与 tRNS 已附加到图像上，
+    可直接 convert("RGBA")。
+    """
+
+    def __init__(self, path: str):
+        self._f = open(path, "rb")
+        try:
+            self._read_header()
+        except Exception:
+            self._f.close()
+            raise
+
+    def _read_header(self) -> None:
+        if self._f.read(8) != PNG_SIGNATURE:
+            raise ValueError("不是有效的 PNG 文件")
+
+        self.palette = None
+        self.transparency = None
+        self.color_chunks = []
+        ihdr = None
+        while True:
+            head = self._f.read(8)
+            if len(head) < 8:
+                raise ValueError("PNG 文件不完整：缺少 IDAT")
+            length, chunk_type = struct.unpack(">I4s", head)
+            if chunk_type == b"IDAT":
+                self._pending_idat = length
+                break
+            data = self._f.read(length)
+            self._f.read(4)  # CRC
+            if chunk_type == b"IHDR":
+                ihdr = struct.unpack(">IIBBBBB", data)
+            elif chunk_type == b"PLTE":
+                self.palette = data
+            elif chunk_type == b"tRNS":
+                self.transparency = data
+            elif chunk_type in COLOR_CHUNKS:
+                self.color_chunks.append((chunk_type, data))
+
+        if ihdr is None:
+            raise ValueError("PNG 文件缺少 IHDR")
+        self.width, self.height, bit_depth, color_type, _, _, interlace = ihdr
+        if interlace:
+            raise ValueError("不支持隔行扫描（Adam7）PNG")
+        if (bit_depth, color_type) not in _LAYOUTS:
+            raise ValueError(f"不支持的 PNG 格式：位深 {bit_depth}，颜色类型 {color_type}（仅支持 8 位）")
+        self.mode, self._bpp = _LAYOUTS[(bit_depth, color_type)]
+        self._row_bytes = 1 + self.width * self._bpp
+
+    def _iter_idat(self):
+        """依次产出连续 IDAT 块的数据。"""
+        length = self._pending_idat
+        while True:
+            yield self._f.read(length)
+            self._f.read(4)  # CRC
+            head = self._f.read(8)
+            if len(head) < 8:
+                return
+            length, chunk_type = struct.unpack(">I4s", head)
+            if chunk_type != b"IDAT":
+                return
+
+    def _decode_band(self, prev_row: bytes, raw: bytes) -> Image.Image:
+        rows = len(raw) // self._row_bytes
+        data = zlib.compress(prev_row + raw, 0)
+        band = Image.frombytes(self.mode, (self.width, rows + 1), data, "zip", self.mode)
+        band = band.crop((0, 1, self.width, rows + 1))
+        if self.mode == "P" and self.palette is not None:
+            band.putpalette(self.palette)
+        if self.transparency is not None:
+            band.info["transparency"] = self._transparency_value()
+        return band
+
+    def _transparency_value(self):
+        """把 tRNS 数据转成 Pillow info["transparency"] 的取值形式。"""
+        t = self.transparency
+        if self.mode == "P":
+            return t
+        if self.mode == "L":
+            return struct.unpack(">H", t[:2])[0] & 0xFF
+        if self.mode == "RGB":
+            return tuple(v & 0xFF for v in struct.unpack(">HHH", t[:6]))
+        return None
+
+    def iter_bands(self, band_height: int):
+        """
+        逐条带产出解码后的图像。
+
+        :param band_height: 每个条带的行数（最后一个条带可能更少）
+        """
+        if band_height < 1:
+            raise ValueError("条带高度必须为正整数")
+        need = band_height * self._row_bytes
+        # 首行的「上一行」按规范视为全 0
+        prev_row = bytes(self._row_bytes)
+        decomp = zlib.decompressobj()
+        buf = bytearray()
+        rows_done = 0
+
+        for payload in self._iter_idat():
+            data = payload
+            while data:
+                buf += decomp.decompress(data, need)
+                data = decomp.unconsumed_tail
+                while len(buf) >= need:
+                    raw = bytes(buf[:need])
+                    del buf[:need]
+                    band = self._decode_band(prev_row, raw)
+                    prev_row = b"\x00" + band.crop((0, band_height - 1, self.width, band_height)).tobytes()
+                    rows_done += band_height
+                    yield band
+
+        buf += decomp.flush()
+        tail_rows = min(len(buf) // self._row_bytes, self.height - rows_done)
+        if tail_rows > 0:
+            yield self._decode_band(prev_row, bytes(buf[: tail_rows * self._row_bytes]))
+            rows_done += tail_rows
+        if rows_done != self.height:
+            raise ValueError(f"PNG 数据不完整：期望 {self.height} 行，实际 {rows_done} 行")
+
+    def close(self) -> None:
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _paeth(a, b, c):
+    """Paeth 预测器（向量化），a=左、b=上、c=左上，均为 int16 数组。"""
+    p = a + b - c
+    pa = np.abs(p - a)
+    pb = np.abs(p - b)
+    pc = np.abs(p - c)
+    return np.where((pa <= pb) & (pa <= pc), a, np.where(pb <= pc, b, c))
+
+
+def filter_scanlines(rows, prev, bpp: int):
+    """
+    对一组扫描行做自适应 PNG 滤波。
+
+    对每行分别计算 None/Sub/Up/Average/Paeth 五种滤波结果，选取
+    有符号字节绝对值和最小的一种。
+
+    :param rows: 形状 (行数, 行字节数) 的 uint8 数组
+    :param prev: 第一行的上一行，形状 (行字节数,) 的 uint8 数组（图像首行传全 0）
+    :param bpp: 每像素字节数
+    :return: 形状 (行数, 1 + 行字节数) 的 uint8 数组，每行首字节为滤波类型
+    """
+    n, length = rows.shape
+    x = rows.astype(np.int16)
+    up = np.empty_like(x)
+    up[0] = prev
+    up[1:] = x[:-1]
+    left = np.zeros_like(x)
+    left[:, bpp:] = x[:, :-bpp]
+    upleft = np.zeros_like(x)
+    upleft[:, bpp:] = up[:, :-bpp]
+
+    candidates = np.stack([
+        x,
+        x - left,
+        x - up,
+        x - ((left + up) >> 1),
+        x - _paeth(left, up, upleft),
+    ]).astype(np.uint8)
+    cost = np.abs(candidates.view(np.int8).astype(np.int16)).sum(axis=2, dtype=np.int64)
+    best = cost.argmin(axis=0)
+
+    out = np.empty((n, length + 1), dtype=np.uint8)
+    out[:, 0] = best
+    out[:, 1:] = candidates[best, np.arange(n)]
+    return out
+
+
+def _filter_block(rows, prev, bpp: int) -> bytes:
+    """按 FILTER_BLOCK_ROWS 分段滤波一组扫描行，返回拼接后的字节串。"""
+    out = np.empty((len(rows), rows.shape[1] + 1), dtype=np.uint8)
+    for start in range(0, len(rows), FILTER_BLOCK_ROWS):
+        block = rows[start:start + FILTER_BLOCK_ROWS]
+        out[start:start + len(block)] = filter_scanlines(block, prev, bpp)
+        prev = block[-1]
+    return out.tobytes()
+
+
+def _deflate_block(data: bytes, zdict: bytes, level: int, last: bool) -> bytes:
+    """把一块数据压缩成原始 deflate 片段；非最后一块以 Z_SYNC_FLUSH 结束，便于直接拼接。"""
+    if zdict:
+        comp = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS, zlib.DEF_MEM_LEVEL, zlib.Z_FILTERED, zdict)
+    else:
+        comp = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS, zlib.DEF_MEM_LEVEL, zlib.Z_FILTERED)
+    return comp.compress(data) + comp.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+
+def _zlib_header(level: int) -> bytes:
+    """生成 zlib 流头（32 KB 窗口，FLEVEL 按压缩级别填写）。"""
+    flevel = 0 if level < 2 else 1 if level < 6 else 2 if level == 6 else 3
+    cmf, flg = 0x78, flevel << 6
+    flg += (31 - ((cmf << 8) | flg) % 31) % 31
+    return bytes((cmf, flg))
+
+
+def _as_rows(pixels, mode: str):
+    """把 (高, 宽[, 通道]) 像素数组整理成 (高, 行字节数) 的连续 uint8 数组，并返回每像素字节数。"""
+    if mode not in _COLOR_TYPES:
+        raise ValueError(f"不支持的输出模式: {mode}")
+    bpp = _COLOR_TYPES[mode][1]
+    rows = np.ascontiguousarray(pixels, dtype=np.uint8)
+    return rows.reshape(rows.shape[0], -1), bpp
+
+
+def _block_rows(row_bytes: int) -> int:
+    return max(1, DEFLATE_BLOCK_SIZE // (row_bytes + 1))
+
+
+def icc_chunk(profile: bytes):
+    """生成与 Pillow 一致的 iCCP 块（配置名 "ICC Profile"）。"""
+    return b"iCCP", b"ICC Profile\x00\x00" + zlib.compress(profile)
+
+
+def write_png_parallel(
+    path: str,
+    pixels,
+    mode: str = "RGB",
+    compress_level: int = 6,
+    workers=None,
+    extra_chunks=(),
+) -> None:
+    """
+    多线程滤波与 deflate，写出 8 位非隔行 PNG。
+
+    与 PngBandWriter 不同，这里需要整张图的像素数组；滤波后的数据在写完前全部保留在内存中，
+    大小约等于原始像素。
+
+    :param pixels: 形状 (高, 宽) 或 (高, 宽, 通道数) 的 uint8 数组
+    :param mode: L / LA / RGB / RGBA
+    :param compress_level: zlib 压缩级别 0–9
+    :param workers: 线程数，默认由 ThreadPoolExecutor 决定
+    :param extra_chunks: 写在 IHDR 之后的 (类型, 数据) 辅助块
+    """
+    rows, bpp = _as_rows(pixels, mode)
+    height, row_bytes = rows.shape
+    width = row_bytes // bpp
+    step = _block_rows(row_bytes)
+    starts = range(0, height, step)
+    zero = np.zeros(row_bytes, dtype=np.uint8)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool, open(path, "wb") as f:
+        filtered = [
+            pool.submit(_filter_block, rows[s:s + step], rows[s - 1] if s else zero, bpp)
+            for s in starts
+        ]
+        deflated = []
+        for i, fut in enumerate(filtered):
+            zdict = filtered[i - 1].result()[-DEFLATE_DICT_SIZE:] if i else b""
+            last = i == len(filtered) - 1
+            deflated.append(pool.submit(_deflate_block, fut.result(), zdict, compress_level, last))
+
+        f.write(PNG_SIGNATURE)
+        write_chunk(f, b"IHDR", struct.pack(">IIBBBBB", width, height, 8, _COLOR_TYPES[mode][0], 0, 0, 0))
+        for chunk_type, data in extra_chunks:
+            write_chunk(f, chunk_type, data)
+
+        # Adler-32 在主线程顺序计算，与后面块的压缩重叠进行
+        pending = bytearray(_zlib_header(compress_level))
+        adler = 1
+        for fut_filtered, fut_deflated in zip(filtered, deflated):
+            adler = zlib.adler32(fut_filtered.result(), adler)
+            pending += fut_deflated.result()
+            if len(pending) >= IDAT_SIZE:
+                write_chunk(f, b"IDAT", bytes(pending))
+                pending.clear()
+        pending += struct.pack(">I", adler & 0xFFFFFFFF)
+        write_chunk(f, b"IDAT", bytes(pending))
+        write_chunk(f, b"IEND")
+
+
+def choose_level(pixels, mode: str = "RGB", levels=AUTO_LEVELS, tolerance: float = AUTO_TOLERANCE):
+    """
+    在若干均匀分布的采样条带上试压缩，自动选择压缩级别。
+
+    每个条带的大小与 write_png_parallel 的一个 deflate 块相同，结果能代表实际写出时的表现。
+    在压缩后大小不超过最优结果 (1 + tolerance) 倍的级别中，选实测速度最快的一个。
+
+    :return: (选中的级别, [(级别, 压缩率, 速度 MB/s), ...])
+    """
+    rows, bpp = _as_rows(pixels, mode)
+    height, row_bytes = rows.shape
+    step = _block_rows(row_bytes)
+    count = min(AUTO_SAMPLE_BANDS, (height + step - 1) // step)
+    starts = sorted({(height - step) * i // max(count - 1, 1) for i in range(count)}) if height > step else [0]
+    zero = np.zeros(row_bytes, dtype=np.uint8)
+    samples = [_filter_block(rows[s:s + step], rows[s - 1] if s else zero, bpp) for s in starts]
+    raw = sum(len(b) for b in samples)
+
+    stats = []
+    for level in levels:
+        t0 = time.perf_counter()
+        size = sum(len(_deflate_block(b, b"", level, True)) for b in samples)
+        elapsed = max(time.perf_counter() - t0, 1e-9)
+        stats.append((level, size / raw, raw / elapsed / 1024 / 1024))
+
+    best = min(ratio for _, ratio, _ in stats)
+    candidates = [s for s in stats if s[1] <= best * (1 + tolerance)]
+    return max(candidates, key=lambda s: s[2])[0], stats
+
+
+class PngBandWriter:
+    """
+    按条带顺序编码 8 位非隔行 PNG（L/LA/RGB/RGBA）。
+
+    write_rows() 接收形状 (行数, 宽, 通道数) 的 uint8 数组，行数可以任意；
+    写满 height 行后调用 close() 写入 IEND。
+    """
+
+    def __init__(
+        self,
+        path: str,
+        width: int,
+        height: int,
+        mode: str = "RGBA",
+        extra_chunks=(),
+        compress_level: int = 6,
+    ):
+        if mode not in _COLOR_TYPES:
+            raise ValueError(f"不支持的输出模式: {mode}")
+        color_type, self._bpp = _COLOR_TYPES[mode]
+        self.width = width
+        self.height = height
+        self._rows_written = 0
+        self._prev = np.zeros(width * self._bpp, dtype=np.uint8)
+        # 与 libpng / Pillow 相同，滤波后的数据用 Z_FILTERED 策略压缩
+        self._comp = zlib.compressobj(compress_level, zlib.DEFLATED, zlib.MAX_WBITS, zlib.DEF_MEM_LEVEL, zlib.Z_FILTERED)
+        self._pending = bytearray()
+
+        self._f = open(path, "wb")
+        self._f.write(PNG_SIGNATURE)
+        write_chunk(self._f, b"IHDR", struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0))
+        for chunk_type, data in extra_chunks:
+            write_chunk(self._f, chunk_type, data)
+
+    def write_rows(self, pixels) -> None:
+        rows = np.ascontiguousarray(pixels, dtype=np.uint8).reshape(len(pixels), -1)
+        if rows.shape[1] != self.width * self._bpp:
+            raise ValueError("行宽与图像宽度不一致")
+        if self._rows_written + len(rows) > self.height:
+            raise ValueError("写入行数超过图像高度")
+
+        for start in range(0, len(rows), FILTER_BLOCK_ROWS):
+            block = rows[start:start + FILTER_BLOCK_ROWS]
+            filtered = filter_scanlines(block, self._prev, self._bpp)
+            self._prev = block[-1]
+            self._pending += self._comp.compress(filtered.tobytes())
+            if len(self._pending) >= IDAT_SIZE:
+                write_chunk(self._f, b"IDAT", bytes(self._pending))
+                self._pending.clear()
+        self._rows_written += len(rows)
+
+    def close(self) -> None:
+        if self._f.closed:
+            return
+        try:
+            if self._rows_written != self.height:
+                raise ValueError(f"写入行数不足：期望 {self.height} 行，实际 {self._rows_written} 行")
+            self._pending += self._comp.flush()
+            write_chunk(self._f, b"IDAT", bytes(self._pending))
+            write_chunk(self._f, b"IEND")
+        finally:
+            self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self._f.close()
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+未压缩 RGBA 中间格式（.rgba）
+
+流水线 png_cutout.py → image_resize.py → png2jpg.py 的每一步都要写一次、
+再读一次压缩文件，deflate 与 inflate 的耗时往往超过处理本身。本模块定义一个
+极简的中间格式：64 字节文件头 + 按行排列的 8 位 RGBA 像素，中间步骤输出为
+.rgba，只有最后一步才做压缩编码。
+
+- 零拷贝读取：文件以 mmap 映射，Image.frombuffer 直接把映射内存当作像素缓冲区
+  （RGBA 在 Pillow 的可映射模式之列），也可用 read_array 得到 numpy.memmap
+- 写出按条带 tobytes，额外内存只有一个条带；先写临时文件再替换目标
+- 各工具通过 open_image / save_image 读写：输入按文件头魔数识别，
+  输出按扩展名 .rgba 决定格式，其他路径仍交给 Pillow
+
+文件头（小端）：魔数 8 字节、版本、头长度、宽、高（各 uint32），其余补零到 64 字节，
+像素数据从 64 字节处开始（对齐到缓存行），每行 宽×4 字节、无填充。
+
+依赖：Python 3.6+，Pillow (PIL)；read_array 需要 numpy
+用法：python raw_image.py <文件.rgba> [-o 输出.png]
+      python raw_image.py <输入.png> --benchmark [--size WxH] [--repeat N]
+"""
+
+import argparse
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from PIL import Image
+
+RAW_MAGIC = b"\x89RGBA\r\n\x1a"
+RAW_VERSION = 1
+RAW_EXTENSION = ".rgba"
+RAW_MODE = "RGBA"
+
+# 文件头：魔数、版本、头长度、宽、高；像素从 HEADER_SIZE 处开始
+_HEADER = struct.Struct("<8sIIII")
+HEADER_SIZE = 64
+
+# 写出时每个条带的字节数上限，限制 tobytes 的临时内存
+WRITE_BAND_BYTES = 8 * 1024 * 1024
+
+
+def is_raw_path(path) -> bool:
+    """输出路径是否应写成 .rgba 中间格式。"""
+    return os.fspath(path).lower().endswith(RAW_EXTENSION)
+
+
+def read_header(path) -> tuple:
+    """
+    读取并校验文件头。
+
+    :return: (宽, 高, 像素数据偏移)
+    :raises ValueError: 不是 .rgba 中间格式，或文件长度与头部不符
+    """
+    with open(path, "rb") as f:
+        head = f.read(HEADER_SIZE)
+        size = os.fstat(f.fileno()).st_size
+    if len(head) < _HEADER.size:
+        raise ValueError(f"不是 RGBA 中间格式: {path}")
+    magic, version, header_size, width, height = _HEADER.unpack_from(head)
+    if magic != RAW_MAGIC:
+        raise ValueError(f"不是 RGBA 中间格式: {path}")
+    if version != RAW_VERSION:
+        raise ValueError(f"不支持的 RGBA 中间格式版本 {version}: {path}")
+    if size < header_size + width * height * 4:
+        raise ValueError(f"文件被截断（应至少 {header_size + width * height * 4} 字节）: {path}")
+    return width, height, header_size
+
+
+def is_raw_file(path) -> bool:
+    """按魔数判断文件是否为 .rgba 中间格式（不看扩展名）。"""
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(RAW_MAGIC)) == RAW_MAGIC
+    except OSError:
+        return False
+
+
+def read_raw(path) -> Image.Image:
+    """
+    以 mmap 零拷贝打开 .rgba 文件，返回只读的 RGBA 图像。
+
+    像素直接位于映射内存中，图像对象存活期间映射保持有效；
+    修改像素前 Pillow 会自动复制（如 convert、paste 到新图）。
+    """
+    width, height, offset = read_header(path)
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    buf = memoryview(mm)[offset:offset + width * height * 4]
+    return Image.frombuffer(RAW_MODE, (width, height), buf, "raw", RAW_MODE, 0, 1)
+
+
+def read_array(path, writable: bool = False):
+    """
+    以 numpy.memmap 打开 .rgba 文件，形状为 (高, 宽, 4) 的 uint8 数组。
+
+    :param writable: True 时以 r+ 打开，对数组的修改直接写回文件
+    """
+    import numpy as np
+
+    width, height, offset = read_header(path)
+    return np.memmap(
+        path,
+        dtype=np.uint8,
+        mode="r+" if writable else "r",
+        offset=offset,
+        shape=(height, width, 4),
+    )
+
+
+def write_raw(img: Image.Image, path) -> None:
+    """把图像写成 .rgba 文件（非 RGBA 模式先转换），按条带写出，原子替换目标。"""
+    if img.mode != RAW_MODE:
+        img = img.convert(RAW_MODE)
+    width, height = img.size
+    header = _HEADER.pack(RAW_MAGIC, RAW_VERSION, HEADER_SIZE, width, height)
+    band = max(1, WRITE_BAND_BYTES // max(1, width * 4))
+
+    directory, name = os.path.split(os.path.abspath(path))
+    tmp = os.path.join(directory, f".{name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(header.ljust(HEADER_SIZE, b"\0"))
+            for top in range(0, height, band):
+                f.write(img.crop((0, top, width, min(height, top + band))).tobytes())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def open_image(path) -> Image.Image:
+    """打开图片：.rgba 中间格式零拷贝映射，其他格式交给 Image.open。"""
+    if is_raw_file(path):
+        return read_raw(path)
+    return Image.open(path)
+
+
+def save_image(img: Image.Image, path, format=None, **params) -> None:
+    """保存图片：路径以 .rgba 结尾时写中间格式（忽略编码参数），否则交给 Image.save。"""
+    if is_raw_path(path):
+        write_raw(img, path)
+    else:
+        img.save(path, format, **params)
+
+
+def benchmark(input_path: str, size=None, repeat: int = 3) -> None:
+    """
+    计时 png_cutout → image_resize → png2jpg 三步流水线：
+    中间文件分别为 PNG 与 .rgba，最终都输出 JPEG，并校验两者结果一致。
+
+    各步直接调用脚本的转换函数（不含解释器启动），每种取 repeat 次中的最小值。
+    """
+    from image2thumbnail import resize_to_thumbnail
+    from png2jpg import png_to_jpg
+    from png_cutout import checker_to_transparent
+
+    with Image.open(input_path) as probe:
+        src_size = probe.size
+    if size is None:
+        size = (max(1, src_size[0] // 2), max(1, src_size[1] // 2))
+    print(f"输入: {input_path}（{src_size[0]}x{src_size[1]}），缩放到 {size[0]}x{size[1]}，重复 {repeat} 次")
+
+    stages = ("png_cutout", "image_resize", "png2jpg")
+    results = {}
+    tmp = tempfile.mkdtemp(prefix="raw_image_bench_")
+    try:
+        for ext in (".png", RAW_EXTENSION):
+            cut = os.path.join(tmp, f"cut{ext}")
+            small = os.path.join(tmp, f"small{ext}")
+            final = os.path.join(tmp, f"final{ext}.jpg")
+            best = None
+            for _ in range(repeat):
+                times = []
+                start = time.perf_counter()
+                checker_to_transparent(input_path, cut)
+                times.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                resize_to_thumbnail(Path(cut), Path(small), size[0], size[1], "stretch")
+                times.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                png_to_jpg(small, final, verbose=False)
+                times.append(time.perf_counter() - start)
+                if best is None or sum(times) < sum(best):
+                    best = times
+            with open(final, "rb") as f:
+                output = f.read()
+            results[ext] = (best, os.path.getsize(cut), os.path.getsize(small), output)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    print()
+    print(f"{'中间格式':<8}" + "".join(f"{name:>14}" for name in stages) + f"{'合计':>12}  中间文件")
+    for ext, (times, cut_bytes, small_bytes, _) in results.items():
+        label = "PNG" if ext == ".png" else "RGBA"
+        cells = "".join(f"{t * 1000:12.1f}ms" for t in times)
+        print(
+            f"{label:<12}{cells}{sum(times) * 1000:10.1f}ms"
+            f"  {cut_bytes / 1e6:.1f} MB + {small_bytes / 1e6:.1f} MB"
+        )
+
+    png_total = sum(results[".png"][0])
+    raw_total = sum(results[RAW_EXTENSION][0])
+    same = results[".png"][3] == results[RAW_EXTENSION][3]
+    print()
+    print(f"加速比: {png_total / max(raw_total, 1e-9):.2f}x，最终 JPEG {'逐字节一致' if same else '不一致'}")
+    if not same:
+        raise RuntimeError("两条流水线的最终输出不一致")
+
+
+def _parse_size(text: str) -> tuple:
+    w, _, h = text.lower().replace("×", "x").partition("x")
+    if not (w.isdigit() and h.isdigit()) or int(w) < 1 or int(h) < 1:
+        raise argparse.ArgumentTypeError(f"尺寸格式应为 宽x高，当前: {text!r}")
+    return int(w), int(h)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="RGBA 中间格式（.rgba）：查看、转换为普通图片，或测量流水线中的收益。",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+示例：
+  python png_cutout.py in.png -o cut.rgba
+  python image_resize.py cut.rgba --size 1280x720 -o small.rgba
+  python png2jpg.py small.rgba out.jpg
+  python raw_image.py small.rgba -o small.png
+  python raw_image.py in.png --benchmark --size 1280x720
+        """,
+    )
+    parser.add_argument("input", help=".rgba 文件；--benchmark 时为流水线的输入 PNG")
+    parser.add_argument("-o", "--output", default=None, help="把 .rgba 转换为该路径的普通图片（按扩展名选格式）")
+    parser.add_argument("--benchmark", action="store_true", help="对比 PNG 中间文件与 .rgba 中间文件的三步流水线耗时")
+    parser.add_argument("--size", type=_parse_size, default=None, metavar="WxH", help="基准测试中缩放的目标尺寸，默认输入的一半")
+    parser.add_argument("--repeat", type=int, default=3, metavar="N", help="基准测试每种流水线的重复次数（默认 3）")
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.input):
+        print(f"错误：文件不存在：{args.input}", file=sys.stderr)
+        sys.exit(1)
+    if args.repeat < 1:
+        parser.error("--repeat 必须为正整数")
+
+    try:
+        if args.benchmark:
+            benchmark(args.input, args.size, args.repeat)
+            return
+        width, height, offset = read_header(args.input)
+        print(f"{args.input}: {width}x{height} RGBA，像素 {width * height * 4} 字节（偏移 {offset}）")
+        if args.output is not None:
+            save_image(read_raw(args.input), args.output)
+            print(f"已写入: {args.output}")
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"错误：{e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+script-tool 统一入口（子命令分发）
+
+把本目录下的各个脚本挂到同一个入口下：python script_tool.py <子命令> [参数...]，
+参数原样交给对应脚本，行为与直接运行 python <脚本>.py 完全一致。
+
+- 惰性加载：子命令表是静态的，列出命令、解析子命令名都不导入任何工具模块；
+  选中的脚本通过 runpy 以 __main__ 身份运行，librosa、whisper、pydub 等重型依赖
+  由各脚本在真正用到时才导入
+- 启动预算：bench 子命令在新进程中逐个测量 "<子命令> --help" 的冷启动耗时，
+  扣除裸解释器启动时间后与预算比较，超出预算或运行失败即以非零状态退出，
+  并用 -X importtime 列出最耗时的导入，便于定位是谁在模块顶层导入了重型依赖
+
+依赖：Python 3.7+（各子命令的依赖见对应脚本）
+用法：
+  python script_tool.py list
+  python script_tool.py <子命令> [参数...]
+  python script_tool.py bench [子命令...] [--budget-ms N] [--repeat N]
+"""
+
+import os
+import sys
+
+# 子命令 -> (模块名, 简要说明)；保持静态，列出命令时无需导入任何工具
+COMMANDS = {
+    "audio_io": ("audio_io", "按原生采样率读取音频、按需重采样与读取基准"),
+    "change_sound_volume": ("change_sound_volume", "MP3 响度归一化"),
+    "debug_server": ("debug_server", "HTTP 调试服务器，打印请求详情"),
+    "djvu2pdf": ("djvu2pdf", "DJVU 转 PDF"),
+    "filter_sound": ("filter_sound", "按音高滤波 WAV 并均衡音量"),
+    "font_preview": ("font_preview", "生成字体 PDF 预览"),
+    "image2thumbnail": ("image2thumbnail", "生成缩略图"),
+    "image_convert_batch": ("image_convert_batch", "PNG/JPG 批量并行转换"),
+    "image_dedupe": ("image_dedupe", "感知哈希查找近似重复图片"),
+    "image_filter": ("image_filter", "图片滤镜（高斯模糊、滤镜链）"),
+    "image_resize": ("image_resize", "转为指定宽高"),
+    "image_worker": ("image_worker", "图片处理常驻服务与客户端"),
+    "ios_screenshot_resize": ("ios_screenshot_resize", "iOS App Store 截屏尺寸转换"),
+    "jpg2png": ("jpg2png", "JPG 转 PNG"),
+    "md2pdf": ("md2pdf", "Markdown 转 PDF"),
+    "mix_sound": ("mix_sound", "双轨音频混音"),
+    "pick_sound": ("pick_sound", "录音拾取指定音高的采样"),
+    "pitch": ("pitch", "单音音高与置信度估计（稳态段 YIN）"),
+    "play_audio": ("play_audio", "播放音频，可指定区间与速度"),
+    "png2jpg": ("png2jpg", "PNG 转 JPG"),
+    "png_cutout": ("png_cutout", "PNG 棋盘格转透明"),
+    "png_info": ("png_info", "PNG 图片信息分析"),
+    "raw_image": ("raw_image", "未压缩 RGBA 中间格式查看、转换与基准测试"),
+    "send_kafka_template": ("send_kafka_template", "按 JSON 模板发送 Kafka 消息"),
+    "simple_server": ("simple_server", "返回固定 JSON 的简单 HTTP 服务器"),
+    "trim_audio_silence": ("trim_audio_silence", "音频去静音并裁剪"),
+    "txt2voice": ("txt2voice", "文本转语音（Edge TTS）"),
+    "voice2txt": ("voice2txt", "语音转文本（Whisper）"),
+    "wav2mp3": ("wav2mp3", "WAV 转 MP3"),
+}
+
+# 内置子命令
+BUILTINS = ("list", "bench")
+
+# bench 默认值：相对裸解释器的启动开销预算（毫秒）与每个命令的重复次数
+DEFAULT_BUDGET_MS = 150.0
+DEFAULT_REPEAT = 5
+
+# 超出预算时列出的最耗时导入条数
+IMPORTTIME_TOP = 8
+
+
+def print_commands(file=sys.stdout) -> None:
+    """打印子命令列表。"""
+    print("用法: python script_tool.py <子命令> [参数...]", file=file)
+    print("      python script_tool.py bench [子命令...] [--budget-ms N] [--repeat N]", file=file)
+    print(file=file)
+    print("子命令:", file=file)
+    width = max(len(name) for name in COMMANDS)
+    for name, (_, summary) in sorted(COMMANDS.items()):
+        print(f"  {name:<{width}}  {summary}", file=file)
+    print(file=file)
+    print("各子命令的参数见: python script_tool.py <子命令> --help", file=file)
+
+
+def resolve_command(name: str) -> str:
+    """子命令名 -> 模块名；允许带 .py 后缀（便于补全脚本文件名）。"""
+    if name.endswith(".py"):
+        name = name[:-3]
+    if name not in COMMANDS:
+        raise KeyError(name)
+    return COMMANDS[name][0]
+
+
+def run_command(name: str, argv) -> None:
+    """以 __main__ 身份运行子命令对应的脚本；其 SystemExit 原样向上传递。"""
+    import runpy
+
+    module = resolve_command(name)
+    # 脚本之间互相 import（如 image_resize -> image2thumbnail），需保证本目录在 sys.path 中
+    here = os.path.dirname(os.path.abspath(__file__))
+    if here not in sys.path:
+        sys.path.insert(0, here)
+    sys.argv = [module] + list(argv)
+    runpy.run_module(module, run_name="__main__", alter_sys=True)
+
+
+def _time_process(cmd, repeat: int):
+    """运行 repeat 次命令，返回 (各次耗时毫秒列表, 最后一次的返回码)。"""
+    import subprocess
+    import time
+
+    times = []
+    code = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append((time.perf_counter() - start) * 1000.0)
+        code = proc.returncode
+    return times, code
+
+
+def top_imports(name: str, limit: int = IMPORTTIME_TOP):
+    """用 -X importtime 运行一次 "<子命令> --help"，返回累计耗时最多的 [(毫秒, 模块名)]。"""
+    import subprocess
+
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", os.path.abspath(__file__), name, "--help"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        # 格式: "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        module = parts[2].rstrip()
+        # 只看顶层导入（缩进 1 格），子模块的耗时已计入其父包
+        if module.startswith("  "):
+            continue
+        rows.append((int(parts[1]) / 1000.0, module.strip()))
+    rows.sort(reverse=True)
+    return rows[:limit]
+
+
+def bench(names, budget_ms: float, repeat: int) -> int:
+    """
+    测量各子命令 "--help" 的冷启动耗时并与预算比较。
+
+    每个命令先预热一次（生成 __pycache__），再运行 repeat 次取最小值，
+    扣除同样方式测得的裸解释器启动时间，得到该命令自身的启动开销。
+    :return: 全部通过返回 0，否则返回 1
+    """
+    import statistics
+
+    script = os.path.abspath(__file__)
+    baseline_times, _ = _time_process([sys.executable, "-c", "pass"], repeat + 1)
+    baseline = min(baseline_times)
+    print(f"裸解释器启动: {baseline:.1f} ms（{sys.executable}）")
+    print(f"预算: 启动开销 ≤ {budget_ms:.0f} ms，每个命令运行 {repeat} 次取最小值")
+    print()
+
+    width = max(len(name) for name in names)
+    # 中文表头每个字占两列，按显示宽度补齐
+    print(f"{'子命令':<{width - 3}}  {'最小':>7}  {'中位数':>6}  {'开销':>7}  结果")
+    failed = []
+    for name in names:
+        cmd = [sys.executable, script, name, "--help"]
+        _time_process(cmd, 1)
+        times, code = _time_process(cmd, repeat)
+        best = min(times)
+        overhead = best - baseline
+        if code != 0:
+            status = f"FAIL（退出码 {code}）"
+        elif overhead > budget_ms:
+            status = "FAIL（超出预算）"
+        else:
+            status = "ok"
+        if status != "ok":
+            failed.append(name)
+        print(
+            f"{name:<{width}}  {best:7.1f}ms  {statistics.median(times):7.1f}ms"
+            f"  {overhead:7.1f}ms  {status}"
+        )
+
+    for name in failed:
+        print()
+        print(f"{name}: 最耗时的顶层导入（累计）")
+        for ms, module in top_imports(name):
+            print(f"  {ms:8.1f} ms  {module}")
+
+    print()
+    print(f"通过 {len(names) - len(failed)}/{len(names)}")
+    return 1 if failed else 0
+
+
+def bench_main(argv) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="script_tool.py bench",
+        description="测量各子命令 --help 的冷启动耗时，超出预算时以非零状态退出。",
+    )
+    parser.add_argument("commands", nargs="*", metavar="子命令", help="要测量的子命令，默认全部")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=DEFAULT_BUDGET_MS,
+        metavar="N",
+        help=f"相对裸解释器的启动开销预算，毫秒（默认 {DEFAULT_BUDGET_MS:.0f}）",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=DEFAULT_REPEAT,
+        metavar="N",
+        help=f"每个命令的重复次数，取最小值（默认 {DEFAULT_REPEAT}）",
+    )
+    args = parser.parse_args(argv)
+
+    if args.repeat < 1:
+        parser.error("--repeat 必须为正整数")
+    if args.budget_ms <= 0:
+        parser.error("--budget-ms 必须为正数")
+    names = []
+    for name in args.commands or sorted(COMMANDS):
+        try:
+            resolve_command(name)
+        except KeyError:
+            parser.error(f"未知子命令: {name}")
+        names.append(name[:-3] if name.endswith(".py") else name)
+    return bench(names, args.budget_ms, args.repeat)
+
+
+def main() -> None:
+    argv = sys.argv[1:]
+    if not argv or argv[0] in ("-h", "--help", "list"):
+        print_commands()
+        sys.exit(0 if argv else 2)
+
+    name, rest = argv[0], argv[1:]
+    if name == "bench":
+        sys.exit(bench_main(rest))
+    try:
+        resolve_command(name)
+    except KeyError:
+        import difflib
+
+        print(f"错误: 未知子命令: {name}", file=sys.stderr)
+        close = difflib.get_close_matches(name, list(COMMANDS) + list(BUILTINS), n=3)
+        if close:
+            print(f"你是不是想用: {', '.join(close)}", file=sys.stderr)
+        print("运行 python script_tool.py list 查看全部子命令", file=sys.stderr)
+        sys.exit(2)
+    run_command(name, rest)
+
+
+if __name__ == "__main__":
+    main()
@@ -30,8 +30,6 @@ import argparse
 import sys
 from datetime import datetime
 from pathlib import Path
-from kafka import KafkaProducer
-from kafka.errors import KafkaError
 import time
 
 
@@ -194,6 +192,10 @@ def main():
     print(f"✅ 模板加载成功（包含 {len(template)} 个字段）")
     print("")
     
+    # kafka-python 较重，模板校验通过后再导入
+    from kafka import KafkaProducer
+    from kafka.errors import KafkaError
+
     # 创建Kafka生产者
     print(f"🔗 正在连接到Kafka服务器: {args.bootstrap}")
     try:
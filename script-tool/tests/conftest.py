@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+
+"""各脚本是同级的独立模块（没有包结构），测试时把 script-tool 目录加入 sys.path。"""
+
+import sys
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent.parent
+
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
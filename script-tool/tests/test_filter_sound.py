@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+np = pytest.importorskip("numpy")
+sf = pytest.importorskip("soundfile")
+pytest.importorskip("scipy")
+
+import filter_sound  # noqa: E402
+from filter_sound import PITCH_METHOD, SR, analyze_file, pitch_method  # noqa: E402
+
+
+def _write_a4(path, sr):
+    t = np.arange(sr // 2) / sr
+    sf.write(path, 0.5 * np.sin(2 * np.pi * 440.0 * t) * np.minimum(t / 0.01, 1.0), sr, subtype="PCM_16")
+
+
+def test_pitch_method_native_sr_omits_resampler():
+    assert pitch_method(SR, "linear") == PITCH_METHOD
+    assert pitch_method(48000, "linear") == f"{PITCH_METHOD}+linear"
+    assert pitch_method(48000, "poly") != pitch_method(48000, "linear")
+
+
+def test_analyze_file_cache_entry_is_per_resampler(tmp_path):
+    wav = tmp_path / "A4.wav"
+    _write_a4(wav, 48000)
+    db = str(tmp_path / "pitch.sqlite")
+
+    first = analyze_file(str(wav), db, "linear")
+    cache = filter_sound.PitchCache(db)
+    cache.put([first["cache_row"]])
+    cache.close()
+
+    assert first["status"] == "ok" and not first["cached"]
+    assert analyze_file(str(wav), db, "linear")["cached"]
+    assert not analyze_file(str(wav), db, "poly")["cached"]
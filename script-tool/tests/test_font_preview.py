@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+import struct
+
+import pytest
+
+from font_preview import _cmap_format4, _merge_ranges, font_coverage
+
+
+def _format4(segments, glyph_ids=()):
+    """
+    组装 cmap 格式 4 子表。
+
+    :param segments: [(start, end, delta, glyph_id_index)]；glyph_id_index 为 None 时 idRangeOffset 为 0，
+        否则指向 glyph_ids 中该下标
+    """
+    count = len(segments)
+    ends = [end for _, end, _, _ in segments]
+    starts = [start for start, _, _, _ in segments]
+    deltas = [delta & 0xFFFF for _, _, delta, _ in segments]
+    # idRangeOffset 相对其自身地址：到 glyphIdArray 开头的距离 + 目标下标
+    offsets = [0 if index is None else 2 * (count - i + index) for i, (_, _, _, index) in enumerate(segments)]
+    body = struct.pack(f">{count}H", *ends) + b"\0\0" + struct.pack(f">{count}H", *starts)
+    body += struct.pack(f">{count}H", *deltas) + struct.pack(f">{count}H", *offsets)
+    body += struct.pack(f">{len(glyph_ids)}H", *glyph_ids)
+    return struct.pack(">7H", 4, 14 + len(body), 0, 2 * count, 0, 0, 0) + body
+
+
+def _sfnt(subtable, platform=3, encoding=1):
+    cmap = struct.pack(">HHHHI", 0, 1, platform, encoding, 12) + subtable
+    directory = struct.pack(">IHHHH", 0x00010000, 1, 16, 0, 0)
+    offset = len(directory) + 16
+    return directory + struct.pack(">4sIII", b"cmap", 0, offset, len(cmap)) + cmap
+
+
+SEGMENTS = [
+    (0x41, 0x43, -0x40, None),  # 字形号 1–3
+    (0x60, 0x62, -0x61, None),  # 0x61 映射到字形 0（未覆盖）
+    (0x100, 0x103, 0, 0),  # glyphIdArray：5, 0, 7, 8
+    (0xFFFF, 0xFFFF, 1, None),  # 结束段
+]
+GLYPH_IDS = (5, 0, 7, 8)
+
+
+def test_cmap_format4_delta_and_glyph_array_segments_skip_unmapped_codes():
+    ranges = _cmap_format4(_format4(SEGMENTS, GLYPH_IDS), 0)
+
+    assert ranges == [(0x41, 0x43), (0x60, 0x60), (0x62, 0x62), (0x100, 0x100), (0x102, 0x103)]
+
+
+def test_cmap_format4_glyph_array_with_delta_drops_codes_wrapping_to_zero():
+    segments = [(0x30, 0x32, -3, 0), (0xFFFF, 0xFFFF, 1, None)]
+
+    assert _cmap_format4(_format4(segments, (4, 3, 9)), 0) == [(0x30, 0x30), (0x32, 0x32)]
+
+
+def test_merge_ranges_overlapping_and_adjacent_ranges_merge():
+    ranges = [(10, 12), (1, 3), (4, 5), (11, 20), (30, 30), (2, 2)]
+
+    assert _merge_ranges(ranges) == [(1, 5), (10, 20), (30, 30)]
+
+
+def test_merge_ranges_empty_returns_empty():
+    assert _merge_ranges([]) == []
+
+
+def test_font_coverage_minimal_sfnt_returns_merged_ranges(tmp_path):
+    path = tmp_path / "mini.ttf"
+    path.write_bytes(_sfnt(_format4(SEGMENTS, GLYPH_IDS)))
+
+    _, ranges = font_coverage(str(path))
+
+    assert ranges == [(0x41, 0x43), (0x60, 0x60), (0x62, 0x62), (0x100, 0x100), (0x102, 0x103)]
+
+
+def test_font_coverage_without_unicode_subtable_raises_value_error(tmp_path):
+    path = tmp_path / "mac.ttf"
+    path.write_bytes(_sfnt(_format4(SEGMENTS, GLYPH_IDS), platform=1, encoding=0))
+
+    with pytest.raises(ValueError):
+        font_coverage(str(path))
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+import image2thumbnail  # noqa: E402
+from image2thumbnail import resize_animation  # noqa: E402
+
+
+def _make_gif(path, frames=6):
+    images = [Image.new("RGB", (80, 60), (40 * i, 255 - 40 * i, 0)) for i in range(frames)]
+    images[0].save(path, save_all=True, append_images=images[1:], duration=50, loop=0)
+
+
+def _frame_durations(path):
+    with Image.open(path) as im:
+        durations = []
+        for index in range(im.n_frames):
+            im.seek(index)
+            im.load()
+            durations.append(im.info["duration"])
+        return im.size, durations, im.info.get("loop")
+
+
+def _make_transparent_apng(path, durations=(40, 60, 80, 100)):
+    """RGBA 动图：偶数帧右半不透明、奇数帧左半不透明，其余全透明。"""
+    images = []
+    for i in range(len(durations)):
+        frame = Image.new("RGBA", (80, 60), (0, 0, 0, 0))
+        frame.paste((60 * i, 200, 255 - 60 * i, 255), (0, 0, 40, 60) if i % 2 else (40, 0, 80, 60))
+        images.append(frame)
+    images[0].save(path, save_all=True, append_images=images[1:], duration=list(durations), loop=0)
+
+
+def _frame_alphas(path, points):
+    """每帧在 points 处的 alpha 值。"""
+    with Image.open(path) as im:
+        alphas = []
+        for index in range(im.n_frames):
+            im.seek(index)
+            frame = im.convert("RGBA")
+            alphas.append([frame.getpixel(xy)[3] for xy in points])
+        return alphas
+
+
+def test_resize_animation_webp_public_api_fallback_matches_encoder(tmp_path, monkeypatch):
+    src = tmp_path / "a.gif"
+    _make_gif(src)
+    resize_animation(src, tmp_path / "enc.webp", 40, 30, "cover")
+    monkeypatch.setattr(image2thumbnail._WebpWriter, "_encoder", staticmethod(lambda size, loop: None))
+
+    resize_animation(src, tmp_path / "fallback.webp", 40, 30, "cover")
+
+    expected = ((40, 30), [50] * 6, 0)
+    assert _frame_durations(tmp_path / "enc.webp") == expected
+    assert _frame_durations(tmp_path / "fallback.webp") == expected
+
+
+def test_compare_with_per_call_same_named_targets_get_distinct_temp_paths(tmp_path, monkeypatch):
+    src = tmp_path / "icon.png"
+    Image.new("RGB", (64, 64), (0, 128, 255)).save(src)
+    targets = [(tmp_path / f"mipmap-{d}" / "ic_launcher.png", s, s) for d, s in (("mdpi", 48), ("hdpi", 72))]
+    seen = []
+    monkeypatch.setattr(image2thumbnail, "resize_to_thumbnail", lambda s, dst, *a, **k: seen.append(dst))
+    monkeypatch.setattr(image2thumbnail, "resize_to_sizes", lambda s, tmp_targets, *a: seen.extend(d for d, _, _ in tmp_targets))
+
+    image2thumbnail.compare_with_per_call(src, targets, "cover", 2)
+
+    assert len(set(seen)) == len(seen) == 4
+
+
+@pytest.mark.parametrize("suffix", [".gif", ".png"])
+def test_resize_animation_round_trip_keeps_frames_durations_loop_and_alpha(tmp_path, suffix):
+    src = tmp_path / "src.png"
+    _make_transparent_apng(src)
+    dst = tmp_path / f"out{suffix}"
+
+    result = resize_animation(src, dst, 40, 30, "cover")
+
+    assert result == {"frames": 4, "kept": 4, "bytes": dst.stat().st_size, "passes": 1}
+    assert _frame_durations(dst) == ((40, 30), [40, 60, 80, 100], 0)
+    assert _frame_alphas(dst, [(5, 15), (35, 15)]) == [[0, 255], [255, 0]] * 2
+
+
+def test_resize_animation_max_fps_merges_frames_keeping_total_duration(tmp_path):
+    src = tmp_path / "a.gif"
+    images = [Image.new("RGB", (80, 60), (20 * i, 255 - 20 * i, 0)) for i in range(10)]
+    images[0].save(src, save_all=True, append_images=images[1:], duration=20, loop=0)
+
+    result = resize_animation(src, tmp_path / "out.gif", 40, 30, "cover", max_fps=25)
+
+    _, durations, _ = _frame_durations(tmp_path / "out.gif")
+    assert result["kept"] == 5
+    assert durations == [40] * 5
+
+
+def test_resize_animation_max_bytes_widens_frame_stride(tmp_path):
+    import random
+
+    rng = random.Random(0)
+    src = tmp_path / "noise.gif"
+    images = [Image.frombytes("L", (80, 60), rng.randbytes(80 * 60)).convert("RGB") for _ in range(12)]
+    images[0].save(src, save_all=True, append_images=images[1:], duration=50, loop=0)
+    full = resize_animation(src, tmp_path / "full.gif", 80, 60, "cover")
+
+    result = resize_animation(src, tmp_path / "small.gif", 80, 60, "cover", max_bytes=full["bytes"] // 3)
+
+    _, durations, _ = _frame_durations(tmp_path / "small.gif")
+    assert result["passes"] > 1
+    assert 1 <= result["kept"] < full["kept"] == 12
+    assert result["bytes"] <= full["bytes"] // 3
+    assert sum(durations) == 600
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+import image_convert_batch  # noqa: E402
+from image_convert_batch import convert_one  # noqa: E402
+
+PARAMS = {"quality": 90}
+
+
+@pytest.fixture
+def converted(tmp_path):
+    src, dst = tmp_path / "a.png", tmp_path / "out" / "a.jpg"
+    Image.new("RGB", (32, 24), (200, 80, 10)).save(src)
+    record = convert_one(str(src), str(dst), "jpg", PARAMS, None)
+    assert record["status"] == "converted"
+    return src, dst, record
+
+
+def _fail_hash(path):
+    raise AssertionError(f"不应重新计算哈希: {path}")
+
+
+def test_convert_one_unchanged_size_and_mtime_skips_without_hashing(converted, monkeypatch):
+    src, dst, record = converted
+    monkeypatch.setattr(image_convert_batch, "file_sha256", _fail_hash)
+
+    result = convert_one(str(src), str(dst), "jpg", PARAMS, record)
+
+    assert result["status"] == "skipped"
+    assert result["sha256"] == record["sha256"]
+
+
+def test_convert_one_touched_but_same_content_skips_after_hashing(converted):
+    src, dst, record = converted
+    os.utime(src, ns=(record["mtime_ns"] + 10**9, record["mtime_ns"] + 10**9))
+
+    result = convert_one(str(src), str(dst), "jpg", PARAMS, record)
+
+    assert result["status"] == "skipped"
+    assert result["mtime_ns"] == record["mtime_ns"] + 10**9
+
+
+def test_convert_one_changed_content_converts_again(converted):
+    src, dst, record = converted
+    Image.new("RGB", (48, 24), (10, 80, 200)).save(src)
+
+    result = convert_one(str(src), str(dst), "jpg", PARAMS, record)
+
+    assert result["status"] == "converted"
+    assert result["sha256"] != record["sha256"]
+
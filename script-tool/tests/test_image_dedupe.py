@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+
+import os
+import random
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+import image_dedupe  # noqa: E402
+from image_dedupe import (  # noqa: E402
+    DEFAULT_RADIUS,
+    HASH_BITS,
+    MIH_MAX_SEGMENTS,
+    HashIndex,
+    MultiIndex,
+    _to_signed,
+    dhash,
+)
+
+
+def _flip(h, count, rng):
+    for pos in rng.sample(range(HASH_BITS), count):
+        h ^= 1 << pos
+    return h
+
+
+def _brute_force(entries, h, radius):
+    found = [(bin(h ^ other).count("1"), n, key) for n, (key, other) in enumerate(entries)]
+    return [(d, key) for d, _, key in sorted(found) if d <= radius]
+
+
+@pytest.mark.parametrize("radius", [0, 1, 4, MIH_MAX_SEGMENTS - 1, MIH_MAX_SEGMENTS + 3, 20])
+def test_query_random_hashes_matches_brute_force(radius):
+    rng = random.Random(radius)
+    base = [rng.getrandbits(HASH_BITS) for _ in range(20)]
+    # 每个基准哈希周围放一批不同距离的近邻，保证各个距离都有命中
+    entries = [(f"{i}-{d}", _flip(h, d, rng)) for i, h in enumerate(base) for d in range(0, radius + 3)]
+    index = MultiIndex(radius)
+    for key, h in entries:
+        index.add(key, h)
+
+    for h in base:
+        assert index.query(h) == _brute_force(entries, h, radius)
+
+
+def test_query_smaller_radius_filters_results():
+    index = MultiIndex(8)
+    index.add("same", 0)
+    index.add("near", 0b111)
+    index.add("far", (1 << 8) - 1)
+
+    assert index.query(0, radius=3) == [(0, "same"), (3, "near")]
+    assert index.query(0) == [(0, "same"), (3, "near"), (8, "far")]
+
+
+def test_query_larger_radius_than_built_raises_value_error():
+    index = MultiIndex(2)
+
+    with pytest.raises(ValueError):
+        index.query(0, radius=3)
+
+
+def test_query_equal_distances_keep_insertion_order():
+    index = MultiIndex(4)
+    for key in ("b", "a", "c"):
+        index.add(key, 1 << 10)
+
+    assert [key for _, key in index.query(0)] == ["b", "a", "c"]
+    assert len(index) == 3
+
+
+def _mandelbrot(size=(640, 480), extent=(-2.0, -1.2, 1.0, 1.2)):
+    return Image.effect_mandelbrot(size, extent, 100).convert("RGB")
+
+
+def _hash_calls(monkeypatch, value=None):
+    """把 dhash 换成计数桩：value 为 None 时按原实现计算。"""
+    calls = []
+    real = image_dedupe.dhash
+
+    def fake(path):
+        calls.append(path)
+        return real(path) if value is None else value
+
+    monkeypatch.setattr(image_dedupe, "dhash", fake)
+    return calls
+
+
+def test_hash_index_unchanged_file_reuses_stored_hash(tmp_path, monkeypatch):
+    img = tmp_path / "a.png"
+    _mandelbrot().save(img)
+    index = HashIndex(tmp_path / "index.sqlite")
+    first, stats = index.hashes([img], workers=1)
+    assert stats == {"hashed": 1, "reused": 0, "failed": 0}
+
+    calls = _hash_calls(monkeypatch)
+    again, stats = index.hashes([img], workers=1)
+
+    assert calls == []
+    assert again == first
+    assert stats == {"hashed": 0, "reused": 1, "failed": 0}
+
+
+def test_hash_index_changed_mtime_rehashes(tmp_path, monkeypatch):
+    img = tmp_path / "a.png"
+    _mandelbrot().save(img)
+    index = HashIndex(tmp_path / "index.sqlite")
+    index.hashes([img], workers=1)
+    st = img.stat()
+    os.utime(img, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+    calls = _hash_calls(monkeypatch)
+    _, stats = index.hashes([img], workers=1)
+
+    assert calls == [str(img)]
+    assert stats == {"hashed": 1, "reused": 0, "failed": 0}
+
+
+def test_hash_index_failed_decode_is_stored_and_not_retried(tmp_path, monkeypatch):
+    bad = tmp_path / "bad.png"
+    bad.write_bytes(b"not an image")
+    index = HashIndex(tmp_path / "index.sqlite")
+    result, stats = index.hashes([bad], workers=1)
+    assert result == {}
+    assert stats == {"hashed": 1, "reused": 0, "failed": 1}
+
+    calls = _hash_calls(monkeypatch)
+    result, stats = index.hashes([bad], workers=1)
+
+    assert calls == []
+    assert result == {}
+    assert stats == {"hashed": 0, "reused": 1, "failed": 1}
+
+
+@pytest.mark.parametrize("h", [0, 1, (1 << 63) - 1, 1 << 63, (1 << 63) | 5, (1 << 64) - 1])
+def test_to_signed_top_bit_hashes_fit_sqlite_and_round_trip(h):
+    signed = _to_signed(h)
+
+    assert -(1 << 63) <= signed < 1 << 63
+    assert signed & ((1 << 64) - 1) == h
+
+
+def test_hash_index_top_bit_hash_round_trips_through_database(tmp_path, monkeypatch):
+    img = tmp_path / "a.png"
+    _mandelbrot().save(img)
+    db = tmp_path / "index.sqlite"
+    h = (1 << 63) | 0x5A5A
+    _hash_calls(monkeypatch, h)
+    index = HashIndex(db)
+    index.hashes([img], workers=1)
+    index.close()
+
+    calls = _hash_calls(monkeypatch)
+    result, stats = HashIndex(db).hashes([img], workers=1)
+
+    assert calls == []
+    assert result == {str(img): h}
+    assert stats["reused"] == 1
+
+
+def test_dhash_reencoded_or_slightly_changed_image_stays_within_radius(tmp_path):
+    base = _mandelbrot()
+    base.save(tmp_path / "a.png")
+    base.save(tmp_path / "a.jpg", quality=60)
+    base.resize((480, 360), Image.BILINEAR).save(tmp_path / "small.png")
+    changed = base.copy()
+    changed.paste((255, 255, 255), (600, 0, 640, 20))
+    changed.save(tmp_path / "changed.png")
+    _mandelbrot(extent=(-0.8, -0.2, -0.4, 0.1)).save(tmp_path / "other.png")
+
+    h = dhash(tmp_path / "a.png")
+
+    for name in ("a.jpg", "small.png", "changed.png"):
+        assert (h ^ dhash(tmp_path / name)).bit_count() <= DEFAULT_RADIUS, name
+    assert (h ^ dhash(tmp_path / "other.png")).bit_count() > DEFAULT_RADIUS
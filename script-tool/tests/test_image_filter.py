@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+
+import image_filter  # noqa: E402
+from image_filter import (  # noqa: E402
+    FILTER_GAUSSIAN_BLUR,
+    STAGE_RESIZE,
+    STAGE_SHARPEN,
+    VERIFY_MAX_ERROR,
+    fuse_chain,
+    parse_chain,
+)
+
+# 会放大误差的流水线：模糊 -> 非等比缩小（不会被换序）-> 锐化
+AMPLIFYING_CHAIN = "gaussian_blur:20,resize:300x170,sharpen"
+
+
+@pytest.fixture
+def noise_image():
+    rng = np.random.RandomState(1)
+    return Image.fromarray((rng.rand(400, 600, 3) * 255).astype(np.uint8))
+
+
+def test_parse_chain_all_stages_returns_typed_args():
+    stages = parse_chain("gaussian_blur:8, sharpen ,resize:1280X720")
+    assert stages == [(FILTER_GAUSSIAN_BLUR, 8.0), (STAGE_SHARPEN, None), (STAGE_RESIZE, (1280, 720))]
+
+
+@pytest.mark.parametrize(
+    "spec",
+    ["gaussian_blur", "gaussian_blur:-1", "sharpen:2", "resize:0x10", "resize:abc", "emboss", "gaussian_blur:3,"],
+)
+def test_parse_chain_invalid_spec_raises_value_error(spec):
+    with pytest.raises(ValueError):
+        parse_chain(spec)
+
+
+def test_fuse_chain_consecutive_blurs_add_variances():
+    stages = fuse_chain([(FILTER_GAUSSIAN_BLUR, 3.0), (FILTER_GAUSSIAN_BLUR, 4.0)], (100, 100))
+    assert stages == [(FILTER_GAUSSIAN_BLUR, 5.0)]
+
+
+def test_fuse_chain_consecutive_resizes_keep_last():
+    stages = fuse_chain([(STAGE_RESIZE, (50, 50)), (STAGE_RESIZE, (20, 10))], (100, 100))
+    assert stages == [(STAGE_RESIZE, (20, 10))]
+
+
+def test_fuse_chain_blur_then_proportional_shrink_swaps_and_scales_radius():
+    stages = fuse_chain([(FILTER_GAUSSIAN_BLUR, 60.0), (STAGE_RESIZE, (960, 540))], (3840, 2160))
+    assert stages[0] == (STAGE_RESIZE, (960, 540))
+    assert stages[1][0] == FILTER_GAUSSIAN_BLUR
+    assert math.isclose(stages[1][1], 15.0)
+
+
+def test_fuse_chain_blur_then_non_proportional_resize_keeps_order():
+    stages = [(FILTER_GAUSSIAN_BLUR, 20.0), (STAGE_RESIZE, (300, 170)), (STAGE_SHARPEN, None)]
+    assert fuse_chain(stages, (600, 400)) == stages
+
+
+def test_verify_chain_sharpen_after_blur_stays_within_budget(noise_image):
+    stages = fuse_chain(parse_chain(AMPLIFYING_CHAIN), noise_image.size)
+
+    max_err, _ = image_filter.verify_chain(noise_image, stages)
+
+    assert max_err <= VERIFY_MAX_ERROR, f"模糊步骤的像素差 {max_err} 超过 {VERIFY_MAX_ERROR}"
+
+
+def test_filter_image_verify_box_chain_with_sharpen_succeeds(noise_image, tmp_path):
+    src, dst = tmp_path / "in.png", tmp_path / "out.jpg"
+    noise_image.save(src)
+
+    image_filter.filter_image(str(src), str(dst), engine=image_filter.ENGINE_BOX, verify=True, chain=AMPLIFYING_CHAIN)
+
+    assert dst.is_file()
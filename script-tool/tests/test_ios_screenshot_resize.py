@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+
+import subprocess
+import sys
+
+import pytest
+
+from conftest import SCRIPT_DIR
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def _noise_png(path, seed=0):
+    import random
+
+    rng = random.Random(seed)
+    data = bytes(rng.randrange(256) for _ in range(120 * 80 * 3))
+    Image.frombytes("RGB", (120, 80), data).save(path)
+
+
+def test_dedupe_skip_through_symlinked_dir_skips_duplicate(tmp_path):
+    real = tmp_path / "real"
+    real.mkdir()
+    _noise_png(real / "a.png")
+    _noise_png(real / "b.png")
+    link = tmp_path / "link"
+    link.symlink_to(real, target_is_directory=True)
+    out = tmp_path / "out"
+
+    result = subprocess.run(
+        [sys.executable, str(SCRIPT_DIR / "ios_screenshot_resize.py"), str(link),
+         "-o", str(out), "--size", "60x40", "--dedupe", "skip", "-j", "1"],
+        capture_output=True, text=True,
+    )
+
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert sorted(p.name for p in out.iterdir()) == ["a_ios.jpg"], "重复图 b.png 不应生成输出"
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from pitch import estimate_pitch, hz_to_note, note_to_hz, synthetic_notes  # noqa: E402
+
+SR = 44100
+
+
+@pytest.mark.parametrize(
+    "note, hz",
+    [("A4", 440.0), ("C4", 261.6256), ("c#4", 277.1826), ("Db4", 277.1826), ("B♭3", 233.0819), ("C-1", 8.1758)],
+)
+def test_note_to_hz_note_names_return_equal_tempered_frequency(note, hz):
+    assert math.isclose(note_to_hz(note), hz, rel_tol=1e-5)
+
+
+@pytest.mark.parametrize("note", ["", "H4", "A", "A#x", "4A"])
+def test_note_to_hz_invalid_name_raises_value_error(note):
+    with pytest.raises(ValueError):
+        note_to_hz(note)
+
+
+@pytest.mark.parametrize("hz, note", [(440.0, "A4"), (277.2, "C#4"), (452.0, "A4"), (27.5, "A0"), (4186.0, "C8")])
+def test_hz_to_note_frequency_returns_nearest_sharp_name(hz, note):
+    assert hz_to_note(hz) == note
+
+
+def test_hz_to_note_round_trips_every_midi_note():
+    names = [hz_to_note(440.0 * 2 ** ((midi - 69) / 12)) for midi in range(21, 109)]
+
+    assert [round(69 + 12 * math.log2(note_to_hz(name) / 440.0)) for name in names] == list(range(21, 109))
+
+
+# C1 ~ C8 每隔 5 个半音取一个，另加最高的几个音（曾因整数延迟处的谷底偏高而低一个八度）
+NOTES = synthetic_notes(sr=SR, seconds=0.6, low=24, high=108, seed=1)
+SAMPLED_NOTES = NOTES[::5] + NOTES[-4:]
+
+
+@pytest.mark.parametrize("midi, signal", SAMPLED_NOTES)
+def test_estimate_pitch_synthetic_note_within_20_cents(midi, signal):
+    hz, confidence = estimate_pitch(signal, SR)
+
+    expected = 440.0 * 2 ** ((midi - 69) / 12)
+    assert hz is not None
+    assert abs(1200 * math.log2(hz / expected)) < 20, f"MIDI {midi}: {hz:.2f} Hz，期望 {expected:.2f} Hz"
+    assert confidence > 0.5
+
+
+def test_estimate_pitch_a6_at_22050_hz_is_not_an_octave_low():
+    _, signal = synthetic_notes(sr=22050, seconds=0.6, low=93, high=93, seed=1)[0]
+
+    hz, _ = estimate_pitch(signal, 22050)
+
+    assert abs(1200 * math.log2(hz / 1760.0)) < 20
+
+
+def test_estimate_pitch_int16_stereo_matches_float_mono():
+    _, signal = NOTES[57 - 24]
+    pcm = np.round(signal * 32767).astype(np.int16)
+
+    hz_float, _ = estimate_pitch(signal, SR)
+    hz_int, _ = estimate_pitch(np.stack([pcm, pcm], axis=1), SR)
+
+    assert abs(1200 * math.log2(hz_int / hz_float)) < 1
+
+
+def test_estimate_pitch_silence_returns_none():
+    assert estimate_pitch(np.zeros(SR, dtype=np.float32), SR) == (None, 0.0)
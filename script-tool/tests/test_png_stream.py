@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+np = pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+
+import png_stream  # noqa: E402
+from png_stream import PngBandReader, PngBandWriter, choose_level, write_png_parallel  # noqa: E402
+
+
+def _pixels(height, width, channels, seed=0):
+    # 随机噪声 + 渐变：各种滤波类型都会被选到
+    rng = np.random.RandomState(seed)
+    ramp = np.add.outer(np.arange(height), np.arange(width)).astype(np.uint8)
+    noise = rng.randint(0, 8, size=(height, width, channels), dtype=np.uint8)
+    return ramp[:, :, None] + noise
+
+
+@pytest.mark.parametrize("mode, channels", [("L", 1), ("LA", 2), ("RGB", 3), ("RGBA", 4)])
+def test_band_writer_uneven_chunks_decodes_identically_with_pillow(tmp_path, mode, channels):
+    pixels = _pixels(37, 29, channels)
+    path = tmp_path / "out.png"
+
+    with PngBandWriter(str(path), 29, 37, mode) as writer:
+        for start in range(0, 37, 10):
+            writer.write_rows(pixels[start:start + 10])
+
+    with Image.open(path) as im:
+        assert im.mode == mode
+        decoded = np.asarray(im).reshape(37, 29, channels)
+    np.testing.assert_array_equal(decoded, pixels)
+
+
+@pytest.mark.parametrize("band_height", [1, 7, 50])
+def test_band_reader_any_band_height_reassembles_image(tmp_path, band_height):
+    pixels = _pixels(41, 23, 4)
+    path = tmp_path / "in.png"
+    Image.fromarray(pixels, "RGBA").save(path)
+
+    with PngBandReader(str(path)) as reader:
+        bands = [np.asarray(band.convert("RGBA")) for band in reader.iter_bands(band_height)]
+
+    assert all(len(band) <= band_height for band in bands)
+    np.testing.assert_array_equal(np.concatenate(bands), pixels)
+
+
+def test_band_reader_palette_with_trns_converts_to_rgba(tmp_path):
+    im = Image.new("P", (16, 12))
+    im.putpalette([0, 0, 0, 255, 0, 0, 0, 255, 0] + [0] * (768 - 9))
+    im.paste(1, (0, 0, 8, 12))
+    im.paste(2, (8, 0, 16, 6))
+    im.info["transparency"] = 0
+    path = tmp_path / "p.png"
+    im.save(path, transparency=0)
+
+    with PngBandReader(str(path)) as reader:
+        rows = np.concatenate([np.asarray(b.convert("RGBA")) for b in reader.iter_bands(5)])
+
+    np.testing.assert_array_equal(rows, np.asarray(Image.open(path).convert("RGBA")))
+
+
+def test_band_writer_missing_rows_raises_value_error(tmp_path):
+    writer = PngBandWriter(str(tmp_path / "short.png"), 8, 10, "RGB")
+    writer.write_rows(_pixels(4, 8, 3))
+
+    with pytest.raises(ValueError):
+        writer.close()
+
+
+def test_band_reader_truncated_file_raises_value_error(tmp_path):
+    path = tmp_path / "full.png"
+    Image.fromarray(_pixels(64, 64, 3), "RGB").save(path)
+    data = path.read_bytes()
+    truncated = tmp_path / "cut.png"
+    truncated.write_bytes(data[: len(data) // 2])
+
+    with pytest.raises(ValueError, match="不完整"):
+        with PngBandReader(str(truncated)) as reader:
+            for _ in reader.iter_bands(8):
+                pass
+
+
+@pytest.mark.parametrize("level", [0, 1, 6, 9])
+def test_write_png_parallel_many_blocks_decodes_identically(tmp_path, monkeypatch, level):
+    # 缩小块大小，让一张小图也分成多个 deflate 块（跨块字典、Adler-32 拼接都会用到）
+    monkeypatch.setattr(png_stream, "DEFLATE_BLOCK_SIZE", 2048)
+    monkeypatch.setattr(png_stream, "IDAT_SIZE", 1024)
+    pixels = _pixels(90, 70, 3)
+    path = tmp_path / "par.png"
+
+    write_png_parallel(str(path), pixels, "RGB", compress_level=level, workers=4)
+
+    with Image.open(path) as im:
+        im.load()
+        np.testing.assert_array_equal(np.asarray(im), pixels)
+
+
+def test_write_png_parallel_extra_chunks_are_written_after_ihdr(tmp_path):
+    profile = b"not a real ICC profile, stored verbatim"
+    path = tmp_path / "icc.png"
+
+    write_png_parallel(str(path), _pixels(8, 8, 4), "RGBA", extra_chunks=[png_stream.icc_chunk(profile)])
+
+    with Image.open(path) as im:
+        assert im.info.get("icc_profile") == profile
+
+
+def test_choose_level_returns_one_of_candidate_levels():
+    level, stats = choose_level(_pixels(64, 64, 3), "RGB", levels=(1, 6))
+
+    assert level in (1, 6)
+    assert [s[0] for s in stats] == [1, 6]
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+np = pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+
+import raw_image  # noqa: E402
+from raw_image import (  # noqa: E402
+    HEADER_SIZE,
+    is_raw_file,
+    is_raw_path,
+    open_image,
+    read_array,
+    read_header,
+    read_raw,
+    save_image,
+    write_raw,
+)
+
+
+def _rgba(width, height, seed=0):
+    rng = np.random.RandomState(seed)
+    return rng.randint(0, 256, size=(height, width, 4), dtype=np.uint8)
+
+
+def test_write_raw_then_read_raw_returns_identical_pixels(tmp_path, monkeypatch):
+    # 条带很小，强制多次写出
+    monkeypatch.setattr(raw_image, "WRITE_BAND_BYTES", 100)
+    pixels = _rgba(13, 9)
+    path = tmp_path / "a.rgba"
+
+    write_raw(Image.fromarray(pixels, "RGBA"), path)
+
+    assert read_header(path) == (13, 9, HEADER_SIZE)
+    assert path.stat().st_size == HEADER_SIZE + 13 * 9 * 4
+    im = read_raw(path)
+    assert (im.mode, im.size) == ("RGBA", (13, 9))
+    np.testing.assert_array_equal(np.asarray(im), pixels)
+
+
+def test_write_raw_rgb_image_is_stored_opaque(tmp_path):
+    path = tmp_path / "rgb.rgba"
+
+    write_raw(Image.new("RGB", (4, 3), (10, 20, 30)), path)
+
+    assert np.asarray(read_raw(path))[0, 0].tolist() == [10, 20, 30, 255]
+
+
+def test_read_array_writable_changes_persist(tmp_path):
+    path = tmp_path / "m.rgba"
+    write_raw(Image.fromarray(_rgba(5, 4), "RGBA"), path)
+
+    arr = read_array(path, writable=True)
+    arr[1, 2] = (1, 2, 3, 4)
+    arr.flush()
+    del arr
+
+    assert np.asarray(read_raw(path))[1, 2].tolist() == [1, 2, 3, 4]
+    assert not read_array(path).flags.writeable
+
+
+def test_read_header_truncated_file_raises_value_error(tmp_path):
+    path = tmp_path / "t.rgba"
+    write_raw(Image.fromarray(_rgba(8, 8), "RGBA"), path)
+    path.write_bytes(path.read_bytes()[:-1])
+
+    with pytest.raises(ValueError, match="截断"):
+        read_header(path)
+
+
+def test_read_header_other_file_raises_value_error(tmp_path):
+    path = tmp_path / "x.rgba"
+    Image.new("RGB", (4, 4)).save(path, "PNG")
+
+    with pytest.raises(ValueError):
+        read_header(path)
+    assert not is_raw_file(path)
+
+
+def test_open_and_save_image_dispatch_on_content_and_extension(tmp_path):
+    pixels = _rgba(6, 6)
+    raw_path, png_path = tmp_path / "c.RGBA", tmp_path / "c.png"
+
+    save_image(Image.fromarray(pixels, "RGBA"), raw_path, quality=90)
+    save_image(open_image(raw_path), png_path)
+
+    assert is_raw_path(raw_path) and not is_raw_path(png_path)
+    assert is_raw_file(raw_path)
+    with open_image(png_path) as im:
+        assert im.format == "PNG"
+        np.testing.assert_array_equal(np.asarray(im), pixels)
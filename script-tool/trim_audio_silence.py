@@ -16,9 +16,6 @@ import os
 import sys
 from pathlib import Path
 
-from pydub import AudioSegment
-from pydub.silence import detect_nonsilent
-
 
 def process_audio(
     input_path: str,
@@ -40,6 +37,10 @@ def process_audio(
     :param silence_thresh: 静音阈值 dBFS，低于此电平视为静音
     :param min_silence_len: 连续静音至少多少毫秒才参与分段
     """
+    # pydub 在用到时才导入，保证 --help 等不处理音频的路径启动足够快
+    from pydub import AudioSegment
+    from pydub.silence import detect_nonsilent
+
     audio = AudioSegment.from_file(input_path)
 
     # 找到所有非静音区间
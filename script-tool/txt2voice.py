@@ -29,11 +29,8 @@
 import sys
 import asyncio
 import argparse
-import edge_tts
 from pathlib import Path
-from tqdm import tqdm
 import re
-from pydub import AudioSegment
 
 
 def split_text(text, max_len=300):
@@ -75,6 +72,11 @@ async def text_to_speech_with_progress(input_file, output_file="output.mp3", voi
         output_file: 输出音频文件路径
         voice: 语音模型名称
     """
+    # edge_tts / tqdm / pydub 只在真正合成时导入，--help 不必加载它们
+    import edge_tts
+    from pydub import AudioSegment
+    from tqdm import tqdm
+
     path = Path(input_file)
     
     # 检查文件是否存在
@@ -30,7 +30,6 @@
 import sys
 import argparse
 from pathlib import Path
-import whisper
 
 
 def main():
@@ -116,6 +115,9 @@ def main():
     print(f"⏳ 正在加载Whisper模型: {args.model}...")
     print("   （首次使用会下载模型，请耐心等待）")
     try:
+        # whisper 连带导入 torch，启动很慢，放到确实需要时再导入（--help 不受影响）
+        import whisper
+
         model = whisper.load_model(args.model)
         print("✅ 模型加载成功")
     except Exception as e:
@@ -14,6 +14,10 @@ WAV to MP3 Converter - 批量或单文件 WAV 转 MP3
 选项：
     --sample-rate, -r  采样率 (Hz)，默认: 44100
     --bitrate, -b      比特率 (kbps)，默认: 256
+    --resampler        采样率不一致时的重采样方式，默认: pydub
+                       （其他取值见 audio_io.py，需要 numpy、soundfile）
+
+采样率已经等于目标采样率的文件不做重采样。
 
 依赖：
     - pydub: pip install pydub
@@ -25,18 +29,18 @@ import sys
 import argparse
 from pathlib import Path
 
-try:
-    from pydub import AudioSegment
-except ImportError:
-    print("错误: 缺少 pydub 库，请运行: pip install pydub")
-    sys.exit(1)
+from audio_io import RESAMPLER_AUTO, RESAMPLERS
+
+# pydub 自带的 set_frame_rate（audioop.ratecv）
+RESAMPLER_PYDUB = "pydub"
 
 
 def convert_wav_to_mp3(
     input_file: Path,
     output_file: Path,
     sample_rate: int = 44100,
-    bitrate: int = 256
+    bitrate: int = 256,
+    resampler: str = RESAMPLER_PYDUB
 ) -> bool:
     """
     将单个 WAV 文件转换为 MP3
@@ -46,16 +50,23 @@ def convert_wav_to_mp3(
         output_file: 输出 MP3 文件路径
         sample_rate: 采样率 (Hz)
         bitrate: 比特率 (kbps)
+        resampler: 采样率不一致时的重采样方式：pydub，或 audio_io 的后端名
     
     Returns:
         bool: 转换是否成功
     """
+    from pydub import AudioSegment
+
     try:
         # 加载 WAV 文件
         audio = AudioSegment.from_wav(str(input_file))
         
-        # 设置采样率
-        audio = audio.set_frame_rate(sample_rate)
+        # 设置采样率：已经一致时跳过，避免无谓地重采样一遍
+        if audio.frame_rate != sample_rate:
+            if resampler == RESAMPLER_PYDUB:
+                audio = audio.set_frame_rate(sample_rate)
+            else:
+                audio = _resample_segment(audio, sample_rate, resampler)
         
         # 确保输出目录存在
         output_file.parent.mkdir(parents=True, exist_ok=True)
@@ -73,6 +84,32 @@ def convert_wav_to_mp3(
         return False
 
 
+def _resample_segment(audio, sample_rate: int, resampler: str):
+    """
+    用 audio_io 重采样已加载的 AudioSegment，保留声道数与采样位宽。
+
+    16 位样本直接交给 audio_io；8/32 位（pydub 把 24 位读成 32 位）先转 float64
+    （能精确表示 32 位整数）重采样，再四舍五入、限幅回原来的整数类型，不截断位深。
+    """
+    import numpy as np
+    from pydub import AudioSegment
+
+    from audio_io import resample
+
+    samples = np.array(audio.get_array_of_samples())
+    if audio.channels > 1:
+        samples = samples.reshape(-1, audio.channels)
+    if samples.dtype == np.int16:
+        data = resample(samples, audio.frame_rate, sample_rate, resampler)
+    else:
+        limits = np.iinfo(samples.dtype)
+        out = resample(samples.astype(np.float64), audio.frame_rate, sample_rate, resampler)
+        data = np.clip(np.round(out), limits.min, limits.max).astype(samples.dtype)
+    return AudioSegment(
+        data=data.tobytes(), sample_width=audio.sample_width, frame_rate=sample_rate, channels=audio.channels
+    )
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="WAV to MP3 Converter - 将 WAV 音频转换为 MP3 格式",
@@ -90,6 +127,9 @@ def main():
   
   # 使用较低比特率（节省空间）
   python wav2mp3.py ./wav_files/ ./mp3_files/ -b 128
+  
+  # 48 kHz 录音转 44.1 kHz，用 soxr 重采样
+  python wav2mp3.py ./recordings/ ./mp3_files/ --resampler soxr_hq
         """
     )
     
@@ -119,6 +159,13 @@ def main():
         help="比特率 (kbps)，默认: 256"
     )
     
+    parser.add_argument(
+        "--resampler",
+        choices=(RESAMPLER_PYDUB, RESAMPLER_AUTO) + tuple(RESAMPLERS),
+        default=RESAMPLER_PYDUB,
+        help="采样率不一致时的重采样方式，默认: pydub；其余为 audio_io 的后端（需要 numpy、soundfile）"
+    )
+    
     args = parser.parse_args()
     
     input_path = Path(args.input_path)
@@ -146,6 +193,22 @@ def main():
             print(f"错误: 目录中没有找到 WAV 文件: {input_path}")
             sys.exit(1)
     
+    # pydub 在确实要转换时才导入，--help 与参数错误不必加载它
+    try:
+        import pydub  # noqa: F401
+    except ImportError:
+        print("错误: 缺少 pydub 库，请运行: pip install pydub")
+        sys.exit(1)
+    if args.resampler != RESAMPLER_PYDUB:
+        try:
+            import soundfile  # noqa: F401
+            from audio_io import resolve_resampler
+
+            resolve_resampler(args.resampler)
+        except (ImportError, RuntimeError) as e:
+            print(f"错误: 重采样方式 {args.resampler} 不可用: {e}")
+            sys.exit(1)
+
     # 打印转换参数
     print("=" * 60)
     print("WAV to MP3 Converter")
@@ -154,6 +217,7 @@ def main():
     print(f"输出路径: {output_path}")
     print(f"采样率: {sample_rate} Hz")
     print(f"比特率: {bitrate} kbps")
+    print(f"重采样: {args.resampler}（采样率一致的文件跳过）")
     print(f"文件数量: {len(wav_files)}")
     print("=" * 60)
     
@@ -173,7 +237,7 @@ def main():
         
         print(f"[{i}/{len(wav_files)}] 转换: {wav_file.name} -> {mp3_file.name}")
         
-        if convert_wav_to_mp3(wav_file, mp3_file, sample_rate, bitrate):
+        if convert_wav_to_mp3(wav_file, mp3_file, sample_rate, bitrate, args.resampler):
             success_count += 1
             print(f"  ✓ 成功")
         else: